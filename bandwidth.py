@@ -0,0 +1,149 @@
+import threading
+import time
+
+# Priority classes, highest first, with their share of the total limit
+PRIORITY_WEIGHTS = {"rush": 8, "normal": 2, "background": 1}
+DEFAULT_PRIORITY = "normal"
+# A bucket saves up at most this many seconds of its rate, so a card that
+# paused cannot burst past its limit afterwards
+BURST_SECONDS = 0.25
+# Longest a throttled copy sleeps before checking for a cancel or new limits
+MAX_THROTTLE_WAIT = 0.1
+
+
+class TokenBucket:
+    """
+    Lets bytes through at rate bytes per second (None for no limit). A
+    chunk larger than the bucket is let through at once and paid off by
+    the following waits, so any chunk size works. set_rate() applies to
+    copies already waiting.
+    """
+
+    def __init__(self, rate=None):
+        self.cond = threading.Condition()
+        self.rate = rate or None
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate is not None:
+            self.tokens = min(self.rate * BURST_SECONDS, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, rate):
+        with self.cond:
+            self._refill()
+            self.rate = rate or None
+            if self.rate is None:
+                self.tokens = 0.0
+            self.cond.notify_all()
+
+    def consume(self, nbytes, cancel_event=None):
+        """Waits until nbytes may pass, or until cancel_event is set."""
+        with self.cond:
+            while True:
+                self._refill()
+                if self.rate is None or self.tokens >= 0:
+                    if self.rate is not None:
+                        self.tokens -= nbytes
+                    return
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                self.cond.wait(min(-self.tokens / self.rate, MAX_THROTTLE_WAIT))
+
+
+class CardLimit:
+    __slots__ = ("rate", "priority", "active", "bucket")
+
+    def __init__(self, rate, priority):
+        self.rate = rate
+        self.priority = priority
+        # Only cards copying now take a share of the total limit
+        self.active = False
+        self.bucket = TokenBucket()
+
+
+class BandwidthLimiter:
+    """
+    Caps the copy bandwidth of each card and of all cards together. Cards
+    are keyed by any hashable (the GUI and CLI use the card number). The
+    total limit is split between the cards copying by the weight of their
+    priority class, so a "rush" card gets most of it while "background"
+    cards trickle; a card's own limit caps its share further. Every setter
+    may be called while copies run.
+    """
+
+    def __init__(self, total_rate=None, card_rate=None):
+        self.lock = threading.Lock()
+        self.total_rate = total_rate or None
+        # Limit for cards not given one of their own
+        self.card_rate = card_rate or None
+        self.cards = {}
+
+    def _card(self, key):
+        limit = self.cards.get(key)
+        if limit is None:
+            limit = self.cards[key] = CardLimit(self.card_rate, DEFAULT_PRIORITY)
+        return limit
+
+    def _rebalance(self):
+        active = [limit for limit in self.cards.values() if limit.active]
+        total_weight = sum(PRIORITY_WEIGHTS[limit.priority] for limit in active)
+        for limit in active:
+            rate = limit.rate
+            if self.total_rate is not None:
+                share = self.total_rate * PRIORITY_WEIGHTS[limit.priority] / total_weight
+                rate = share if rate is None else min(rate, share)
+            limit.bucket.set_rate(rate)
+
+    def set_total_rate(self, rate):
+        with self.lock:
+            self.total_rate = rate or None
+            self._rebalance()
+
+    def set_card_rate(self, key, rate):
+        with self.lock:
+            self._card(key).rate = rate or None
+            self._rebalance()
+
+    def set_priority(self, key, priority):
+        if priority not in PRIORITY_WEIGHTS:
+            raise ValueError(f"Unknown priority {priority!r}; use one of {', '.join(PRIORITY_WEIGHTS)}")
+        with self.lock:
+            self._card(key).priority = priority
+            self._rebalance()
+
+    def weight(self, key):
+        with self.lock:
+            limit = self.cards.get(key)
+            return PRIORITY_WEIGHTS[limit.priority if limit else DEFAULT_PRIORITY]
+
+    def consume(self, key, nbytes, cancel_event=None):
+        """Waits until card key may copy nbytes more. The card counts as copying from its first call."""
+        with self.lock:
+            limit = self._card(key)
+            if not limit.active:
+                limit.active = True
+                self._rebalance()
+        limit.bucket.consume(nbytes, cancel_event)
+
+    def finish_card(self, key):
+        """Hands a finished card's share of the total limit to the cards still copying."""
+        with self.lock:
+            limit = self.cards.get(key)
+            if limit is not None and limit.active:
+                limit.active = False
+                self._rebalance()
+
+    def snapshot(self):
+        """The limits now in force, in bytes per second (None for no limit)."""
+        with self.lock:
+            return {
+                "total": self.total_rate,
+                "cards": {
+                    key: {"limit": limit.rate, "priority": limit.priority,
+                          "effective": limit.bucket.rate if limit.active else None}
+                    for key, limit in self.cards.items()
+                },
+            }
@@ -0,0 +1,132 @@
+"""
+Generates synthetic SD cards: folders laid out like a camera card, filled
+with files of realistic sizes.
+
+    python benchmarks/fixtures.py /tmp/cards --cards 2 --profile mixed --scale 0.1
+
+Each card gets DCIM/100CANON, 101CANON, ... folders of stills and clips, a
+SOUND folder of recordings and a few camera files that are not media.
+Sizes vary around the profile's average; the same seed always gives the
+same cards.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+MB = 1024 * 1024
+
+# (extension, prefix, file count, average size in bytes) per file type
+PROFILES = {
+    # A day of stills with some clips and interview audio
+    "mixed": [
+        ("CR3", "IMG_", 400, 28 * MB),
+        ("JPG", "IMG_", 400, 9 * MB),
+        ("MP4", "MVI_", 20, 400 * MB),
+        ("WAV", "ZOOM", 6, 120 * MB),
+    ],
+    # Burst shooting: many mid-size RAW files
+    "stills": [
+        ("CR3", "IMG_", 3000, 28 * MB),
+        ("JPG", "IMG_", 3000, 9 * MB),
+    ],
+    # Few, very large files
+    "video": [
+        ("MP4", "MVI_", 40, 2000 * MB),
+        ("WAV", "ZOOM", 10, 300 * MB),
+    ],
+    # Lots of tiny files, to measure per-file overhead
+    "small": [
+        ("JPG", "IMG_", 30000, 256 * 1024),
+    ],
+}
+
+# Camera folders hold at most this many files before the next one is started
+FILES_PER_FOLDER = 9999
+# Every file starts with this many unique bytes; the rest repeats a shared
+# block, so generating gigabytes stays fast but no two files are equal
+UNIQUE_HEAD = 64 * 1024
+FILL_BLOCK = 1 * MB
+
+
+def _random_bytes(rng, n):
+    return rng.getrandbits(n * 8).to_bytes(n, 'little') if n else b""
+
+
+def _write_file(path, size, rng, fill, mtime):
+    head = _random_bytes(rng, min(size, UNIQUE_HEAD))
+    with open(path, 'wb') as f:
+        f.write(head)
+        remaining = size - len(head)
+        while remaining > 0:
+            n = min(remaining, len(fill))
+            f.write(fill[:n])
+            remaining -= n
+    os.utime(path, (mtime, mtime))
+
+
+def make_card(folder, profile="mixed", scale=1.0, seed=0, size_scale=1.0,
+              files_per_folder=FILES_PER_FOLDER, start_time=1700000000):
+    """
+    Writes one synthetic card into folder. scale multiplies the file
+    counts and size_scale the file sizes. Returns {"files": n, "bytes": n}
+    for the media written.
+    """
+    rng = random.Random(seed)
+    fill = _random_bytes(rng, FILL_BLOCK)
+    folder = Path(folder)
+    totals = {"files": 0, "bytes": 0}
+    misc = folder / "MISC"
+    misc.mkdir(parents=True, exist_ok=True)
+    (misc / "AUTOPLAY.INF").write_text("[autorun]\n")
+    mtime = start_time
+    number = 0
+    for extension, prefix, count, average in PROFILES[profile]:
+        for i in range(max(1, int(count * scale))):
+            size = max(1, int(rng.uniform(0.8, 1.2) * average * size_scale))
+            if extension == "WAV":
+                sub = folder / "SOUND"
+                name = f"{prefix}{i + 1:04d}_LR.WAV"
+            else:
+                number += 1
+                sub = folder / "DCIM" / f"{100 + (number - 1) // files_per_folder}CANON"
+                name = f"{prefix}{(number - 1) % files_per_folder + 1:04d}.{extension}"
+                if extension == "MP4":
+                    # Cameras write a small index file next to each clip
+                    sub.mkdir(parents=True, exist_ok=True)
+                    (sub / f"{Path(name).stem}.CTG").write_bytes(b"\0" * 512)
+            sub.mkdir(parents=True, exist_ok=True)
+            mtime += 2
+            _write_file(sub / name, size, rng, fill, mtime)
+            totals["files"] += 1
+            totals["bytes"] += size
+    return totals
+
+
+def make_cards(root, count, profile="mixed", scale=1.0, seed=0, size_scale=1.0):
+    """Writes count cards named CARD1, CARD2, ... under root. Returns {folder: totals}."""
+    cards = {}
+    for n in range(1, count + 1):
+        folder = Path(root) / f"CARD{n}"
+        cards[folder] = make_card(folder, profile, scale, seed + n, size_scale)
+    return cards
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic SD card folders.")
+    parser.add_argument("root", help="folder to create the cards in")
+    parser.add_argument("--cards", type=int, default=1)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the file counts of the profile")
+    parser.add_argument("--size-scale", type=float, default=1.0, help="multiplies the file sizes of the profile")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    cards = make_cards(args.root, args.cards, args.profile, args.scale, args.seed, args.size_scale)
+    print(json.dumps({str(folder): totals for folder, totals in cards.items()}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
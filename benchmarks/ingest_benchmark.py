@@ -0,0 +1,356 @@
+"""
+End-to-end ingest benchmark on synthetic cards (see fixtures.py).
+
+    python benchmarks/ingest_benchmark.py --cards 2 --scale 0.05 --card-speed 90
+    python benchmarks/ingest_benchmark.py --save-baseline ingest.json
+    python benchmarks/ingest_benchmark.py --baseline ingest.json
+
+Scenarios, run in this order on the same cards:
+    scan        scan_media_manifest of every card
+    single      transfer_sd_card of the first card
+    parallel    process_cameras_parallel of all cards (the path the GUI uses)
+    wipe        plan_wipe + wipe_files of what parallel imported
+
+Every scenario reports seconds, MB/s and files/s; transfers also report
+the rate of progress events the GUI would receive. --card-speed limits
+reads per card to emulate a card (about 90 MB/s for UHS-I, 250 MB/s for
+UHS-II); the generated files are usually in the page cache, so without it
+the card side is unrealistically fast. --dest-latency adds a round-trip
+before and after every file written, like creating and closing a file on
+a network share, to exercise --adaptive. --memory traces Python allocations
+to report peak memory, which slows the run down.
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+import main as engine  # noqa: E402
+from drive_backends import DirectoryDriveBackend, set_backend  # noqa: E402
+from fixtures import PROFILES, make_cards  # noqa: E402
+from import_ledger import ImportLedger  # noqa: E402
+from remove_sd_files import WIPE_WORKERS, plan_wipe, wipe_files  # noqa: E402
+from run_report import RunRecorder  # noqa: E402
+
+MB = 1024 * 1024
+
+# A metric worse than the baseline by more than this fraction is a regression
+REGRESSION_THRESHOLD = 0.15
+# Metrics where a larger value is better; for all others smaller is better
+HIGHER_IS_BETTER = ("mb_per_s", "files_per_s")
+SCENARIOS = ("scan", "single", "parallel", "wipe")
+
+
+class ReadThrottle:
+    """Paces the reads from one card to rate bytes per second, across all threads reading it."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.available_at = time.monotonic()
+
+    def consume(self, nbytes):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.available_at)
+            self.available_at = start + nbytes / self.rate
+            delay = self.available_at - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class EmulatedCards:
+    """
+    Makes the copy engine read the given card folders at card speed by
+    pacing its progress callbacks, which run on the copying thread (the
+    writer for pipelined copies, whose bounded buffers then hold the
+    reader back). latency is slept before each file, like a card's access
+    time, and dest_latency before and after it, like a network share's
+    round-trips to create and close it. Use as a context manager.
+    """
+
+    def __init__(self, folders, rate=None, latency=0.0, dest_latency=0.0):
+        self.throttles = {str(f): ReadThrottle(rate) for f in folders} if rate else {}
+        self.latency = latency
+        self.dest_latency = dest_latency
+        self.saved = None
+
+    def _throttle_for(self, src):
+        src = str(src)
+        for folder, throttle in self.throttles.items():
+            if src.startswith(folder):
+                return throttle
+        return None
+
+    def _wrap(self, src, progress):
+        if self.latency:
+            time.sleep(self.latency)
+        throttle = self._throttle_for(src)
+        if throttle is None:
+            return progress
+
+        def paced(nbytes):
+            throttle.consume(nbytes)
+            if progress is not None:
+                progress(nbytes)
+        return paced
+
+    def __enter__(self):
+        copy_file = engine.copy_file
+        pipelined_copy = engine.PipelinedCopier.copy
+        self.saved = (copy_file, pipelined_copy)
+        wrap = self._wrap
+        dest_latency = self.dest_latency
+
+        def emulated_copy_file(src, dst, progress=None, *args, **kwargs):
+            if dest_latency:
+                time.sleep(dest_latency)
+            result = copy_file(src, dst, wrap(src, progress), *args, **kwargs)
+            if dest_latency:
+                time.sleep(dest_latency)
+            return result
+
+        def emulated_pipelined_copy(copier, src, dst, progress=None, *args, **kwargs):
+            if dest_latency:
+                time.sleep(dest_latency)
+            return pipelined_copy(copier, src, dst, wrap(src, progress), *args, **kwargs)
+
+        engine.copy_file = emulated_copy_file
+        engine.PipelinedCopier.copy = emulated_pipelined_copy
+        return self
+
+    def __exit__(self, *exc):
+        engine.copy_file, engine.PipelinedCopier.copy = self.saved
+
+
+class EventCounter:
+    """Stands in for the GUI callbacks and counts the events they would post."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = 0
+        self.results = {}
+
+    def _count(self):
+        with self.lock:
+            self.events += 1
+
+    def progress_callback(self, idx, files, nbytes, copied=True):
+        self._count()
+
+    def speed_callback(self, idx, speed):
+        self._count()
+
+    def result_callback(self, idx, message):
+        self._count()
+        self.results[idx] = message
+
+
+def measure(run, trace_memory):
+    """Runs run() and returns (its result, seconds, peak traced bytes or None)."""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = run()
+    finally:
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def rates(seconds, files, nbytes, peak=None, events=None):
+    report = {
+        "seconds": round(seconds, 4),
+        "files": files,
+        "mb": round(nbytes / MB, 2),
+        "mb_per_s": round(nbytes / MB / seconds, 2) if seconds else 0.0,
+        "files_per_s": round(files / seconds, 1) if seconds else 0.0,
+    }
+    if events is not None:
+        report["ui_events"] = events
+        report["ui_events_per_s"] = round(events / seconds, 1) if seconds else 0.0
+    if peak is not None:
+        report["peak_memory_mb"] = round(peak / MB, 2)
+    return report
+
+
+def bench_scan(folders, args):
+    def run():
+        return [engine.scan_media_manifest(str(folder)) for folder in folders]
+    manifests, seconds, peak = measure(run, args.memory)
+    return rates(seconds, sum(m.total_files for m in manifests), sum(m.total_bytes for m in manifests), peak)
+
+
+def bench_single(folders, dest, args):
+    counter = EventCounter()
+    folder = str(folders[0])
+
+    def run():
+        engine.transfer_sd_card(
+            1, folder, dest / "Pictures", dest / "Videos", dest / "Sound", threading.Event(),
+            counter.speed_callback, counter.result_callback, pipelined=args.overlap,
+        )
+    _, seconds, peak = measure(run, args.memory)
+    manifest = engine.scan_media_manifest(folder)
+    return rates(seconds, manifest.total_files, manifest.total_bytes, peak, counter.events)
+
+
+def bench_parallel(folders, dest, args):
+    counter = EventCounter()
+    ledger = ImportLedger.for_main_folder(dest)
+    drives = [(str(folder), folder.name, "") for folder in folders]
+
+    def run():
+        return engine.process_cameras_parallel(
+            threading.Event(), counter.speed_callback, counter.result_callback,
+            max_workers=args.workers, per_source=args.per_card, per_destination=args.per_disk,
+            pipelined=args.overlap, ledger=ledger, checksums=args.checksums, verify=args.verify,
+            drives=drives, picture_base=dest / "Pictures", video_base=dest / "Videos",
+            sound_base=dest / "Sound", progress_callback=counter.progress_callback,
+            journal_dir=dest, eject=False, adaptive=args.adaptive,
+        )
+    cards, seconds, peak = measure(run, args.memory)
+    ledger.close()
+    report = rates(seconds, sum(len(c.manifest.copied) for c in cards), sum(c.bytes_done for c in cards),
+                   peak, counter.events)
+    return report, cards
+
+
+def bench_wipe(cards, dest, args):
+    ledger = ImportLedger.for_main_folder(dest)
+    batches = []
+    recorder = RunRecorder()
+
+    def run():
+        cancel_event = threading.Event()
+        deleted = nbytes = 0
+        with ThreadPoolExecutor(max_workers=WIPE_WORKERS) as pool:
+            for card in cards:
+                deletable, kept = plan_wipe(card.drive, card.volume, engine.iter_media_files, card.manifest, ledger)
+                done, refused = wipe_files(pool, deletable, cancel_event, lambda d, r: batches.append(d),
+                                           recorder, card.name)
+                deleted += done
+                nbytes += sum(f.size for f, _ in deletable)
+        return deleted, nbytes
+    (deleted, nbytes), seconds, peak = measure(run, args.memory)
+    ledger.close()
+    report = rates(seconds, deleted, nbytes, peak, len(batches))
+    phases = {}
+    for card in recorder.report()["cards"].values():
+        for phase, phase_seconds in card["phase_seconds"].items():
+            phases[phase] = round(phases.get(phase, 0.0) + phase_seconds, 6)
+    # Summed over the removal workers, so it can exceed seconds
+    report["phase_seconds"] = phases
+    return report
+
+
+def run_benchmarks(args, workdir):
+    cards_dir = workdir / "cards"
+    folders = list(make_cards(cards_dir, args.cards, args.profile, args.scale, args.seed, args.size_scale))
+    set_backend(DirectoryDriveBackend(folders))
+    results = {}
+    latency = args.card_latency / 1000
+    with EmulatedCards(folders, args.card_speed * MB if args.card_speed else None, latency, args.dest_latency / 1000):
+        if "scan" in args.scenarios:
+            results["scan"] = bench_scan(folders, args)
+        if "single" in args.scenarios:
+            dest = workdir / "single"
+            results["single"] = bench_single(folders, dest, args)
+            shutil.rmtree(dest, ignore_errors=True)
+        if "parallel" in args.scenarios or "wipe" in args.scenarios:
+            dest = workdir / "parallel"
+            report, cards = bench_parallel(folders, dest, args)
+            if "parallel" in args.scenarios:
+                results["parallel"] = report
+            if "wipe" in args.scenarios:
+                results["wipe"] = bench_wipe(cards, dest, args)
+            shutil.rmtree(dest, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Returns a list of regressions: metrics worse than the baseline by more than threshold."""
+    regressions = []
+    for scenario, metrics in results.items():
+        for name, value in metrics.items():
+            old = baseline.get(scenario, {}).get(name)
+            if not old or not isinstance(value, (int, float)) or name in ("files", "mb", "ui_events"):
+                continue
+            if name in HIGHER_IS_BETTER:
+                change = old / value - 1 if value else float("inf")
+            else:
+                change = value / old - 1
+            if change > threshold:
+                regressions.append({"scenario": scenario, "metric": name, "baseline": old,
+                                    "value": value, "worse_by": round(change, 4)})
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark scanning, copying and wiping synthetic cards.")
+    parser.add_argument("--cards", type=int, default=2)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed")
+    parser.add_argument("--scale", type=float, default=0.05, help="multiplies the profile's file counts")
+    parser.add_argument("--size-scale", type=float, default=0.1, help="multiplies the profile's file sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenario", dest="scenarios", action="append", choices=SCENARIOS,
+                        help="run only this scenario (repeatable)")
+    parser.add_argument("--card-speed", type=float, default=0, metavar="MB_S", help="emulated read speed per card")
+    parser.add_argument("--card-latency", type=float, default=0, metavar="MS", help="emulated access time per file")
+    parser.add_argument("--dest-latency", type=float, default=0, metavar="MS", help="emulated network round-trip per file written")
+    parser.add_argument("--workers", type=int, default=engine.MAX_WORKERS)
+    parser.add_argument("--per-card", type=int, default=engine.PER_SOURCE_LIMIT)
+    parser.add_argument("--per-disk", type=int, default=engine.PER_DESTINATION_LIMIT)
+    parser.add_argument("--overlap", action="store_true", help="use the pipelined copier")
+    parser.add_argument("--adaptive", action="store_true", help="tune the files in flight per card")
+    parser.add_argument("--checksums", action="store_true")
+    parser.add_argument("--verify", action="store_true")
+    parser.add_argument("--memory", action="store_true", help="report peak traced memory (slower)")
+    parser.add_argument("--workdir", help="where to create the cards (default: a temporary folder)")
+    parser.add_argument("--keep", action="store_true", help="keep the generated cards")
+    parser.add_argument("--save-baseline", metavar="FILE", help="write the results to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against saved results")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.scenarios = args.scenarios or list(SCENARIOS)
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="sdcopier_bench_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    try:
+        results = run_benchmarks(args, workdir)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = {"config": {k: v for k, v in vars(args).items() if k not in ("save_baseline", "baseline", "workdir", "keep")},
+              "results": results}
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        output["regressions"] = compare(results, baseline["results"], args.threshold)
+        status = 1 if output["regressions"] else 0
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+    print(json.dumps(output, indent=2))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
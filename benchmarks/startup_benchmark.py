@@ -0,0 +1,100 @@
+"""
+Measures how long SD Copier takes to show its window.
+
+    python benchmarks/startup_benchmark.py --runs 10
+    python benchmarks/startup_benchmark.py --exe dist/main.exe --baseline startup.json
+
+Each run starts the app with SDCOPIER_STARTUP_BENCH set; the app writes the
+time its window was mapped and quits. Results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# A run slower than the baseline median by more than this fraction fails
+REGRESSION_THRESHOLD = 0.20
+# Seconds to wait for the window before a run is counted as failed
+RUN_TIMEOUT = 60
+
+
+def time_startup(command, cwd):
+    """Returns seconds from process start to the first window, or None if it never showed."""
+    fd, marker = tempfile.mkstemp(prefix="sdcopier_startup_", suffix=".txt")
+    os.close(fd)
+    env = dict(os.environ, SDCOPIER_STARTUP_BENCH=marker)
+    try:
+        start = time.time()
+        try:
+            subprocess.run(command, cwd=cwd, env=env, timeout=RUN_TIMEOUT,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except subprocess.TimeoutExpired:
+            return None
+        with open(marker, encoding='utf-8') as f:
+            for line in f:
+                if line.startswith("first-window "):
+                    return float(line.split()[1]) - start
+        return None
+    finally:
+        os.remove(marker)
+
+
+def summarize(samples):
+    return {
+        "runs": len(samples),
+        "median": round(statistics.median(samples), 4),
+        "min": round(min(samples), 4),
+        "max": round(max(samples), 4),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time SD Copier's startup to first window.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--exe", help="packaged executable to time instead of python main.py")
+    parser.add_argument("--save-baseline", metavar="FILE", help="write the result to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against a saved result")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="allowed slowdown of the median, as a fraction")
+    args = parser.parse_args(argv)
+
+    if args.exe:
+        command = [str(Path(args.exe).resolve())]
+    else:
+        command = [sys.executable, "main.py"]
+
+    samples = []
+    for _ in range(args.runs):
+        elapsed = time_startup(command, REPO_DIR)
+        if elapsed is None:
+            print(json.dumps({"error": "window never appeared", "command": command}))
+            return 1
+        samples.append(elapsed)
+
+    result = summarize(samples)
+    result["command"] = "exe" if args.exe else "python"
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        change = result["median"] / baseline["median"] - 1
+        result["baseline_median"] = baseline["median"]
+        result["change"] = round(change, 4)
+        result["regression"] = change > args.threshold
+        status = 1 if result["regression"] else 0
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    print(json.dumps(result))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+import io
+import re
+import struct
+import time
+from pathlib import Path
+
+# Bytes read from the start of a picture to find its EXIF
+HEADER_BYTES = 128 * 1024
+# Most atoms or chunks walked through before giving up on a file
+MAX_BOXES = 64
+# Seconds between the QuickTime epoch (1904) and the Unix epoch
+QUICKTIME_EPOCH_OFFSET = 2082844800
+
+TIFF_EXTENSIONS = {'.cr2', '.nef', '.nrw', '.arw', '.srf', '.sr2', '.dng', '.pef', '.orf', '.rw2', '.tif', '.tiff'}
+JPEG_EXTENSIONS = {'.jpg', '.jpeg'}
+CR3_EXTENSIONS = {'.cr3'}
+HEIF_EXTENSIONS = {'.heic', '.heif'}
+QUICKTIME_EXTENSIONS = {'.mp4', '.mov', '.m4a'}
+WAV_EXTENSIONS = {'.wav'}
+
+# TIFF tags
+MODEL = 0x0110
+DATE_TIME = 0x0132
+EXIF_IFD = 0x8769
+DATE_TIME_ORIGINAL = 0x9003
+TIFF_ASCII = 2
+TIFF_LONG = 4
+TIFF_IFD = 13
+
+
+def _tiff_tags(f, base, offset, order, wanted):
+    """{tag: value} of the wanted tags in the IFD at offset; ASCII values as str, others as int."""
+    f.seek(base + offset)
+    count_bytes = f.read(2)
+    if len(count_bytes) < 2:
+        return {}
+    count = struct.unpack(order + 'H', count_bytes)[0]
+    entries = f.read(12 * count)
+    tags = {}
+    for i in range(len(entries) // 12):
+        tag, kind, n, raw = struct.unpack(order + 'HHI4s', entries[12 * i:12 * i + 12])
+        if tag not in wanted:
+            continue
+        if kind == TIFF_ASCII:
+            if n <= 4:
+                data = raw[:n]
+            else:
+                f.seek(base + struct.unpack(order + 'I', raw)[0])
+                data = f.read(min(n, 256))
+            tags[tag] = data.split(b'\x00', 1)[0].decode('ascii', 'replace').strip()
+        elif kind in (TIFF_LONG, TIFF_IFD):
+            tags[tag] = struct.unpack(order + 'I', raw)[0]
+    return tags
+
+
+def read_tiff(f, base=0, exif_only=False):
+    """
+    Returns (DateTimeOriginal or DateTime, Model) from the TIFF structure
+    at base, None for each one missing. exif_only reads base as an EXIF
+    IFD itself, as in the CMT2 box of a CR3.
+    """
+    f.seek(base)
+    header = f.read(8)
+    if len(header) < 8 or header[:2] not in (b'II', b'MM'):
+        return None, None
+    order = '<' if header[:2] == b'II' else '>'
+    first = struct.unpack(order + 'I', header[4:8])[0]
+    if exif_only:
+        tags = _tiff_tags(f, base, first, order, {DATE_TIME_ORIGINAL})
+        return tags.get(DATE_TIME_ORIGINAL) or None, None
+    ifd0 = _tiff_tags(f, base, first, order, {MODEL, DATE_TIME, EXIF_IFD})
+    taken = None
+    if ifd0.get(EXIF_IFD):
+        taken = _tiff_tags(f, base, ifd0[EXIF_IFD], order, {DATE_TIME_ORIGINAL}).get(DATE_TIME_ORIGINAL)
+    return taken or ifd0.get(DATE_TIME) or None, ifd0.get(MODEL) or None
+
+
+def parse_timestamp(text):
+    """
+    Seconds since the epoch of a local date and time written as digits
+    with any separators ('2024:05:01 13:02:03', '2024-05-01', ...), or
+    None when it holds no valid date.
+    """
+    digits = re.findall(r'\d+', text or "")
+    if len(digits) < 3:
+        return None
+    try:
+        fields = [int(d) for d in digits[:6]] + [0] * (6 - min(6, len(digits)))
+        if fields[0] < 1970 or not 1 <= fields[1] <= 12 or not 1 <= fields[2] <= 31:
+            return None
+        return time.mktime(tuple(fields) + (0, 0, -1))
+    except (ValueError, OverflowError):
+        return None
+
+
+def _jpeg_exif(head):
+    """Offset of the TIFF structure in a JPEG's EXIF segment, or None."""
+    if head[:2] != b'\xff\xd8':
+        return None
+    pos = 2
+    while pos + 4 <= len(head):
+        if head[pos] != 0xFF:
+            return None
+        marker = head[pos + 1]
+        if marker == 0xDA:
+            return None
+        length = struct.unpack('>H', head[pos + 2:pos + 4])[0]
+        if marker == 0xE1 and head[pos + 4:pos + 10] == b'Exif\x00\x00':
+            return pos + 10
+        pos += 2 + length
+    return None
+
+
+def _quicktime_created(f):
+    """Creation time in the mvhd atom of a MP4/MOV, reading only atom headers."""
+    end = f.seek(0, io.SEEK_END)
+    pos, limit = 0, end
+    for _ in range(MAX_BOXES):
+        if pos + 8 > limit:
+            return None
+        f.seek(pos)
+        size, kind = struct.unpack('>I4s', f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = limit - pos
+        if size < header:
+            return None
+        if kind == b'moov':
+            # Walk into moov; its children hold mvhd
+            pos, limit = pos + header, pos + size
+            continue
+        if kind == b'mvhd':
+            data = f.read(12)
+            if len(data) < 12:
+                return None
+            if data[0] == 1:
+                created = struct.unpack('>Q', data[4:12])[0]
+            else:
+                created = struct.unpack('>I', data[4:8])[0]
+            # Cameras without a clock write zero
+            return created - QUICKTIME_EPOCH_OFFSET if created > QUICKTIME_EPOCH_OFFSET else None
+        pos += size
+    return None
+
+
+def _wav_bext(f):
+    """(origination time, originator) from the bext chunk of a broadcast WAV."""
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+        return None, None
+    pos = 12
+    for _ in range(MAX_BOXES):
+        f.seek(pos)
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return None, None
+        kind, size = struct.unpack('<4sI', chunk)
+        if kind == b'bext':
+            data = f.read(346)
+            if len(data) < 346:
+                return None, None
+            originator = data[256:288].split(b'\x00', 1)[0].decode('ascii', 'replace').strip()
+            # OriginationDate and OriginationTime follow each other without a separator
+            stamp = data[320:330].decode('ascii', 'replace') + " " + data[330:338].decode('ascii', 'replace')
+            return parse_timestamp(stamp), originator or None
+        # Chunks are padded to an even size
+        pos += 8 + size + (size & 1)
+    return None, None
+
+
+def read_capture_info(path):
+    """
+    Returns (capture time in seconds since the epoch, camera model) of a
+    media file, None for each one not found. Reads only headers: EXIF in
+    JPEG, TIFF-based RAW, CR3 and HEIC, the mvhd atom of MP4/MOV and the
+    bext chunk of broadcast WAV. Other formats give (None, None).
+    """
+    suffix = Path(path).suffix.lower()
+    with open(path, 'rb') as f:
+        if suffix in QUICKTIME_EXTENSIONS:
+            return _quicktime_created(f), None
+        if suffix in WAV_EXTENSIONS:
+            return _wav_bext(f)
+        if suffix in TIFF_EXTENSIONS:
+            taken, model = read_tiff(f)
+            return parse_timestamp(taken), model
+        if suffix not in JPEG_EXTENSIONS | CR3_EXTENSIONS | HEIF_EXTENSIONS:
+            return None, None
+        head = f.read(HEADER_BYTES)
+    data = io.BytesIO(head)
+    if suffix in JPEG_EXTENSIONS:
+        start = _jpeg_exif(head)
+        if start is None:
+            return None, None
+        taken, model = read_tiff(data, start)
+    elif suffix in CR3_EXTENSIONS:
+        # IFD0 is in the CMT1 box and the EXIF IFD in CMT2, each a TIFF structure
+        cmt1, cmt2 = head.find(b'CMT1'), head.find(b'CMT2')
+        taken, model = read_tiff(data, cmt1 + 4) if cmt1 >= 0 else (None, None)
+        if cmt2 >= 0:
+            taken = read_tiff(data, cmt2 + 4, exif_only=True)[0] or taken
+    else:
+        # HEIF keeps EXIF as an item, usually near the start: 'Exif\0\0' then TIFF
+        start = head.find(b'Exif\x00\x00')
+        if start < 0:
+            return None, None
+        taken, model = read_tiff(data, start + 6)
+    return parse_timestamp(taken), model
@@ -0,0 +1,99 @@
+import threading
+import time
+
+# Most files of one card an adaptive card copies at once
+ADAPTIVE_MAX_IN_FLIGHT = 8
+# Shortest measurement at one level; it also lasts until every slot has
+# finished a file, so large files are not judged on a partial copy
+ADAPT_INTERVAL = 1.0
+# A step up is kept only if it raises MB/s by this fraction, a step down
+# unless it lowers MB/s by more than it
+ADAPT_GAIN = 0.05
+# Intervals to stay at a level the probes settled on before probing again
+ADAPT_HOLD = 8
+
+
+class AdaptiveConcurrency:
+    """
+    Chooses how many files of one card are copied at once, for
+    destinations where each file costs round-trips (an SMB share) and one
+    file at a time leaves the link idle.
+
+    Starts at one file and hill-climbs on measured throughput: after each
+    interval a step to one more file is kept while MB/s rises by at least
+    ADAPT_GAIN, otherwise it goes back to the level before and holds
+    there. After ADAPT_HOLD intervals it probes again, alternating up and
+    down; a step down is kept while MB/s holds up, so it backs off to the
+    fewest files that reach the speed when the link slows down.
+    """
+
+    def __init__(self, maximum=ADAPTIVE_MAX_IN_FLIGHT, interval=ADAPT_INTERVAL):
+        self.maximum = max(1, int(maximum))
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.limit = 1
+        # (level, MB/s) measured before the step being tried, or None when holding
+        self.previous = None
+        self.direction = 1
+        self.hold = 0
+        self.started = None
+        self.nbytes = 0
+        self.files = 0
+        # (seconds since the first file, level, bytes per second) per interval
+        self.history = []
+        self.first = None
+
+    def file_done(self, nbytes, now=None):
+        """Counts a copied file of nbytes; may change the limit."""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            if self.started is None:
+                # The first file's time to finish is not known; measure from it
+                self.started = self.first = now
+                return
+            self.nbytes += nbytes
+            self.files += 1
+            elapsed = now - self.started
+            if elapsed < self.interval or self.files < self.limit:
+                return
+            rate = self.nbytes / elapsed
+            self.history.append((round(now - self.first, 3), self.limit, round(rate)))
+            self._adjust(rate)
+            self.started = now
+            self.nbytes = self.files = 0
+
+    def _step(self):
+        """The next level in the probing direction, turning around at the ends."""
+        if not 1 <= self.limit + self.direction <= self.maximum:
+            self.direction = -self.direction
+        return min(self.maximum, max(1, self.limit + self.direction))
+
+    def _adjust(self, rate):
+        if self.previous is not None:
+            level, previous_rate = self.previous
+            if self.direction > 0:
+                kept = rate > previous_rate * (1 + ADAPT_GAIN)
+            else:
+                kept = rate >= previous_rate * (1 - ADAPT_GAIN)
+            if kept:
+                # Keep going the same way, measured against the best rate
+                # so far, so small losses stepping down do not add up
+                self.previous = (self.limit, max(rate, previous_rate))
+                following = self.limit + self.direction
+                if 1 <= following <= self.maximum:
+                    self.limit = following
+                    return
+            else:
+                self.limit = level
+                # Probe the other way next time
+                self.direction = -self.direction
+            self.previous = None
+            self.hold = ADAPT_HOLD
+            return
+        if self.hold:
+            self.hold -= 1
+            return
+        step = self._step()
+        if step != self.limit:
+            self.previous = (self.limit, rate)
+            self.limit = step
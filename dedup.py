@@ -0,0 +1,101 @@
+import os
+import threading
+from pathlib import Path
+
+# Bytes hashed from each end of a file for the cheap partial-hash check
+PARTIAL_HASH_BYTES = 64 * 1024
+HASH_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+class _Known:
+    """A file already at the destination; its hashes are filled in on demand."""
+    __slots__ = ("path", "partial", "full")
+
+    def __init__(self, path, full=None):
+        self.path = Path(path)
+        self.partial = None
+        self.full = full
+
+
+class DedupIndex:
+    """
+    Finds card files whose content is already at the destination, from
+    earlier imports or from other cards in the same run.
+
+    Checks go from cheap to expensive: same size, then a hash of the first
+    and last PARTIAL_HASH_BYTES, then a full hash, which is only computed
+    when everything else matched. Hashes of known files are cached.
+    new_hasher() must return a hashlib-style object, the same kind used
+    for the digests passed to add().
+    """
+
+    def __init__(self, new_hasher):
+        self.new_hasher = new_hasher
+        self.by_size = {}
+        self.lock = threading.Lock()
+
+    def add(self, path, size, digest=None):
+        with self.lock:
+            self.by_size.setdefault(int(size), []).append(_Known(path, digest))
+
+    def add_many(self, entries):
+        """Adds (path, size) pairs, e.g. the destinations in an ImportLedger."""
+        for path, size in entries:
+            if path:
+                self.add(path, size)
+
+    def find(self, path, size):
+        """
+        Returns (existing_path, digest) for a known file with the same content
+        as path, or None. Unreadable known files are dropped from the index.
+        """
+        with self.lock:
+            candidates = list(self.by_size.get(int(size), ()))
+        if not candidates:
+            return None
+        source_partial = self._partial_hash(path, size)
+        source_full = None
+        for known in candidates:
+            try:
+                if known.partial is None:
+                    known.partial = self._partial_hash(known.path, size)
+                if known.partial != source_partial:
+                    continue
+                if source_full is None:
+                    source_full = self._full_hash(path)
+                if known.full is None:
+                    known.full = self._full_hash(known.path)
+            except OSError:
+                self._forget(size, known)
+                continue
+            if known.full == source_full:
+                return known.path, source_full
+        return None
+
+    def _forget(self, size, known):
+        with self.lock:
+            entries = self.by_size.get(int(size), [])
+            if known in entries:
+                entries.remove(known)
+
+    def _partial_hash(self, path, size):
+        hasher = self.new_hasher()
+        with open(path, 'rb') as f:
+            if size <= 2 * PARTIAL_HASH_BYTES:
+                hasher.update(f.read())
+            else:
+                hasher.update(f.read(PARTIAL_HASH_BYTES))
+                f.seek(-PARTIAL_HASH_BYTES, os.SEEK_END)
+                hasher.update(f.read(PARTIAL_HASH_BYTES))
+        return hasher.digest()
+
+    def _full_hash(self, path):
+        hasher = self.new_hasher()
+        buf = memoryview(bytearray(HASH_BUFFER_SIZE))
+        with open(path, 'rb') as f:
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                hasher.update(buf[:n])
+        return hasher.hexdigest()
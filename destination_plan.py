@@ -0,0 +1,120 @@
+import os
+import re
+import string
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from transfer_journal import PART_SUFFIX
+
+# {ingest} in a name: the time the card was planned
+TIMESTAMP_FORMAT = "%d-%m-%Y-%H"
+# Name of a copied file, without its extension; "/" makes subfolders of
+# the category's folder. The default names files as before templates existed.
+DEFAULT_NAMING = "{stem}_{ingest}"
+# stem: the name on the card; ingest: see TIMESTAMP_FORMAT; date, time,
+# year, month, day: when the file was captured; camera: the camera model;
+# card: the card's name (cam<n>)
+NAMING_FIELDS = ("stem", "ingest", "date", "time", "year", "month", "day", "camera", "card")
+# Fields that need each file's capture time or camera read from its header
+CAPTURE_FIELDS = {"date", "time", "year", "month", "day", "camera"}
+# Characters Windows does not allow in names
+UNSAFE_CHARACTERS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+
+class NamingTemplate:
+    """
+    A template such as "{date}/{camera}/{stem}" for where files go, e.g.
+    2024-05-01/Canon EOS R6/IMG_0001.CR3. Raises ValueError for unknown
+    fields and for folders that are empty or lead out of the category's
+    folder.
+    """
+
+    def __init__(self, template=DEFAULT_NAMING):
+        self.template = template.replace("\\", "/")
+        fields = set()
+        try:
+            for _, field, _, _ in string.Formatter().parse(self.template):
+                if field is not None:
+                    fields.add(field)
+        except ValueError as e:
+            raise ValueError(f"Bad naming template {template!r}: {e}")
+        unknown = fields - set(NAMING_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown field {{{sorted(unknown)[0]}}} in {template!r}; use {', '.join(NAMING_FIELDS)}")
+        if any(part.strip() in ("", ".", "..") or ":" in part for part in self.template.split("/")):
+            raise ValueError(f"Naming template {template!r} has an empty or relative folder")
+        self.needs_capture = bool(fields & CAPTURE_FIELDS)
+
+    def render(self, stem, ingest, captured=None, camera=None, card=""):
+        """The folder names and the file name (without extension) for one file."""
+        moment = datetime.fromtimestamp(captured) if captured is not None else datetime.now()
+        values = {
+            "stem": stem, "ingest": ingest, "card": card or "card", "camera": camera or "unknown",
+            "date": moment.strftime("%Y-%m-%d"), "time": moment.strftime("%H%M%S"),
+            "year": moment.strftime("%Y"), "month": moment.strftime("%m"), "day": moment.strftime("%d"),
+        }
+        # Values never add folders of their own
+        safe = {key: UNSAFE_CHARACTERS.sub("_", str(value)).strip(" .") or "_" for key, value in values.items()}
+        return [part.format(**safe) for part in self.template.split("/")]
+
+
+class DestinationPlan:
+    """
+    Chooses where each file of a card is copied before any copy starts.
+
+    A file named IMG_0001.JPG becomes IMG_0001_<dd-mm-YYYY-HH>.JPG in the
+    folder for its category, or whatever naming (a NamingTemplate or its
+    text) makes of it; when that name is taken (by a file already there,
+    an interrupted copy's .part file or another file of this plan, e.g.
+    IMG_0001.JPG from both DCIM/100CANON and DCIM/101CANON) a number is
+    added: IMG_0001_<time>_2.JPG. Each folder is created and listed once;
+    after that names are checked in memory, ignoring case as Windows does.
+    """
+
+    def __init__(self, destinations, timestamp=None, naming=DEFAULT_NAMING):
+        self.destinations = destinations
+        self.timestamp = timestamp or datetime.now().strftime(TIMESTAMP_FORMAT)
+        self.naming = naming if isinstance(naming, NamingTemplate) else NamingTemplate(naming)
+        self.lock = threading.Lock()
+        self.taken = {}
+
+    def _names_in(self, folder):
+        names = self.taken.get(folder)
+        if names is None:
+            folder.mkdir(parents=True, exist_ok=True)
+            with os.scandir(folder) as entries:
+                names = {entry.name.casefold() for entry in entries}
+            self.taken[folder] = names
+        return names
+
+    def path_for(self, category, name, **fields):
+        """
+        Where the naming puts a file called name, before checking whether
+        that is taken. fields are the capture time, camera and card for
+        NamingTemplate.render.
+        """
+        stem, suffix = os.path.splitext(name)
+        *folders, base = self.naming.render(stem, self.timestamp, **fields)
+        return Path(self.destinations[category]).joinpath(*folders, base + suffix)
+
+    def assign(self, category, name, **fields):
+        """Returns a destination path for a file called name that no other file uses."""
+        path = self.path_for(category, name, **fields)
+        folder = path.parent
+        base, suffix = os.path.splitext(path.name)
+        with self.lock:
+            names = self._names_in(folder)
+            candidate = path.name
+            n = 2
+            while candidate.casefold() in names or (candidate + PART_SUFFIX).casefold() in names:
+                candidate = f"{base}_{n}{suffix}"
+                n += 1
+            names.add(candidate.casefold())
+        return folder / candidate
+
+    def reserve(self, path):
+        """Keeps path, e.g. the destination of a copy being resumed, from being assigned."""
+        path = Path(path)
+        with self.lock:
+            self._names_in(path.parent).add(path.name.casefold())
@@ -0,0 +1,337 @@
+"""
+Finding, identifying and ejecting SD cards.
+
+Each backend lists cards as (drive, volume_name, size_display) tuples,
+where drive is the path the card is read from ("E:" on Windows, the mount
+point on Linux, any folder for DirectoryDriveBackend). get_backend()
+picks one for this machine; set SDCOPIER_FAKE_CARDS to a list of folders
+(separated by os.pathsep) to treat those folders as cards instead.
+"""
+import os
+import re
+import select
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+# Folders listed here are used as cards instead of the real drives
+FAKE_CARDS_ENV = "SDCOPIER_FAKE_CARDS"
+
+# GetDriveTypeW result for removable media (SD readers, USB sticks)
+DRIVE_REMOVABLE = 2
+# SetErrorMode flag that stops Windows asking to insert a disk in empty readers
+SEM_FAILCRITICALERRORS = 0x0001
+
+PROC_MOUNTS = "/proc/self/mounts"
+SYS_CLASS_BLOCK = "/sys/class/block"
+DISK_BY_LABEL = "/dev/disk/by-label"
+DISK_BY_UUID = "/dev/disk/by-uuid"
+
+
+def format_capacity(total, used):
+    size_gb = total / (1024 ** 3)
+    used_gb = used / (1024 ** 3)
+    return f"{size_gb:.1f} GB (used: {used_gb:.1f} GB)"
+
+
+def describe_size(path):
+    try:
+        total, used, free = shutil.disk_usage(path)
+    except OSError:
+        return "Unknown"
+    return format_capacity(total, used)
+
+
+class DriveBackend:
+    """Interface of a drive backend; the defaults suit any mounted folder."""
+
+    def list_drives(self):
+        """Returns (drive, volume_name, size_display) for every card present."""
+        raise NotImplementedError
+
+    def volume_identity(self, drive, volname=""):
+        """
+        Returns a string that identifies the card in drive across
+        re-insertions. The default is the label plus the filesystem size.
+        """
+        try:
+            total = shutil.disk_usage(drive + "/").total
+        except OSError:
+            total = 0
+        return f"{volname or drive}:{total}"
+
+    def eject(self, drive):
+        """Asks the system to eject the card; failures are ignored."""
+
+    def change_token(self):
+        """
+        Returns a value that changes whenever a card may have been inserted
+        or removed. Backends override this with something cheaper than
+        listing the drives.
+        """
+        return tuple(self.list_drives())
+
+    def wait_for_change(self, timeout, wake):
+        """Waits up to timeout seconds, returning early if the wake event is set."""
+        wake.wait(timeout)
+
+
+class WindowsDriveBackend(DriveBackend):
+    """Removable drives from the Win32 volume API, through ctypes."""
+
+    def __init__(self):
+        import ctypes
+        self.ctypes = ctypes
+        self.kernel32 = ctypes.windll.kernel32
+
+    def _volume_information(self, drive):
+        """Returns (label, serial) for drive, or None if the reader has no card in it."""
+        ctypes = self.ctypes
+        label = ctypes.create_unicode_buffer(261)
+        serial = ctypes.c_uint32()
+        old_mode = self.kernel32.SetErrorMode(SEM_FAILCRITICALERRORS)
+        try:
+            ok = self.kernel32.GetVolumeInformationW(
+                ctypes.c_wchar_p(drive + "\\"), label, len(label), ctypes.byref(serial), None, None, None, 0
+            )
+        finally:
+            self.kernel32.SetErrorMode(old_mode)
+        if not ok:
+            return None
+        return label.value, serial.value
+
+    def list_drives(self):
+        drives = []
+        mask = self.kernel32.GetLogicalDrives()
+        for i in range(26):
+            if not mask & (1 << i):
+                continue
+            drive = f"{chr(ord('A') + i)}:"
+            if self.kernel32.GetDriveTypeW(self.ctypes.c_wchar_p(drive + "\\")) != DRIVE_REMOVABLE:
+                continue
+            info = self._volume_information(drive)
+            if info is None:
+                continue
+            drives.append((drive, info[0], describe_size(drive + "\\")))
+        return drives
+
+    def change_token(self):
+        # The drive letter mask changes when a reader is plugged in; the
+        # serials of the removable letters change when a card is swapped
+        mask = self.kernel32.GetLogicalDrives()
+        serials = []
+        for i in range(26):
+            if mask & (1 << i):
+                drive = f"{chr(ord('A') + i)}:"
+                if self.kernel32.GetDriveTypeW(self.ctypes.c_wchar_p(drive + "\\")) == DRIVE_REMOVABLE:
+                    serials.append((drive, self._volume_information(drive)))
+        return mask, tuple(serials)
+
+    def volume_identity(self, drive, volname=""):
+        info = self._volume_information(drive)
+        if info is None:
+            return super().volume_identity(drive, volname)
+        return f"{volname}:{info[1]:08X}"
+
+    def eject(self, drive):
+        # Try PowerShell method first
+        try:
+            result = subprocess.run(
+                ["powershell", "-Command", f"(New-Object -comObject Shell.Application).NameSpace(17).ParseName('{drive}\\').InvokeVerb('Eject')"],
+                shell=True, capture_output=True
+            )
+            # If PowerShell method fails, try mountvol as fallback
+            if result.returncode != 0:
+                subprocess.run(f"mountvol {drive} /p", shell=True)
+        except Exception:
+            # As a last resort, try mountvol
+            try:
+                subprocess.run(f"mountvol {drive} /p", shell=True)
+            except Exception:
+                pass
+
+
+def _unescape_mount_field(field):
+    """Undoes the octal escapes (\\040 for a space, ...) used in /proc/self/mounts."""
+    return re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), field)
+
+
+def _read_text(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _links_by_device(folder, unescape=False):
+    """Maps resolved device paths to the names of the symlinks in folder."""
+    links = {}
+    try:
+        entries = list(os.scandir(folder))
+    except OSError:
+        return links
+    for entry in entries:
+        name = entry.name
+        if unescape:
+            name = re.sub(r'\\x([0-9a-fA-F]{2})', lambda m: chr(int(m.group(1), 16)), name)
+        links[os.path.realpath(entry.path)] = name
+    return links
+
+
+class LinuxDriveBackend(DriveBackend):
+    """
+    Mounted removable filesystems, read from /proc/self/mounts and sysfs
+    without running any command. A block device counts as removable when
+    its disk has the sysfs removable flag set, or when it is an SD card in
+    a built-in MMC reader (which reports itself as not removable).
+    """
+
+    def __init__(self):
+        self.mounts_poll = None
+        self.mounts_file = None
+
+    def _disk_of(self, device_name):
+        """Returns the sysfs folder of the whole disk holding a block device."""
+        node = Path(os.path.realpath(os.path.join(SYS_CLASS_BLOCK, device_name)))
+        if (node / "partition").exists():
+            node = node.parent
+        return node
+
+    def _is_removable(self, device_name):
+        disk = self._disk_of(device_name)
+        if _read_text(disk / "removable") == "1":
+            return True
+        return _read_text(disk / "device" / "type") == "SD"
+
+    def _mounted_devices(self):
+        """Yields (device_path, mount_point) for mounted block devices, first mount of each only."""
+        seen = set()
+        try:
+            with open(PROC_MOUNTS, encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        for line in lines:
+            fields = line.split()
+            if len(fields) < 2 or not fields[0].startswith("/dev/"):
+                continue
+            device = os.path.realpath(_unescape_mount_field(fields[0]))
+            if device in seen:
+                continue
+            seen.add(device)
+            yield device, _unescape_mount_field(fields[1])
+
+    def list_drives(self):
+        labels = _links_by_device(DISK_BY_LABEL, unescape=True)
+        drives = []
+        for device, mount_point in self._mounted_devices():
+            if not self._is_removable(os.path.basename(device)):
+                continue
+            volname = labels.get(device) or os.path.basename(mount_point.rstrip("/"))
+            drives.append((mount_point, volname, describe_size(mount_point)))
+        return drives
+
+    def volume_identity(self, drive, volname=""):
+        uuids = _links_by_device(DISK_BY_UUID)
+        for device, mount_point in self._mounted_devices():
+            if mount_point == drive and device in uuids:
+                return f"{volname}:{uuids[device]}"
+        return super().volume_identity(drive, volname)
+
+    def change_token(self):
+        return _read_text(PROC_MOUNTS)
+
+    def wait_for_change(self, timeout, wake):
+        """
+        The kernel flags /proc/self/mounts for poll() whenever something is
+        mounted or unmounted, so a card shows up without waiting for the
+        next timeout.
+        """
+        if self.mounts_poll is None:
+            try:
+                self.mounts_file = open(PROC_MOUNTS, 'rb')
+                self.mounts_poll = select.poll()
+                self.mounts_poll.register(self.mounts_file, select.POLLPRI | select.POLLERR)
+            except (OSError, AttributeError):
+                self.mounts_poll = False
+        if not self.mounts_poll or wake.is_set():
+            wake.wait(timeout)
+            return
+        if self.mounts_poll.poll(timeout * 1000):
+            self.mounts_file.seek(0)
+            self.mounts_file.read()
+
+    def eject(self, drive):
+        device = next((d for d, m in self._mounted_devices() if m == drive), None)
+        if device is None:
+            return
+        os.sync()
+        try:
+            result = subprocess.run(["udisksctl", "unmount", "-b", device], capture_output=True)
+            if result.returncode == 0:
+                disk = "/dev/" + self._disk_of(os.path.basename(device)).name
+                subprocess.run(["udisksctl", "power-off", "-b", disk], capture_output=True)
+                return
+        except OSError:
+            pass
+        try:
+            subprocess.run(["umount", drive], capture_output=True)
+        except OSError:
+            pass
+
+
+class DirectoryDriveBackend(DriveBackend):
+    """
+    Local folders presented as cards, for trying transfers and running
+    benchmarks without real cards. The folder path is the drive and its
+    name the volume label; ejecting does nothing.
+    """
+
+    def __init__(self, folders):
+        self.folders = [os.path.abspath(str(f)) for f in folders]
+
+    @classmethod
+    def from_env(cls, value):
+        return cls([f for f in value.split(os.pathsep) if f])
+
+    def list_drives(self):
+        return [
+            (folder, os.path.basename(folder.rstrip("/\\")), describe_size(folder))
+            for folder in self.folders if os.path.isdir(folder)
+        ]
+
+    def volume_identity(self, drive, volname=""):
+        return f"{volname or os.path.basename(drive)}:{os.path.abspath(drive)}"
+
+    def change_token(self):
+        return tuple(os.path.isdir(folder) for folder in self.folders)
+
+
+_backend = None
+
+
+def default_backend():
+    fake_cards = os.environ.get(FAKE_CARDS_ENV)
+    if fake_cards:
+        return DirectoryDriveBackend.from_env(fake_cards)
+    if os.name == "nt":
+        return WindowsDriveBackend()
+    if sys.platform.startswith("linux"):
+        return LinuxDriveBackend()
+    # No discovery on this platform; folders can still be given as fake cards
+    return DirectoryDriveBackend([])
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = default_backend()
+    return _backend
+
+
+def set_backend(backend):
+    """Replaces the backend used by get_backend(), e.g. with a DirectoryDriveBackend."""
+    global _backend
+    _backend = backend
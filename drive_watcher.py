@@ -0,0 +1,91 @@
+import threading
+import time
+
+from drive_backends import get_backend
+
+# Longest a watcher sleeps between checks for inserted or removed cards
+WATCH_INTERVAL = 0.5
+# Changes must stop for this long before the drives are listed again;
+# mounting a card fires several events in a row
+WATCH_DEBOUNCE = 1.0
+
+
+class DriveWatcher:
+    """
+    Watches for cards being inserted and removed, on a background thread.
+
+    Each check only asks the backend for its change_token(), which is
+    cheap; the drives are listed again only once the token has changed and
+    then stayed the same for debounce seconds. on_change(added, removed,
+    initial) is called on the watcher thread with the (drive, volume_name,
+    size_display) tuples that appeared and disappeared since the last
+    call. The first call lists every card present, with initial=True.
+    """
+
+    def __init__(self, on_change, backend=None, interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE):
+        self.on_change = on_change
+        self.backend = backend
+        self.interval = interval
+        self.debounce = debounce
+        self.known = {}
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+
+    def refresh(self):
+        """Lists the drives again now, without waiting for a change."""
+        self.wake.set()
+
+    @property
+    def drives(self):
+        return list(self.known.values())
+
+    def _key(self, backend, drive):
+        # The identity tells a different card in the same reader apart
+        return drive[0], backend.volume_identity(drive[0], drive[1])
+
+    def _rescan(self, backend, initial=False):
+        try:
+            found = backend.list_drives()
+        except Exception as e:
+            print("Drive discovery failed:", e)
+            return
+        current = {self._key(backend, drive): drive for drive in found}
+        added = [drive for key, drive in current.items() if key not in self.known]
+        removed = [drive for key, drive in self.known.items() if key not in current]
+        self.known = current
+        if added or removed or initial:
+            self.on_change(added, removed, initial)
+
+    def _run(self):
+        backend = self.backend or get_backend()
+        token = backend.change_token()
+        self._rescan(backend, initial=True)
+        changed_at = None
+        while not self.stopped.is_set():
+            timeout = self.interval
+            if changed_at is not None:
+                timeout = max(0.0, min(timeout, changed_at + self.debounce - time.monotonic()))
+            backend.wait_for_change(timeout, self.wake)
+            if self.stopped.is_set():
+                return
+            if self.wake.is_set():
+                self.wake.clear()
+                token = backend.change_token()
+                changed_at = None
+                self._rescan(backend)
+                continue
+            new_token = backend.change_token()
+            if new_token != token:
+                token = new_token
+                changed_at = time.monotonic()
+            elif changed_at is not None and time.monotonic() - changed_at >= self.debounce:
+                changed_at = None
+                self._rescan(backend)
@@ -0,0 +1,111 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Ledger file kept in the main folder
+LEDGER_FILENAME = ".sdcopier_ledger.sqlite3"
+
+# Imported files are written to the database in batches of this size
+LEDGER_BATCH_SIZE = 200
+
+
+def ledger_key(relative_path, size, mtime):
+    """Key of one card file: its path on the card, size and mtime in milliseconds."""
+    return (relative_path, int(size), int(round(mtime * 1000)))
+
+
+class ImportLedger:
+    """
+    Persistent record of card files that were already imported.
+
+    Files are keyed by the card's volume identity plus their path on the
+    card, size and mtime. load_volume() reads all keys of a card into a set
+    once, so checking a file during the scan is a single set lookup. The
+    capture time and camera read from a file's header are kept too, when
+    the import read them.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.pending = []
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS imported ("
+                " volume TEXT NOT NULL,"
+                " rel_path TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " mtime_ms INTEGER NOT NULL,"
+                " dest TEXT,"
+                " imported_at REAL,"
+                " captured REAL,"
+                " camera TEXT,"
+                " PRIMARY KEY (volume, rel_path, size, mtime_ms))"
+            )
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(imported)")}
+            # Ledgers written before capture info was kept
+            for column, kind in (("captured", "REAL"), ("camera", "TEXT")):
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE imported ADD COLUMN {column} {kind}")
+            self.conn.commit()
+
+    @classmethod
+    def for_main_folder(cls, main_folder):
+        return cls(Path(main_folder) / LEDGER_FILENAME)
+
+    def load_volume(self, volume):
+        """Returns the set of ledger_key()s already imported from this volume."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT rel_path, size, mtime_ms FROM imported WHERE volume = ?", (volume,)
+            ).fetchall()
+        return set(rows)
+
+    def destinations(self, volume):
+        """Returns {ledger_key(): destination} for the files imported from this volume."""
+        with self.lock:
+            self._flush_locked()
+            rows = self.conn.execute(
+                "SELECT rel_path, size, mtime_ms, dest FROM imported WHERE volume = ? AND dest IS NOT NULL", (volume,)
+            ).fetchall()
+        return {(rel_path, size, mtime_ms): dest for rel_path, size, mtime_ms, dest in rows}
+
+    def imported_files(self):
+        """Returns (destination, size) for every file imported into this folder."""
+        with self.lock:
+            return self.conn.execute("SELECT dest, size FROM imported").fetchall()
+
+    def record(self, volume, relative_path, size, mtime, dest, captured=None, camera=None):
+        """
+        Marks a file as imported, with its capture time and camera when known.
+        Writes are batched; call flush() at the end of a card.
+        """
+        key = ledger_key(relative_path, size, mtime)
+        with self.lock:
+            self.pending.append((volume, *key, str(dest), time.time(), captured, camera))
+            if len(self.pending) >= LEDGER_BATCH_SIZE:
+                self._flush_locked()
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self.pending:
+            return
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO imported (volume, rel_path, size, mtime_ms, dest, imported_at, captured, camera)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            self.pending,
+        )
+        self.conn.commit()
+        self.pending.clear()
+
+    def close(self):
+        with self.lock:
+            self._flush_locked()
+            self.conn.close()
@@ -0,0 +1,404 @@
+"""
+Headless SD card ingest for unattended stations.
+
+    python -m ingest_cli --dest D:/Media --workers 4
+    python -m ingest_cli --list
+    python -m ingest_cli --dest D:/Media --watch
+
+Progress is written to stdout as JSON lines, one event per line. With
+--watch the command keeps running and copies every card as soon as it is
+inserted, until interrupted. --report FILE.json writes where the time went: every
+phase of every file, with percentiles per card. --limit and --card-limit
+cap the speed in MB/s; with --control, JSON lines on stdin change the
+limits and priorities while cards copy:
+
+    {"limit": 80}                      total limit (0 for none)
+    {"card": 2, "limit": 20}           limit of card 2
+    {"card": 2, "priority": "rush"}    rush, normal or background
+
+This module never imports tkinter or PIL.
+"""
+import argparse
+import json
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+
+import main as engine
+from dedup import DedupIndex
+from drive_backends import DirectoryDriveBackend, set_backend
+from drive_watcher import DriveWatcher
+from import_ledger import ImportLedger
+from io_scheduler import TransferScheduler
+from run_report import RunRecorder
+from bandwidth import BandwidthLimiter, PRIORITY_WEIGHTS
+from transfer_order import ORDERING_POLICIES, DEFAULT_ORDER
+from destination_plan import NamingTemplate, DEFAULT_NAMING, NAMING_FIELDS
+from throughput import RateWindow, ThroughputProfiles, PROFILES_FILENAME
+from thumbnails import ThumbnailCache, THUMBNAILS_FOLDER
+
+# Seconds between progress events for a card
+PROGRESS_INTERVAL = 0.5
+MB = 1024 * 1024
+
+
+class JsonLinesReporter:
+    """
+    Writes JSON-lines events to a stream. Progress deltas from the copy
+    threads are merged per card and written every interval seconds by a
+    background thread, followed by a "run" event with the speed and ETA of
+    the whole run; other events are written immediately.
+    """
+
+    def __init__(self, stream=sys.stdout, interval=PROGRESS_INTERVAL):
+        self.stream = stream
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.cards = {}
+        self.dirty = set()
+        self.done = {}
+        self.speeds = {}
+        self.window = RateWindow()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._tick, daemon=True)
+
+    def emit(self, event, **fields):
+        line = json.dumps({"event": event, "time": round(time.time(), 3), **fields})
+        with self.lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def start(self, cards):
+        """Announces cards that start copying; may be called again for cards added later."""
+        with self.lock:
+            for card in cards:
+                self.cards[card.idx] = card
+                self.done[card.idx] = [0, 0]
+        self.emit("start", cards=[
+            {"card": card.idx, "name": card.name, "drive": card.drive, "volume": card.volume}
+            for card in cards
+        ])
+        if not self.thread.is_alive() and not self.stopped.is_set():
+            self.thread.start()
+
+    def progress_callback(self, idx, files, nbytes, copied=True):
+        with self.lock:
+            done = self.done.setdefault(idx, [0, 0])
+            done[0] += files
+            done[1] += nbytes
+            self.dirty.add(idx)
+        # Resumed and deduplicated bytes are progress, not throughput
+        if nbytes and copied:
+            self.window.add(nbytes)
+
+    def speed_callback(self, idx, speed):
+        self.speeds[idx] = speed
+
+    def result_callback(self, idx, message):
+        self.flush_progress()
+        self.emit("result", card=idx, message=message)
+
+    def flush_progress(self):
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            snapshot = {idx: list(self.done[idx]) for idx in dirty}
+            cards = list(self.cards.values())
+            run_bytes = sum(done[1] for done in self.done.values())
+        for idx, (files_done, bytes_done) in sorted(snapshot.items()):
+            card = self.cards.get(idx)
+            fields = {"card": idx, "files_done": files_done, "bytes_done": bytes_done,
+                      "speed": round(self.speeds.get(idx, 0.0), 1)}
+            if card is not None:
+                fields.update(
+                    name=card.name,
+                    total_files=card.manifest.total_files,
+                    total_bytes=card.manifest.total_bytes,
+                    scan_complete=card.manifest.complete,
+                    eta=_round(card.eta()),
+                )
+                if card.backups:
+                    fields["backup_bytes"] = list(card.backup_bytes)
+                if card.adaptive is not None:
+                    fields["in_flight"] = card.max_in_flight
+            self.emit("progress", **fields)
+        if snapshot and cards:
+            total_bytes = sum(card.manifest.total_bytes for card in cards)
+            remaining = max(0, total_bytes - run_bytes)
+            if self.window.settled():
+                rate = self.window.rate()
+                eta = remaining / rate if rate > 0 else None
+            else:
+                etas = [card.eta() for card in cards]
+                eta = max(etas) if None not in etas else None
+            self.emit("run", bytes_done=run_bytes, total_bytes=total_bytes,
+                      speed=round(self.window.rate(), 1), eta=_round(eta))
+
+    def _tick(self):
+        while not self.stopped.wait(self.interval):
+            self.flush_progress()
+
+    def stop(self):
+        self.stopped.set()
+        self.flush_progress()
+
+
+def _round(seconds):
+    return None if seconds is None else round(seconds, 1)
+
+
+def select_drives(drives, cards, volumes):
+    """Keeps the drives named with --card or whose volume label was given with --volume."""
+    if not cards and not volumes:
+        return drives
+    wanted_cards = {c.rstrip("/\\").upper() for c in cards}
+    wanted_volumes = {v.upper() for v in volumes}
+    return [
+        d for d in drives
+        if d[0].rstrip("/\\").upper() in wanted_cards or (d[1] or "").upper() in wanted_volumes
+    ]
+
+
+def watch_and_ingest(args, dest, reporter, cancel_event, stop_watching, ledger, dedup, recorder=None,
+                     profiles=None, bandwidth=None, thumbnails=None):
+    """
+    Copies every card present and every card inserted later through one
+    long-lived TransferScheduler. Once stop_watching is set no new cards
+    are taken and the ones copying are finished. Returns all the
+    CardTransfers that were started.
+    """
+    scheduler = TransferScheduler(args.workers, args.per_card, args.per_disk)
+    bases = [Path(args.pictures or dest / "Pictures"), Path(args.videos or dest / "Videos"),
+             Path(args.sound or dest / "Sound")]
+    cards = []
+    taken = set()
+    lock = threading.Lock()
+
+    def on_change(added, removed, initial):
+        for drive, volname, size_display in removed:
+            reporter.emit("removed", drive=drive, volume=volname)
+        added = select_drives(added, args.card, args.volume)
+        if not added or stop_watching.is_set():
+            return
+        with lock:
+            cam_numbers = engine.cam_numbers_for(added, bases, dest, taken)
+            taken.update(cam_numbers)
+            new_cards = engine.build_card_transfers(
+                added, cam_numbers, cancel_event, reporter.speed_callback, reporter.result_callback,
+                *bases, first_idx=len(cards) + 1,
+                progress_callback=reporter.progress_callback, pipelined=args.overlap, ledger=ledger,
+                checksums=args.checksums, verify=args.verify, dedup=dedup, journal_dir=dest,
+                eject=not args.no_eject, recorder=recorder, profiles=profiles, bandwidth=bandwidth,
+                order=args.order, backup_roots=args.backup, adaptive=args.adaptive, thumbnails=thumbnails,
+                naming=args.naming,
+            )
+            cards.extend(new_cards)
+        if bandwidth is not None:
+            apply_priorities(new_cards, bandwidth, args.priority)
+        reporter.start(new_cards)
+        for card in engine.slowest_first(new_cards):
+            scheduler.add(card)
+
+    watcher = DriveWatcher(on_change)
+    scheduler.start()
+    watcher.start()
+    reporter.emit("watching")
+    while not stop_watching.wait(0.5):
+        pass
+    watcher.stop()
+    scheduler.close()
+    scheduler.join()
+    return cards
+
+
+def parse_priorities(values):
+    """Turns --priority DRIVE_OR_LABEL=CLASS values into {name: class}."""
+    priorities = {}
+    for value in values:
+        name, _, priority = value.rpartition("=")
+        if not name or priority not in PRIORITY_WEIGHTS:
+            raise argparse.ArgumentTypeError(f"--priority expects DRIVE_OR_LABEL=CLASS with CLASS one of {', '.join(PRIORITY_WEIGHTS)}")
+        priorities[name.rstrip("/\\").upper()] = priority
+    return priorities
+
+
+def apply_priorities(cards, bandwidth, priorities):
+    for card in cards:
+        for name in (card.drive.rstrip("/\\").upper(), (card.volname or "").upper()):
+            if name in priorities:
+                bandwidth.set_priority(card.idx, priorities[name])
+                break
+
+
+def read_controls(stream, bandwidth, reporter):
+    """Applies the JSON-lines commands described above from stream, until it ends."""
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            command = json.loads(line)
+            card = command.get("card")
+            if "limit" in command:
+                rate = float(command["limit"]) * MB or None
+                if card is None:
+                    bandwidth.set_total_rate(rate)
+                else:
+                    bandwidth.set_card_rate(int(card), rate)
+            if "priority" in command:
+                bandwidth.set_priority(int(card), command["priority"])
+        except (ValueError, TypeError, AttributeError) as e:
+            reporter.emit("error", message=f"Bad control command {line.strip()!r}: {e}")
+            continue
+        reporter.emit("limits", **_limits_in_mb(bandwidth.snapshot()))
+
+
+def _limits_in_mb(snapshot):
+    def mb(rate):
+        return None if rate is None else round(rate / MB, 2)
+    return {
+        "total": mb(snapshot["total"]),
+        "cards": {str(key): {"limit": mb(c["limit"]), "priority": c["priority"], "effective": mb(c["effective"])}
+                  for key, c in snapshot["cards"].items()},
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ingest_cli", description="Copy media from SD cards without the GUI.")
+    parser.add_argument("--dest", default="C:/Media", help="main folder; Pictures, Videos and Sound go under it")
+    parser.add_argument("--pictures", help="pictures folder (default: <dest>/Pictures)")
+    parser.add_argument("--videos", help="videos folder (default: <dest>/Videos)")
+    parser.add_argument("--sound", help="sound folder (default: <dest>/Sound)")
+    parser.add_argument("--backup", action="append", default=[], metavar="DIR", help="also copy every card to Pictures, Videos and Sound under this folder, reading it once (repeatable)")
+    parser.add_argument("--card", action="append", default=[], metavar="DRIVE", help="only copy this drive (repeatable)")
+    parser.add_argument("--volume", action="append", default=[], metavar="LABEL", help="only copy cards with this volume label (repeatable)")
+    parser.add_argument("--fake-card", action="append", default=[], metavar="DIR", help="use this folder as a card instead of the real drives (repeatable)")
+    parser.add_argument("--list", action="store_true", help="print the detected cards and exit")
+    parser.add_argument("--workers", type=int, default=engine.MAX_WORKERS, help="copy threads shared by all cards")
+    parser.add_argument("--per-card", type=int, default=engine.PER_SOURCE_LIMIT, help="parallel copies per source device")
+    parser.add_argument("--per-disk", type=int, default=engine.PER_DESTINATION_LIMIT, help="parallel copies per destination device")
+    parser.add_argument("--overlap", action="store_true", help="overlap card reads with disk writes")
+    parser.add_argument("--adaptive", action="store_true", help="copy several files per card at once, tuned to the measured speed (for network folders; replaces --overlap)")
+    parser.add_argument("--no-skip-imported", action="store_true", help="copy files even if the ledger has them")
+    parser.add_argument("--checksums", action="store_true", help="hash files while copying and write a manifest")
+    parser.add_argument("--verify", action="store_true", help="read every copy back and compare hashes")
+    parser.add_argument("--dedup", action="store_true", help="hard-link files whose content was already imported")
+    parser.add_argument("--no-eject", action="store_true", help="leave cards mounted when done")
+    parser.add_argument("--watch", action="store_true", help="keep running and copy each card as it is inserted")
+    parser.add_argument("--naming", default=DEFAULT_NAMING, metavar="TEMPLATE", help=f"names of copied files without extension, '/' for subfolders, e.g. {{date}}/{{camera}}/{{stem}}; fields: {', '.join(NAMING_FIELDS)}")
+    parser.add_argument("--order", choices=ORDERING_POLICIES, default=DEFAULT_ORDER, help="which files of a card are copied first")
+    parser.add_argument("--limit", type=float, default=0, metavar="MB_S", help="total speed limit of all cards in MB/s")
+    parser.add_argument("--card-limit", type=float, default=0, metavar="MB_S", help="speed limit of each card in MB/s")
+    parser.add_argument("--priority", action="append", default=[], metavar="CARD=CLASS", help="priority of a drive or volume label: rush, normal or background (repeatable)")
+    parser.add_argument("--control", action="store_true", help="read limit and priority changes as JSON lines from stdin")
+    parser.add_argument("--profiles", metavar="FILE.json", help="learned card speeds, used for ETAs (default: in the user cache folder)")
+    parser.add_argument("--thumbnails", action="store_true", help=f"make thumbnails of the copied pictures in <dest>/{THUMBNAILS_FOLDER}")
+    parser.add_argument("--report", metavar="FILE.json", help="write per-phase timings of the run to this file and a .csv next to it")
+    parser.add_argument("--interval", type=float, default=PROGRESS_INTERVAL, help="seconds between progress events")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        args.priority = parse_priorities(args.priority)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    try:
+        args.naming = NamingTemplate(args.naming)
+    except ValueError as e:
+        parser.error(str(e))
+    reporter = JsonLinesReporter(interval=args.interval)
+    if args.fake_card:
+        set_backend(DirectoryDriveBackend(args.fake_card))
+
+    drives = select_drives(engine.get_removable_drives(), args.card, args.volume)
+    if args.list:
+        for drive, volname, size_display in drives:
+            reporter.emit("card", drive=drive, volume=volname, size=size_display)
+        return 0
+    if not drives and not args.watch:
+        reporter.emit("error", message="No SD cards found.")
+        return 1
+
+    dest = Path(args.dest)
+    ledger = None if args.no_skip_imported else ImportLedger.for_main_folder(dest)
+    dedup = None
+    if args.dedup:
+        dedup = DedupIndex(engine.new_hasher)
+        if ledger is not None:
+            dedup.add_many(ledger.imported_files())
+
+    recorder = RunRecorder() if args.report else None
+    thumbnails = ThumbnailCache.for_main_folder(dest) if args.thumbnails else None
+    bandwidth = BandwidthLimiter(args.limit * MB, args.card_limit * MB)
+    if args.control:
+        threading.Thread(target=read_controls, args=(sys.stdin, bandwidth, reporter), daemon=True).start()
+    profiles = ThroughputProfiles(args.profiles or engine.user_cache_dir() / PROFILES_FILENAME, engine.CAMERA_LABELS)
+    cancel_event = threading.Event()
+    # With --watch the first Ctrl+C stops watching and lets running cards finish
+    stop_watching = threading.Event()
+
+    def on_interrupt(signum, frame):
+        if cancel_event.is_set():
+            raise KeyboardInterrupt
+        if args.watch and not stop_watching.is_set():
+            reporter.emit("stopping")
+            stop_watching.set()
+            return
+        reporter.emit("cancelling")
+        cancel_event.set()
+
+    def on_started(cards):
+        apply_priorities(cards, bandwidth, args.priority)
+        reporter.start(cards)
+
+    signal.signal(signal.SIGINT, on_interrupt)
+    start_time = time.time()
+    try:
+        if args.watch:
+            cards = watch_and_ingest(args, dest, reporter, cancel_event, stop_watching, ledger, dedup, recorder, profiles,
+                                     bandwidth, thumbnails)
+        else:
+            cards = engine.process_cameras_parallel(
+                cancel_event, reporter.speed_callback, reporter.result_callback,
+                max_workers=args.workers, per_source=args.per_card, per_destination=args.per_disk,
+                pipelined=args.overlap, ledger=ledger, checksums=args.checksums, verify=args.verify,
+                dedup=dedup, drives=drives,
+                picture_base=args.pictures or dest / "Pictures",
+                video_base=args.videos or dest / "Videos",
+                sound_base=args.sound or dest / "Sound",
+                unique_cams=True, progress_callback=reporter.progress_callback,
+                journal_dir=dest, eject=not args.no_eject, started_callback=on_started,
+                recorder=recorder, profiles=profiles, bandwidth=bandwidth, order=args.order,
+                backup_roots=args.backup, adaptive=args.adaptive, thumbnails=thumbnails,
+                naming=args.naming,
+            )
+    finally:
+        reporter.stop()
+        if ledger is not None:
+            ledger.close()
+        if thumbnails is not None:
+            # Waits for the thumbnails still being made, unless cancelled
+            thumbnails.close(wait=not cancel_event.is_set())
+    if thumbnails is not None:
+        reporter.emit("thumbnails", folder=str(thumbnails.folder), made=thumbnails.made, failed=thumbnails.failed,
+                     error=thumbnails.last_error)
+    if recorder is not None:
+        recorder.write(args.report)
+        reporter.emit("report", path=str(args.report))
+    failed = [c.idx for c in cards if c.error is not None or c.verify_failures or any(c.destination_failures)]
+    reporter.emit(
+        "done",
+        files=sum(len(c.manifest.copied) for c in cards),
+        bytes=sum(c.bytes_done for c in cards),
+        elapsed=round(time.time() - start_time, 3),
+        cancelled=cancel_event.is_set(),
+        failed=failed,
+    )
+    return 1 if failed or cancel_event.is_set() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+import threading
+from collections import Counter
+
+# Default concurrency limits (exposed as settings in the GUI)
+MAX_WORKERS = 4
+PER_SOURCE_LIMIT = 1
+PER_DESTINATION_LIMIT = 2
+
+# How long an idle worker waits before looking for ready files again
+IDLE_WAIT = 0.05
+
+
+class TransferScheduler:
+    """
+    Runs file copies from many cards on a fixed pool of worker threads.
+
+    Workers visit the cards round-robin, so cards are interleaved fairly,
+    and never start a copy that would put more than per_source copies on
+    one source device or more than per_destination on one destination
+    device. Adding card readers therefore never adds more parallel streams
+    than the disks can take.
+
+    A job (one card) is any object with:
+        source_device              key of the device it reads from
+        max_in_flight              copies it allows at once (None for no limit)
+        in_flight                  copies running now, kept by the scheduler
+        error                      set by the scheduler if run() raises
+        peek()                     next item ready to copy, or None
+        take()                     removes and returns that item
+        exhausted()                True once no more items will be ready
+        destination_device(item)   key of the device item is written to
+        run(item)                  copies item, on a worker thread
+        finish()                   called once, after its last copy ends
+
+    A job may also have a priority (higher first, default 0): free workers
+    serve the jobs of the highest priority that can start a copy, round-
+    robin within the same priority.
+
+    A job with own_limits set tunes its max_in_flight while it runs (see
+    concurrency.AdaptiveConcurrency); the per_source and per_destination
+    limits do not apply to it, though its copies still count against them
+    for other jobs. Its extra_workers are added to the pool while it runs,
+    so its copies do not take every worker from the other cards.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, per_source=PER_SOURCE_LIMIT, per_destination=PER_DESTINATION_LIMIT):
+        self.max_workers = max(1, int(max_workers))
+        self.per_source = max(1, int(per_source))
+        self.per_destination = max(1, int(per_destination))
+        self.cond = threading.Condition()
+        self.jobs = []
+        self.finished = set()
+        self.source_busy = Counter()
+        self.destination_busy = Counter()
+        self.cursor = 0
+        self.closed = False
+        self.started = False
+        # hold() calls not yet released; workers stay while there are any
+        self.holds = 0
+        self.workers = []
+        # Workers running now; may exceed max_workers while jobs have extra_workers
+        self.live = 0
+
+    def add(self, job):
+        with self.cond:
+            job.in_flight = 0
+            self.jobs.append(job)
+            self._grow()
+            self.cond.notify_all()
+
+    def offer(self, job):
+        """
+        Adds job to a scheduler that may already be running. Returns False,
+        without adding it, once the scheduler is closed and has finished
+        every job, since its workers are gone by then.
+        """
+        with self.cond:
+            if self._done():
+                return False
+            job.in_flight = 0
+            self.jobs.append(job)
+            self._grow()
+            self.cond.notify_all()
+            return True
+
+    def hold(self):
+        """
+        Keeps the workers from exiting until release(), e.g. while a job is
+        built to be offered. Returns False, without holding, once the
+        scheduler is closed and has finished every job.
+        """
+        with self.cond:
+            if self._done():
+                return False
+            self.holds += 1
+            return True
+
+    def release(self):
+        with self.cond:
+            self.holds -= 1
+            self.cond.notify_all()
+
+    def _done(self):
+        return self.closed and not self.holds and all(j in self.finished for j in self.jobs)
+
+    def close(self):
+        """No more jobs will be added; workers exit once every job has finished."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def start(self):
+        with self.cond:
+            self.started = True
+            self._grow()
+
+    def join(self):
+        # Workers started while joining are appended, and joined too
+        for t in self.workers:
+            t.join()
+
+    def _capacity(self):
+        return self.max_workers + sum(
+            getattr(job, "extra_workers", 0) for job in self.jobs if job not in self.finished
+        )
+
+    def _grow(self):
+        """Starts workers up to the capacity; called with the lock held."""
+        if not self.started:
+            return
+        while self.live < self._capacity():
+            t = threading.Thread(target=self._worker, daemon=True)
+            self.workers.append(t)
+            self.live += 1
+            t.start()
+
+    def run(self, jobs):
+        """Runs jobs to completion on the calling thread's behalf."""
+        for job in jobs:
+            self.add(job)
+        self.close()
+        self.start()
+        self.join()
+
+    def _worker(self):
+        while True:
+            picked = self._acquire()
+            if picked is None:
+                return
+            job, item, destination = picked
+            if item is None:
+                job.finish()
+                continue
+            try:
+                job.run(item)
+            except BaseException as e:
+                if job.error is None:
+                    job.error = e
+            finally:
+                self._release(job, destination)
+
+    def _acquire(self):
+        """
+        Waits for the next (job, item, destination) to copy. A job that is
+        done comes back once as (job, None, None) so its finish() runs
+        outside the lock. Returns None when the scheduler is closed and idle.
+        """
+        with self.cond:
+            while True:
+                active = [job for job in self.jobs if job not in self.finished]
+                n = len(active)
+                rotation = [(i, active[(self.cursor + i) % n]) for i in range(n)]
+                # Stable, so jobs of equal priority keep their round-robin order
+                rotation.sort(key=lambda entry: -getattr(entry[1], "priority", 0))
+                for i, job in rotation:
+                    if job.error is not None or job.exhausted():
+                        if job.in_flight == 0:
+                            self.finished.add(job)
+                            return job, None, None
+                        continue
+                    if job.max_in_flight is not None and job.in_flight >= job.max_in_flight:
+                        continue
+                    own_limits = getattr(job, "own_limits", False)
+                    if not own_limits and self.source_busy[job.source_device] >= self.per_source:
+                        continue
+                    item = job.peek()
+                    if item is None:
+                        continue
+                    destination = job.destination_device(item)
+                    if not own_limits and self.destination_busy[destination] >= self.per_destination:
+                        continue
+                    job.take()
+                    job.in_flight += 1
+                    self.source_busy[job.source_device] += 1
+                    self.destination_busy[destination] += 1
+                    self.cursor = (self.cursor + i + 1) % n
+                    return job, item, destination
+                if (self.closed and not active and not self.holds) or self.live > self._capacity():
+                    # Workers added for a finished job leave once idle
+                    self.live -= 1
+                    return None
+                self.cond.wait(IDLE_WAIT)
+
+    def _release(self, job, destination):
+        with self.cond:
+            job.in_flight -= 1
+            self.source_busy[job.source_device] -= 1
+            self.destination_busy[destination] -= 1
+            self.cond.notify_all()
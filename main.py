@@ -1,17 +1,37 @@
 import os
+import csv
+import errno
+import hashlib
 import shutil
-import subprocess
+from dataclasses import dataclass, field
 from pathlib import Path
 from datetime import datetime
-import tkinter as tk
-from tkinter import messagebox
-from tkinter import filedialog
 import threading
 import time
 import queue
-import tkinter.ttk as ttk
-from PIL import Image, ImageTk 
+import re
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from remove_sd_files import remove_all_files_from_sd
+from io_scheduler import TransferScheduler, MAX_WORKERS, PER_SOURCE_LIMIT, PER_DESTINATION_LIMIT
+from import_ledger import ImportLedger, ledger_key
+from dedup import DedupIndex
+from drive_backends import get_backend
+from drive_watcher import DriveWatcher
+from transfer_journal import TransferJournal, PART_SUFFIX, JOURNAL_CHECKPOINT_BYTES, journaled_card
+from destination_plan import DestinationPlan, NamingTemplate, DEFAULT_NAMING
+from capture_info import read_capture_info
+from transfer_order import ReadyFiles, ORDERING_POLICIES, DEFAULT_ORDER
+from run_report import RunRecorder
+from bandwidth import BandwidthLimiter, PRIORITY_WEIGHTS, DEFAULT_PRIORITY
+from throughput import RateWindow, FileCostFit, ThroughputProfiles, PROFILES_FILENAME, format_eta
+from concurrency import AdaptiveConcurrency, ADAPTIVE_MAX_IN_FLIGHT
+from thumbnails import ThumbnailCache, contact_sheet
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 # Supported file extensions
 IMAGE_EXTENSIONS = {
     '.jpg', '.jpeg', '.png', '.cr2', '.cr3', '.nef', '.arw', '.raw', '.tif', '.tiff', '.heif', '.heic'
@@ -23,6 +43,13 @@ SOUND_EXTENSIONS = {
     '.wav', '.mp3', '.aac', '.flac', '.ogg', '.m4a'
 }
 
+# Extension -> media category, so a single scan can sort every file
+MEDIA_CATEGORIES = ("image", "video", "sound")
+EXTENSION_CATEGORIES = {}
+EXTENSION_CATEGORIES.update(dict.fromkeys(IMAGE_EXTENSIONS, "image"))
+EXTENSION_CATEGORIES.update(dict.fromkeys(VIDEO_EXTENSIONS, "video"))
+EXTENSION_CATEGORIES.update(dict.fromkeys(SOUND_EXTENSIONS, "sound"))
+
 # Volume labels mapped to camera names
 CAMERA_LABELS = {
     "CANONR": "Canon R",
@@ -36,56 +63,19 @@ global_stats_label = None
 PICTURE_BASE_DIR = Path("C:/Media/Pictures")
 VIDEO_BASE_DIR = Path("C:/Media/Videos")
 SOUND_BASE_DIR = Path("C:/Media/Sound")
-test_mode_env = False
-
-def get_removable_drives(test_mode=False):
+# Folders of each category under a backup folder
+BACKUP_SUBFOLDERS = {"image": "Pictures", "video": "Videos", "sound": "Sound"}
+def get_removable_drives(backend=None):
     """
-    Returns a list of removable drives.
-    If test_mode is True, returns 4 sample SD cards for interface testing.
+    Returns (drive, volume_name, size_display) for every SD card present,
+    from the drive backend for this machine (see drive_backends).
     """
-    if test_mode:
-        # Return 4 fake SD cards for testing the interface
-        return [
-            ("E:", "CANONR", "32.0 GB (used: 10.0 GB)"),
-            ("F:", "CANON90D", "64.0 GB (used: 20.0 GB)"),
-            ("G:", "CANONR8", "128.0 GB (used: 50.0 GB)"),
-            ("H:", "CANONR6II", "256.0 GB (used: 100.0 GB)"),
-        ]
-    drives = []
-    output = subprocess.check_output(
-        'wmic logicaldisk get DeviceID,DriveType,Size,VolumeName', shell=True
-    ).decode(errors='ignore')
-    lines = output.strip().split("\n")
-    if len(lines) < 2:
-        return drives
-    for line in lines[1:]:
-        if not line.strip():
-            continue
-        # Split by whitespace, but VolumeName may be missing or have spaces, so handle carefully
-        parts = line.split()
-        if len(parts) < 2:
-            continue
-        device_id = parts[0]
-        drive_type = parts[1]
-        size_str = parts[2] if len(parts) > 2 and parts[2].isdigit() else ""
-        # VolumeName is everything after Size (may be empty)
-        volume_name = ""
-        if len(parts) > 3:
-            volume_name = " ".join(parts[3:])
-        elif len(parts) == 3 and not parts[2].isdigit():
-            volume_name = parts[2]
-            size_str = ""
-        if drive_type != '2':
-            continue
-        try:
-            total, used, free = shutil.disk_usage(device_id + "\\")
-            size_gb = total / (1024 ** 3)
-            used_gb = used / (1024 ** 3)
-            size_display = f"{size_gb:.1f} GB (used: {used_gb:.1f} GB)"
-        except Exception:
-            size_display = "Unknown"
-        drives.append((device_id, volume_name, size_display))
-    return drives
+    return (backend or get_backend()).list_drives()
+
+
+def get_volume_identity(drive, volname=""):
+    """Returns a string that identifies the card in drive across re-insertions."""
+    return get_backend().volume_identity(drive, volname)
 
 
 def transfer_files(source_dir: Path, dest_dir: Path, extensions: set):
@@ -106,41 +96,906 @@ def transfer_files(source_dir: Path, dest_dir: Path, extensions: set):
                 print(f"Copied {source_path} -> {dest_path}")
 
 
-def eject_drive(drive_letter):
-    # Try PowerShell method first
-    try:
-        result = subprocess.run(
-            ["powershell", "-Command", f"(New-Object -comObject Shell.Application).NameSpace(17).ParseName('{drive_letter}\\').InvokeVerb('Eject')"],
-            shell=True, capture_output=True
-        )
-        # If PowerShell method fails, try mountvol as fallback
-        if result.returncode != 0:
-            subprocess.run(f"mountvol {drive_letter}: /p", shell=True)
-    except Exception as e:
-        # As a last resort, try mountvol
+def eject_drive(drive):
+    get_backend().eject(drive)
+
+
+@dataclass
+class MediaFile:
+    """A media file found on a card, with the stat data gathered during the scan."""
+    path: Path
+    category: str
+    size: int
+    mtime: float
+    # Where the file is copied to, once its card's DestinationPlan chose it
+    destination: Path = None
+    # Where its backup copies go, when the card is copied to backup folders too
+    backup_destinations: list = None
+    # Capture time (seconds since the epoch) and camera model from the file's
+    # header, when its card's naming or order needs them and the header has them
+    captured: float = None
+    camera: str = None
+
+
+@dataclass
+class MediaManifest:
+    """Everything one scan found on a card, with per-category counts and bytes."""
+    drive: str
+    files: list = field(default_factory=list)
+    counts: dict = field(default_factory=lambda: dict.fromkeys(MEDIA_CATEGORIES, 0))
+    bytes: dict = field(default_factory=lambda: dict.fromkeys(MEDIA_CATEGORIES, 0))
+    complete: bool = False
+    # Files left out because the import ledger says they were already copied
+    skipped: list = field(default_factory=list)
+    skipped_bytes: int = 0
+    # CopyRecords of the files that reached their destination
+    copied: list = field(default_factory=list)
+    # How long the background scan took, once complete
+    scan_seconds: float = None
+
+    def add(self, media_file):
+        self.files.append(media_file)
+        self.counts[media_file.category] += 1
+        self.bytes[media_file.category] += media_file.size
+
+    def skip(self, media_file):
+        self.skipped.append(media_file)
+        self.skipped_bytes += media_file.size
+
+    @property
+    def total_files(self):
+        return len(self.files)
+
+    @property
+    def total_bytes(self):
+        return sum(self.bytes.values())
+
+    def paths(self, category=None):
+        return [f.path for f in self.files if category is None or f.category == category]
+
+
+@dataclass
+class CopyRecord:
+    """A file copied from a card, with its checksum when hashing was on."""
+    source: MediaFile
+    destination: Path
+    digest: str = None
+    verified: bool = None
+    # Backup copies written from the same read, checked by verify too
+    backups: list = field(default_factory=list)
+
+
+def iter_media_files(drive):
+    """
+    Walks the drive once with os.scandir and yields a MediaFile for every
+    image, video or sound file. The size comes from the DirEntry stat, so
+    no extra stat call is made per file. Unreadable folders are skipped.
+    """
+    stack = [str(Path(drive + "/"))]
+    while stack:
+        top = stack.pop()
         try:
-            subprocess.run(f"mountvol {drive_letter}: /p", shell=True)
-        except Exception:
-            pass
+            entries = os.scandir(top)
+        except OSError:
+            continue
+        subdirs = []
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    category = EXTENSION_CATEGORIES.get(os.path.splitext(entry.name)[1].lower())
+                    if category is None or not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                yield MediaFile(Path(entry.path), category, st.st_size, st.st_mtime)
+        # Visit subfolders in listing order, like os.walk
+        stack.extend(reversed(subdirs))
+
+
+def scan_media_manifest(drive):
+    """Scans the drive in a single pass. Returns a MediaManifest."""
+    manifest = MediaManifest(drive)
+    for media_file in iter_media_files(drive):
+        manifest.add(media_file)
+    manifest.complete = True
+    return manifest
+
+
+# Files buffered between a card's scanner and its copier. The scanner
+# pauses when the copier falls this far behind, so it does not keep
+# competing with the copy for the card's bandwidth.
+SCAN_QUEUE_SIZE = 10000
+SCAN_DONE = None
+
+
+def _put_unless_cancelled(files_queue, item, cancel_event):
+    while not cancel_event.is_set():
+        try:
+            files_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def start_media_scan(drive, manifest, cancel_event, maxsize=SCAN_QUEUE_SIZE, skip=None, prepare=None):
+    """
+    Scans the drive on a background thread. Every MediaFile is added to the
+    manifest and put on the returned bounded queue, so copying can start
+    with the first file found. SCAN_DONE marks the end of the scan and
+    manifest.complete is set once the totals are final. Files for which
+    skip(media_file) is true go to manifest.skipped instead; prepare(media_file)
+    is called on the others before they are queued.
+    """
+    files_queue = queue.Queue(maxsize=maxsize)
+
+    def scan():
+        started = time.perf_counter()
+        try:
+            for media_file in iter_media_files(drive):
+                if skip is not None and skip(media_file):
+                    manifest.skip(media_file)
+                    continue
+                manifest.add(media_file)
+                if prepare is not None:
+                    prepare(media_file)
+                if not _put_unless_cancelled(files_queue, media_file, cancel_event):
+                    return
+        finally:
+            manifest.scan_seconds = time.perf_counter() - started
+            manifest.complete = True
+            _put_unless_cancelled(files_queue, SCAN_DONE, cancel_event)
+
+    scanner = threading.Thread(target=scan, daemon=True)
+    scanner.start()
+    return files_queue, scanner
+
+
+def iter_scanned_files(files_queue, cancel_event):
+    """Yields MediaFiles from a start_media_scan queue until the scan ends or is cancelled."""
+    while not cancel_event.is_set():
+        try:
+            media_file = files_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if media_file is SCAN_DONE:
+            return
+        yield media_file
 
 
 def scan_media_files(drive, extensions):
     """Scan drive for files with given extensions. Returns (file_list, total_size_bytes)."""
     file_list = []
     total_size = 0
-    for root, _, files in os.walk(Path(drive + "/")):
-        for file in files:
-            ext = Path(file).suffix.lower()
-            if ext in extensions:
-                path = Path(root) / file
-                file_list.append(path)
-                try:
-                    total_size += os.path.getsize(path)
-                except Exception:
-                    pass
+    for media_file in iter_media_files(drive):
+        if media_file.path.suffix.lower() in extensions:
+            file_list.append(media_file.path)
+            total_size += media_file.size
     return file_list, total_size
 
 
+# Copy engine tuning: bytes per read/write in the buffered path, and how
+# often (in bytes) progress is reported while a single file is copying
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+PROGRESS_STEP = 4 * 1024 * 1024
+
+# Errors that mean a kernel copy path is not usable for this pair of files
+_KERNEL_COPY_FALLBACK_ERRNOS = {
+    errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP,
+    errno.EBADF, errno.EPERM, errno.ENOTSOCK,
+}
+
+
+class CopyCancelled(Exception):
+    """Raised by copy_file when the cancel event is set mid-file."""
+
+
+class WriterStopped(OSError):
+    """Raised when a copier's writer thread has died, so nothing queued to it will be written."""
+
+
+def _kernel_copy(copy_chunk, step, cancel_event, report):
+    """
+    Drives a kernel copy primitive until EOF. Returns the bytes copied, or
+    None when the primitive is unavailable before any byte was copied.
+    """
+    copied = 0
+    while True:
+        if cancel_event is not None and cancel_event.is_set():
+            raise CopyCancelled()
+        try:
+            n = copy_chunk(copied, step)
+        except OSError as e:
+            if copied == 0 and e.errno in _KERNEL_COPY_FALLBACK_ERRNOS:
+                return None
+            raise
+        if n == 0:
+            return copied
+        copied += n
+        report(n)
+
+
+# Checksums use xxHash when the xxhash package is installed, BLAKE2 otherwise
+HASH_ALGORITHM = "xxh3_128" if xxhash is not None else "blake2b"
+# Read-back verifications run at once, apart from the chunk hashing copies wait on
+VERIFY_WORKERS = 2
+_hash_pool = None
+_verify_pool = None
+_hash_pool_lock = threading.Lock()
+
+
+def new_hasher():
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def hash_pool():
+    """Shared threads that hash chunks while the copy threads do I/O."""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix="hash")
+        return _hash_pool
+
+
+def verify_pool():
+    """Shared threads that read copies back, so they never hold up hash_pool()."""
+    global _verify_pool
+    with _hash_pool_lock:
+        if _verify_pool is None:
+            _verify_pool = ThreadPoolExecutor(max_workers=VERIFY_WORKERS, thread_name_prefix="verify")
+        return _verify_pool
+
+
+def _write_chunk(fdst, chunk, hasher, timings=None):
+    """
+    Writes chunk, hashing it on the hash pool at the same time. Both hashlib
+    and xxhash release the GIL, so the hash is computed while the write
+    runs. Returns once both are done, so the buffer can be reused.
+    With timings (a run_report.FileTimings) the write and any wait for the
+    hash after it are recorded.
+    """
+    if timings is not None:
+        started = time.perf_counter()
+    if hasher is None:
+        fdst.write(chunk)
+        if timings is not None:
+            timings.add("write", time.perf_counter() - started)
+        return
+    hashed = hash_pool().submit(hasher.update, chunk)
+    try:
+        fdst.write(chunk)
+    finally:
+        if timings is not None:
+            written = time.perf_counter()
+            timings.add("write", written - started)
+        hashed.result()
+        if timings is not None:
+            timings.add("hash", time.perf_counter() - written)
+
+
+def _hash_prefix(path, length, hasher, buffer_size=COPY_BUFFER_SIZE):
+    """Feeds the first length bytes of path to hasher (used when resuming a copy)."""
+    buf = memoryview(bytearray(max(1, min(buffer_size, length))))
+    with open(path, 'rb') as f:
+        while length > 0:
+            n = f.readinto(buf[:min(len(buf), length)])
+            if not n:
+                break
+            hasher.update(buf[:n])
+            length -= n
+
+
+def _open_destination(dst, offset):
+    """Opens dst for writing; with an offset, keeps its first offset bytes and appends after them."""
+    if not offset:
+        return open(dst, 'wb')
+    fdst = open(dst, 'r+b')
+    fdst.truncate(offset)
+    fdst.seek(offset)
+    return fdst
+
+
+def verify_file(path, digest, buffer_size=COPY_BUFFER_SIZE):
+    """
+    Reads path back and returns True if it hashes to digest. On Linux the
+    file's pages are dropped from the cache first, so the data really comes
+    from the disk and not from memory.
+    """
+    hasher = new_hasher()
+    with open(path, 'rb') as f:
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.fsync(f.fileno())
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            except OSError:
+                pass
+        buf = memoryview(bytearray(buffer_size))
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            hasher.update(buf[:n])
+    return hasher.hexdigest() == digest
+
+
+def copy_file(src, dst, progress=None, cancel_event=None, buffer_size=COPY_BUFFER_SIZE, hasher=None,
+              offset=0, keep_partial=False, timings=None):
+    """
+    Copies src to dst with its metadata, like shutil.copy2, and returns the
+    number of bytes copied. On Linux the data goes through
+    os.copy_file_range or os.sendfile, so it never enters Python; otherwise
+    a readinto loop with a buffer of buffer_size bytes is used.
+    With a hasher (see new_hasher) the data is hashed as it streams through
+    the buffer, so the source is read only once; kernel copies are skipped.
+    progress(nbytes) is called with the bytes copied since the last call,
+    about every PROGRESS_STEP bytes and once more at the end of the file.
+    If cancel_event is set mid-file CopyCancelled is raised.
+    A partial dst is removed on failure unless keep_partial is set. With an
+    offset, the first offset bytes already in dst are kept (and hashed from
+    dst) and copying resumes from there; the return value excludes them.
+    With timings (a run_report.FileTimings) the time spent opening,
+    reading, writing, hashing and copying metadata is recorded; the kernel
+    paths are skipped so reads and writes can be told apart.
+    """
+    pending = 0
+    kernel_copy = hasher is None and timings is None
+
+    def report(n):
+        nonlocal pending
+        if progress is None:
+            return
+        pending += n
+        if pending >= PROGRESS_STEP:
+            progress(pending)
+            pending = 0
+
+    # Kernel copies move PROGRESS_STEP bytes per call so progress keeps flowing
+    step = PROGRESS_STEP
+    if timings is not None:
+        started = time.perf_counter()
+    try:
+        with open(src, 'rb') as fsrc, _open_destination(dst, offset) as fdst:
+            if timings is not None:
+                timings.add("open", time.perf_counter() - started)
+            if offset:
+                fsrc.seek(offset)
+                if hasher is not None:
+                    _hash_prefix(dst, offset, hasher)
+            infd, outfd = fsrc.fileno(), fdst.fileno()
+            copied = None
+            if kernel_copy and hasattr(os, "copy_file_range"):
+                copied = _kernel_copy(
+                    lambda done, n: os.copy_file_range(infd, outfd, n),
+                    step, cancel_event, report)
+            if copied is None and kernel_copy and hasattr(os, "sendfile") and os.name == "posix":
+                copied = _kernel_copy(
+                    lambda done, n: os.sendfile(outfd, infd, offset + done, n),
+                    step, cancel_event, report)
+            if copied is None:
+                copied = 0
+                size = os.fstat(infd).st_size
+                buf = memoryview(bytearray(max(1, min(buffer_size, size or buffer_size))))
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise CopyCancelled()
+                    if timings is not None:
+                        started = time.perf_counter()
+                        n = fsrc.readinto(buf)
+                        timings.add("read", time.perf_counter() - started)
+                    else:
+                        n = fsrc.readinto(buf)
+                    if not n:
+                        break
+                    _write_chunk(fdst, buf[:n], hasher, timings)
+                    copied += n
+                    report(n)
+    except BaseException:
+        if not keep_partial:
+            try:
+                os.remove(dst)
+            except OSError:
+                pass
+        raise
+    if timings is not None:
+        started = time.perf_counter()
+    shutil.copystat(src, dst)
+    if timings is not None:
+        timings.add("metadata", time.perf_counter() - started)
+    if progress is not None and pending:
+        progress(pending)
+    return copied
+
+
+# Pipelined mode: buffers shared by one card's reader and writer threads.
+# Memory per card is capped at COPY_PIPELINE_BUFFERS * COPY_BUFFER_SIZE.
+COPY_PIPELINE_BUFFERS = 4
+
+
+class BufferPool:
+    """A fixed set of reusable buffers; acquire() blocks while all are in use."""
+
+    def __init__(self, count=COPY_PIPELINE_BUFFERS, size=COPY_BUFFER_SIZE):
+        self.size = size
+        self.free = queue.Queue()
+        for _ in range(count):
+            self.free.put(bytearray(size))
+
+    def acquire(self, cancel_event=None, alive=None):
+        """A free buffer; raises once cancel_event is set or alive() is false (its users are gone)."""
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise CopyCancelled()
+            if alive is not None and not alive():
+                raise WriterStopped()
+            try:
+                return self.free.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def release(self, buf):
+        self.free.put(buf)
+
+
+class PipelinedCopier:
+    """
+    Overlapped copying for one card. The thread calling copy() reads from
+    the card into pooled buffers while a writer thread writes them to the
+    destination, so the card and the destination disk work at the same time.
+    Reading the next file starts while the previous one is still being
+    written. Call close() when done; it waits for the writer to finish.
+    """
+
+    def __init__(self, cancel_event=None, buffers=COPY_PIPELINE_BUFFERS, buffer_size=COPY_BUFFER_SIZE):
+        self.cancel_event = cancel_event
+        self.pool = BufferPool(buffers, buffer_size)
+        self.jobs = queue.Queue()
+        self.error = None
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    def copy(self, src, dst, progress=None, done=None, hasher=None, offset=0, keep_partial=False, timings=None):
+        """
+        Reads src into the pipeline for dst and returns once it has been read.
+        progress(nbytes) is called as data is written and done(dst, nbytes)
+        once dst is complete with its metadata, both from the writer thread.
+        A hasher is fed each chunk while the writer writes it. offset,
+        keep_partial and timings work as in copy_file.
+        """
+        self._check_error()
+        if timings is not None:
+            started = time.perf_counter()
+        with open(src, 'rb') as fsrc:
+            if timings is not None:
+                timings.add("open", time.perf_counter() - started)
+            if offset:
+                fsrc.seek(offset)
+            self.jobs.put(("open", src, dst, progress, done, hasher, offset, timings, keep_partial))
+            try:
+                while True:
+                    buf = self.pool.acquire(self.cancel_event, self.writer.is_alive)
+                    if timings is not None:
+                        started = time.perf_counter()
+                        n = fsrc.readinto(buf)
+                        timings.add("read", time.perf_counter() - started)
+                    else:
+                        n = fsrc.readinto(buf)
+                    if not n:
+                        self.pool.release(buf)
+                        break
+                    self.jobs.put(("data", buf, n))
+                    self._check_error()
+            except BaseException:
+                self.jobs.put(("abort",))
+                raise
+        self.jobs.put(("close",))
+
+    def flush(self):
+        """Waits until the files queued so far are written and their done() has run."""
+        written = threading.Event()
+        self.jobs.put(("flush", written))
+        while not written.wait(0.1):
+            if not self.writer.is_alive():
+                self._check_error()
+                raise WriterStopped()
+        self._check_error()
+
+    def close(self):
+        """Waits until everything queued has been written. Re-raises a writer error."""
+        self.jobs.put(None)
+        self.writer.join()
+        self._check_error()
+
+    def _check_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def _write_loop(self):
+        fdst = None
+        current = None
+        written = 0
+        pending = 0
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            kind = job[0]
+            if kind == "data":
+                _, buf, n = job
+                try:
+                    if fdst is not None:
+                        _write_chunk(fdst, memoryview(buf)[:n], current[4], current[6])
+                        written += n
+                        pending += n
+                        if current[2] is not None and pending >= PROGRESS_STEP:
+                            current[2](pending)
+                            pending = 0
+                except BaseException as e:
+                    self.error = e
+                    self._discard(fdst, current)
+                    fdst = None
+                finally:
+                    self.pool.release(buf)
+                continue
+            if kind == "open":
+                current = job[1:]
+                written = pending = 0
+                src, dst, progress, done, hasher, offset, timings, keep_partial = current
+                try:
+                    if timings is not None:
+                        started = time.perf_counter()
+                    fdst = _open_destination(dst, offset)
+                    if timings is not None:
+                        timings.add("open", time.perf_counter() - started)
+                    if offset and hasher is not None:
+                        _hash_prefix(dst, offset, hasher)
+                except BaseException as e:
+                    self.error = e
+                    fdst = None
+            elif kind == "abort":
+                self._discard(fdst, current)
+                fdst = None
+            elif kind == "flush":
+                job[1].set()
+            elif kind == "close" and fdst is not None:
+                src, dst, progress, done = current[:4]
+                timings = current[6]
+                try:
+                    fdst.close()
+                    fdst = None
+                    if timings is not None:
+                        started = time.perf_counter()
+                    shutil.copystat(src, dst)
+                    if timings is not None:
+                        timings.add("metadata", time.perf_counter() - started)
+                except BaseException as e:
+                    self.error = e
+                    self._discard(fdst, current)
+                    fdst = None
+                    continue
+                try:
+                    if progress is not None and pending:
+                        progress(pending)
+                    if done is not None:
+                        done(dst, written)
+                except BaseException as e:
+                    self.error = e
+
+    def _discard(self, fdst, current):
+        """Closes and, unless keep_partial, deletes a copy that failed; never raises."""
+        if fdst is not None:
+            try:
+                fdst.close()
+            except BaseException as e:
+                # e.g. EIO flushing to a share; the writer must live on to drain the queue
+                if self.error is None:
+                    self.error = e
+        # current[-1] is keep_partial
+        if current is not None and not current[-1]:
+            try:
+                os.remove(current[1])
+            except OSError:
+                pass
+
+
+# Fan-out mode: how many chunks the slowest destination may fall behind
+# the card before reading waits. Memory is FANOUT_BUFFERS * COPY_BUFFER_SIZE
+# per card, however many destinations there are.
+FANOUT_BUFFERS = 6
+
+
+class _SharedBuffer:
+    """A pooled buffer read once and written by several writers; back in the pool once all are done."""
+    __slots__ = ("pool", "buf", "users", "lock")
+
+    def __init__(self, pool, buf, users):
+        self.pool = pool
+        self.buf = buf
+        self.users = users
+        self.lock = threading.Lock()
+
+    def release(self):
+        with self.lock:
+            self.users -= 1
+            last = self.users == 0
+        if last:
+            self.pool.release(self.buf)
+
+
+class _FanOutFile:
+    """One file on its way to every destination of a FanOutCopier."""
+
+    def __init__(self, src, dsts, progress, done, timings, offset=0, keep_partial=False):
+        self.src = src
+        self.dsts = dsts
+        self.progress = progress
+        self.done = done
+        self.timings = timings
+        self.offset = offset
+        self.keep_partial = keep_partial
+        self.errors = [None] * len(dsts)
+        self.remaining = len(dsts)
+        self.lock = threading.Lock()
+
+    def all_failed(self):
+        return all(error is not None for error in self.errors)
+
+    def finish_destination(self):
+        """Called by each writer once it is done with the file; the last one calls done."""
+        with self.lock:
+            self.remaining -= 1
+            last = self.remaining == 0
+        if last and self.done is not None:
+            self.done(self.errors)
+
+
+class FanOutCopier:
+    """
+    Copies each file of a card to several destinations while reading it
+    from the card only once. The thread calling copy() reads into pooled
+    buffers; every destination has its own writer thread, so a slow disk
+    only holds the others back once it is FANOUT_BUFFERS chunks behind.
+    A destination that fails gives up on that file and discards its copy
+    while the others carry on. Call close() when done.
+    """
+
+    def __init__(self, destinations, cancel_event=None, buffers=FANOUT_BUFFERS, buffer_size=COPY_BUFFER_SIZE):
+        self.cancel_event = cancel_event
+        self.pool = BufferPool(buffers, buffer_size)
+        self.queues = [queue.Queue() for _ in range(destinations)]
+        self.error = None
+        self.writers = [
+            threading.Thread(target=self._write_loop, args=(i,), daemon=True) for i in range(destinations)
+        ]
+        for writer in self.writers:
+            writer.start()
+
+    def copy(self, src, dsts, progress=None, done=None, hasher=None, offset=0, keep_partial=False,
+             timings=None):
+        """
+        Reads src once and writes it to every path in dsts, one per
+        destination; returns once src has been read. progress(i, nbytes)
+        is called from destination i's writer as data lands there, and
+        done(errors) once every destination has finished the file, from
+        the last writer: errors[i] is None where dsts[i] is complete with
+        its metadata, else the exception that stopped it. A hasher is fed
+        each chunk once, on the hash pool. With an offset, every dst keeps
+        its first offset bytes (hashed from dsts[0]) and copying resumes
+        there. keep_partial keeps the copies when the read stops (cancel or
+        a card error); a destination that fails alone is always discarded.
+        timings (a run_report.FileTimings) records the reads, hashing and
+        the first destination's writes.
+        """
+        self._check_error()
+        fan = _FanOutFile(src, dsts, progress, done, timings, offset, keep_partial)
+        if timings is not None:
+            started = time.perf_counter()
+        with open(src, 'rb') as fsrc:
+            if timings is not None:
+                timings.add("open", time.perf_counter() - started)
+            if offset:
+                fsrc.seek(offset)
+                if hasher is not None:
+                    _hash_prefix(dsts[0], offset, hasher)
+            self._put(("open", fan))
+            hashed = None
+            try:
+                while not fan.all_failed():
+                    buf = self.pool.acquire(self.cancel_event, self._writers_alive)
+                    if timings is not None:
+                        started = time.perf_counter()
+                        n = fsrc.readinto(buf)
+                        timings.add("read", time.perf_counter() - started)
+                    else:
+                        n = fsrc.readinto(buf)
+                    if not n:
+                        self.pool.release(buf)
+                        break
+                    users = len(dsts)
+                    if hasher is not None:
+                        users += 1
+                        if hashed is not None:
+                            # Chunks must reach the hasher in order
+                            self._wait_for_hash(hashed, timings)
+                    shared = _SharedBuffer(self.pool, buf, users)
+                    if hasher is not None:
+                        hashed = hash_pool().submit(self._hash_chunk, hasher, shared, n)
+                    self._put(("data", fan, shared, n))
+                    self._check_error()
+                if hashed is not None:
+                    self._wait_for_hash(hashed, timings)
+            except BaseException:
+                self._put(("abort", fan))
+                raise
+        self._put(("close", fan))
+
+    @staticmethod
+    def _hash_chunk(hasher, shared, n):
+        try:
+            hasher.update(memoryview(shared.buf)[:n])
+        finally:
+            shared.release()
+
+    @staticmethod
+    def _wait_for_hash(hashed, timings):
+        if timings is not None:
+            started = time.perf_counter()
+            hashed.result()
+            timings.add("hash", time.perf_counter() - started)
+        else:
+            hashed.result()
+
+    def _put(self, job):
+        for q in self.queues:
+            q.put(job)
+
+    def _writers_alive(self):
+        return all(writer.is_alive() for writer in self.writers)
+
+    def flush(self):
+        """Waits until the files queued so far are written and their done() has run."""
+        flushed = [threading.Event() for _ in self.writers]
+        for q, event in zip(self.queues, flushed):
+            q.put(("flush", event))
+        for writer, event in zip(self.writers, flushed):
+            while not event.wait(0.1):
+                if not writer.is_alive():
+                    self._check_error()
+                    raise WriterStopped()
+        self._check_error()
+
+    def close(self):
+        """Waits until every destination has written everything queued. Re-raises a callback error."""
+        self._put(None)
+        for writer in self.writers:
+            writer.join()
+        self._check_error()
+
+    def _check_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def _write_loop(self, i):
+        jobs = self.queues[i]
+        fdst = None
+        pending = 0
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            if job[0] == "flush":
+                job[1].set()
+                continue
+            kind, fan = job[0], job[1]
+            # Only the first destination's writes are timed, so phases stay per file
+            timings = fan.timings if i == 0 else None
+            if kind == "data":
+                _, _, shared, n = job
+                try:
+                    if fdst is not None:
+                        _write_chunk(fdst, memoryview(shared.buf)[:n], None, timings)
+                        pending += n
+                        if fan.progress is not None and pending >= PROGRESS_STEP:
+                            fan.progress(i, pending)
+                            pending = 0
+                except BaseException as e:
+                    fan.errors[i] = e
+                    self._discard(fdst, fan, i)
+                    fdst = None
+                finally:
+                    shared.release()
+            elif kind == "open":
+                pending = 0
+                try:
+                    if timings is not None:
+                        started = time.perf_counter()
+                    fdst = _open_destination(fan.dsts[i], fan.offset)
+                    if timings is not None:
+                        timings.add("open", time.perf_counter() - started)
+                except BaseException as e:
+                    fan.errors[i] = e
+                    fdst = None
+            elif kind == "abort":
+                self._discard(fdst, fan, i, fan.keep_partial)
+                fdst = None
+            elif kind == "close":
+                if fdst is not None:
+                    try:
+                        fdst.close()
+                        fdst = None
+                        if timings is not None:
+                            started = time.perf_counter()
+                        shutil.copystat(fan.src, fan.dsts[i])
+                        if timings is not None:
+                            timings.add("metadata", time.perf_counter() - started)
+                    except BaseException as e:
+                        fan.errors[i] = e
+                        self._discard(fdst, fan, i)
+                        fdst = None
+                try:
+                    if fan.progress is not None and pending and fan.errors[i] is None:
+                        fan.progress(i, pending)
+                    fan.finish_destination()
+                except BaseException as e:
+                    self.error = e
+
+    @staticmethod
+    def _discard(fdst, fan, i, keep=False):
+        """Closes and, unless keep, deletes destination i's copy of a file that failed; never raises."""
+        if fdst is not None:
+            try:
+                fdst.close()
+            except BaseException as e:
+                # The writer must live on, or the reader waits on the buffers forever
+                if fan.errors[i] is None:
+                    fan.errors[i] = e
+        if keep:
+            return
+        try:
+            os.remove(fan.dsts[i])
+        except OSError:
+            pass
+
+
+MANIFEST_COLUMNS = ["source", "destination", "size", "algorithm", "hash", "verified", "captured", "camera"]
+
+
+def write_checksum_manifest(path, records, copy=0):
+    """
+    Appends one CSV row per CopyRecord to path: source, destination, size,
+    hash algorithm, hash, verify result, and the capture time (local,
+    YYYY-MM-DD HH:MM:SS) and camera when the file's header was read. The
+    header is written once; a file started with fewer columns keeps them.
+    copy picks the destination listed: 0 for the main copy, n for backup n.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    columns = MANIFEST_COLUMNS
+    if path.exists():
+        with open(path, newline='', encoding='utf-8') as f:
+            columns = next(csv.reader(f), None) or MANIFEST_COLUMNS
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, columns, extrasaction='ignore')
+        if f.tell() == 0:
+            writer.writeheader()
+        for record in records:
+            source = record.source
+            verified = "" if record.verified is None else ("yes" if record.verified else "FAILED")
+            captured = "" if source.captured is None else time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(source.captured))
+            writer.writerow({
+                "source": str(source.path),
+                "destination": str(record.destination if copy == 0 else record.backups[copy - 1]),
+                "size": source.size, "algorithm": HASH_ALGORITHM, "hash": record.digest or "",
+                "verified": verified, "captured": captured, "camera": source.camera or "",
+            })
+
+
 def format_size(num_bytes):
     if num_bytes >= 1024**3:
         return f"{num_bytes/1024**3:.2f} GB"
@@ -152,70 +1007,817 @@ def format_size(num_bytes):
         return f"{num_bytes} B"
 
 
-def transfer_sd_card(idx, drive, picture_dest, video_dest,sound_dest, cancel_event, speed_callback, result_callback):
-    total_bytes = 0
-    start_time = time.time()
-    found = False
-    for root, _, files in os.walk(Path(drive + "/")):
-        for file in files:
-            if cancel_event.is_set():
-                result_callback(idx, "Transfer cancelled.")
+# How often the GUI applies queued progress events (about 10 frames per second)
+UI_FRAME_MS = 100
+# How often the GUI applies card insert/remove events from the watcher
+DRIVE_POLL_MS = 200
+# Latest thumbnails shown in each card's contact sheet, and its columns
+CONTACT_SHEET_SIZE = 8
+CONTACT_SHEET_COLUMNS = 4
+
+
+class UiEventBus:
+    """
+    Thread-safe hand-off of progress events from worker threads to Tk.
+
+    Workers only post small (card, kind, value) events. The Tk thread drains
+    them every frame_ms with root.after, merges each card's events into one
+    update per frame and hands {idx: changes} to the current renderer.
+    "files", "bytes", "reused" and "refused" events are deltas and are summed,
+    "thumbnail" events are collected into a list; any other kind (speed,
+    status, ...) keeps its latest value.
+    """
+    COUNTERS = ("files", "bytes", "reused", "refused")
+    LISTS = ("thumbnail",)
+
+    def __init__(self, root, frame_ms=UI_FRAME_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.events = queue.SimpleQueue()
+        self.renderer = None
+        self.generation = 0
+
+    def open(self, renderer):
+        """
+        Makes renderer the target of new frames and returns the post function
+        for workers. Events still queued from an earlier run are dropped.
+        """
+        self.generation += 1
+        self.renderer = renderer
+        generation = self.generation
+
+        def post(idx, kind, value=None):
+            self.events.put((generation, idx, kind, value))
+        return post
+
+    def start(self):
+        self.root.after(self.frame_ms, self._pump)
+
+    def _pump(self):
+        frame = {}
+        try:
+            while True:
+                try:
+                    generation, idx, kind, value = self.events.get_nowait()
+                except queue.Empty:
+                    break
+                if generation != self.generation:
+                    continue
+                changes = frame.setdefault(idx, {})
+                if kind in self.COUNTERS:
+                    changes[kind] = changes.get(kind, 0) + value
+                elif kind in self.LISTS:
+                    changes.setdefault(kind, []).append(value)
+                else:
+                    changes[kind] = value
+            if self.renderer is not None:
+                self.renderer(frame)
+        finally:
+            self.root.after(self.frame_ms, self._pump)
+
+
+def device_id(path):
+    """Returns the st_dev of the device holding path, or of its nearest existing parent."""
+    path = Path(path)
+    for candidate in (path, *path.parents):
+        try:
+            return os.stat(candidate).st_dev
+        except OSError:
+            continue
+    return path.anchor
+
+
+class CardTransfer:
+    """
+    The transfer of one card, run file by file by a TransferScheduler.
+
+    The card is scanned in the background; each file found gets its path
+    in destinations[category] from a DestinationPlan named by naming, and
+    order (a transfer_order policy) picks the next one to copy. Callbacks
+    get progress deltas, speed and the final status, all keyed by idx;
+    progress_callback(idx, files, nbytes, copied=True) gets copied=False
+    for bytes already at the destination (resumed or deduplicated).
+    Files are written as .part and renamed when complete; a TransferJournal
+    in journal_dir lets a stopped card resume. Optional: an ImportLedger
+    to skip imported files, checksums and verify, a DedupIndex, a
+    RunRecorder, ThroughputProfiles for eta(), a BandwidthLimiter, backups
+    written from the same read, adaptive files in flight and a
+    ThumbnailCache.
+    """
+
+    def __init__(self, idx, drive, destinations, cancel_event, speed_callback, result_callback,
+                 progress_callback=None, manifest=None, pipelined=False, name=None,
+                 ledger=None, volume=None, checksums=False, verify=False, checksum_manifest=None,
+                 dedup=None, dedup_mode="link", journal_dir=None, eject=True, recorder=None,
+                 profiles=None, volname="", bandwidth=None, order=DEFAULT_ORDER, backups=None,
+                 adaptive=False, thumbnails=None, naming=DEFAULT_NAMING):
+        self.idx = idx
+        self.drive = drive
+        self.root = Path(drive + "/")
+        self.name = name or f"cam{idx}"
+        self.destinations = destinations
+        self.cancel_event = cancel_event
+        self.speed_callback = speed_callback
+        self.result_callback = result_callback
+        self.progress_callback = progress_callback
+        self.manifest = manifest if manifest is not None else MediaManifest(drive)
+        self.eject = eject
+        self.backups = backups or []
+        self.pipelined = pipelined and not (adaptive and not self.backups)
+        self.naming = naming if isinstance(naming, NamingTemplate) else NamingTemplate(naming)
+        self.backup_plans = [DestinationPlan(backup, naming=self.naming) for backup in self.backups]
+        self.backup_bytes = [0] * len(self.backups)
+        # Files that could not be written, per destination (the main one first)
+        self.destination_failures = [0] * (1 + len(self.backups))
+        self.destination_errors = [None] * (1 + len(self.backups))
+        # A pipelined or fan-out copier has a single reader, so one file at a time
+        single_reader = self.pipelined or bool(self.backups)
+        self.adaptive = AdaptiveConcurrency() if adaptive and not single_reader else None
+        self.fixed_in_flight = 1 if single_reader else None
+        # Scheduler hints for adaptive cards
+        self.own_limits = self.adaptive is not None
+        self.extra_workers = ADAPTIVE_MAX_IN_FLIGHT - 1 if self.adaptive is not None else 0
+        self.in_flight = 0
+        self.error = None
+        self.source_device = device_id(drive + "/")
+        self.destination_devices = {category: device_id(path) for category, path in destinations.items()}
+        self.ready = ReadyFiles(order)
+        self.scan_done = False
+        self.bytes_done = 0
+        # Bytes counted as done without being copied: resumed or deduplicated
+        self.resumed_bytes = 0
+        self.files_copied = 0
+        self.start_time = None
+        self.last_done_time = None
+        self.window = RateWindow()
+        self.cost_fit = FileCostFit()
+        self.lock = threading.Lock()
+        self.copier = None
+        self.checksums = checksums or verify
+        self.verify = verify
+        self.verifications = []
+        self.verify_failures = 0
+        if checksum_manifest is None:
+            checksum_manifest = destinations["image"].parent / f"{self.name}_manifest.csv"
+        self.checksum_manifest = checksum_manifest
+        self.dedup = dedup
+        self.dedup_mode = dedup_mode
+        self.dedup_saved_bytes = 0
+        # Sizes of files queued to the pipelined writer since it last caught up
+        self.writing_sizes = set()
+        self.recorder = recorder
+        self.ledger = ledger
+        if volume is None:
+            if not volname:
+                volname = next((v for d, v, _ in get_removable_drives() if d == drive), "")
+            volume = get_volume_identity(drive, volname)
+        self.volume = volume
+        self.volname = volname
+        self.bandwidth = bandwidth
+        self.thumbnails = thumbnails
+        self.profiles = profiles
+        self.profile_key = profiles.key_for(self.volume, volname) if profiles is not None else None
+        if journal_dir is None:
+            journal_dir = destinations["image"].parent
+        self.journal = TransferJournal.for_volume(journal_dir, self.volume)
+        self.journal.set_card(self.name)
+        imported = ledger.load_volume(self.volume) if ledger is not None else set()
+        # Skip what the ledger or an interrupted earlier run already copied
+        skip = None
+        if imported or self.journal.finished:
+            skip = lambda f: (ledger_key(self.relative_path(f), f.size, f.mtime) in imported
+                              or self.journal.is_finished(self.relative_path(f), f.size, f.mtime))
+        self.plan = DestinationPlan(destinations, naming=self.naming)
+        self.read_capture = self.naming.needs_capture or order == "capture"
+        self.camera_label = CAMERA_LABELS.get((volname or "").upper())
+        self.files_queue, self.scanner = start_media_scan(drive, self.manifest, cancel_event, skip=skip,
+                                                          prepare=self._plan)
+
+    # --- Scheduler interface (called with the scheduler's lock held) ---
+    def peek(self):
+        # Take in everything scanned so far, so the order policy sees it all
+        while not self.scan_done:
+            try:
+                media_file = self.files_queue.get_nowait()
+            except queue.Empty:
+                break
+            if media_file is SCAN_DONE:
+                self.scan_done = True
+            else:
+                self.ready.push(media_file)
+        if self.ready.complete_listing and not self.scan_done:
+            return None
+        return self.ready.peek()
+
+    def take(self):
+        return self.ready.pop()
+
+    def exhausted(self):
+        if self.cancel_event.is_set():
+            return True
+        self.peek()
+        return self.scan_done and not self.ready
+
+    def destination_device(self, media_file):
+        return self.destination_devices[media_file.category]
+
+    @property
+    def max_in_flight(self):
+        return self.adaptive.limit if self.adaptive is not None else self.fixed_in_flight
+
+    @property
+    def priority(self):
+        if self.bandwidth is None:
+            return PRIORITY_WEIGHTS[DEFAULT_PRIORITY]
+        return self.bandwidth.weight(self.idx)
+
+    # --- Copying (called on scheduler worker threads) ---
+    def relative_path(self, media_file):
+        return media_file.path.relative_to(self.root).as_posix()
+
+    def _plan(self, media_file):
+        """Reads the file's header if needed and chooses its destination, on the scan thread."""
+        if self.read_capture:
+            try:
+                # Header reads go to the same card as the copies and compete with
+                # them; with an order that waits for the scan, all of them come first
+                media_file.captured, media_file.camera = read_capture_info(media_file.path)
+            except (OSError, ValueError, struct.error):
+                pass
+        key = (self.relative_path(media_file), media_file.size, media_file.mtime)
+        resume = self._resume_point(key)
+        # Copies that landed when another copy of the file failed last time
+        kept = self.journal.kept_copies(*key) or []
+        if resume is not None:
+            # Backups of an interrupted copy keep the names of their .part files too
+            kept = [None] + self.journal.resume_backups(*key)
+        try:
+            if resume is not None:
+                # An interrupted copy keeps the name its .part file has
+                media_file.destination = resume[0]
+                self.plan.reserve(resume[0])
+            elif kept and kept[0]:
+                media_file.destination = Path(kept[0])
+                self.plan.reserve(kept[0])
+            else:
+                media_file.destination = self.plan.assign(media_file.category, media_file.path.name,
+                                                          **self._naming_fields(media_file))
+            if self.backup_plans:
+                media_file.backup_destinations = [
+                    self._backup_destination(plan, media_file, kept[i] if i < len(kept) else None)
+                    for i, plan in enumerate(self.backup_plans, start=1)
+                ]
+        except OSError as e:
+            # The scheduler stops the card; its files are not copied anywhere else
+            if self.error is None:
+                self.error = e
+
+    def _resume_point(self, key):
+        """The journal's resume point for the file, unless it was going to other backup folders."""
+        resume = self.journal.resume_point(*key)
+        if resume is not None and len(self.journal.resume_backups(*key)) != len(self.backups):
+            return None
+        return resume
+
+    def _naming_fields(self, media_file):
+        return {
+            "captured": media_file.captured if media_file.captured is not None else media_file.mtime,
+            "camera": media_file.camera or self.camera_label,
+            "card": self.name,
+        }
+
+    def _backup_destination(self, plan, media_file, kept=None):
+        fields = self._naming_fields(media_file)
+        try:
+            if kept:
+                plan.reserve(kept)
+                return Path(kept)
+            return plan.assign(media_file.category, media_file.path.name, **fields)
+        except OSError:
+            # A backup that cannot be written to fails its copies, not the card
+            return plan.path_for(media_file.category, media_file.path.name, **fields)
+
+    def destination_path(self, media_file):
+        if media_file.destination is None:
+            media_file.destination = self.plan.assign(media_file.category, media_file.path.name,
+                                                      **self._naming_fields(media_file))
+        return media_file.destination
+
+    def run(self, media_file):
+        with self.lock:
+            if self.start_time is None:
+                self.start_time = time.time()
+        rel = self.relative_path(media_file)
+        key = (rel, media_file.size, media_file.mtime)
+        timings = None
+        if self.recorder is not None:
+            timings = self.recorder.start_file(self.name, media_file.path, media_file.size)
+            started = time.perf_counter()
+        resume = self._resume_point(key)
+        if resume is not None:
+            dest_path, offset = resume
+        else:
+            dest_path, offset = self.destination_path(media_file), 0
+            if self.dedup is not None:
+                if media_file.size in self.writing_sizes:
+                    # A file of the same size is still being written; it may be
+                    # this one's twin, and is only in the index once it is done
+                    self.copier.flush()
+                    self.writing_sizes.clear()
+                try:
+                    duplicate = self.dedup.find(media_file.path, media_file.size)
+                except OSError:
+                    # Hashing the card file failed; the copy will tell if it is unreadable
+                    duplicate = None
+                if duplicate is not None:
+                    self._reuse_duplicate(media_file, dest_path, *duplicate)
+                    if timings is not None:
+                        timings.add("prepare", time.perf_counter() - started)
+                        self.recorder.finish_file(timings)
+                    return
+            self.journal.start(*key, dest_path, media_file.backup_destinations or ())
+        if timings is not None:
+            timings.add("prepare", time.perf_counter() - started)
+        part_path = Path(str(dest_path) + PART_SUFFIX)
+        hasher = new_hasher() if self.checksums else None
+        file_bytes = last_checkpoint = offset
+        backups_landed = []
+
+        def on_bytes(nbytes):
+            nonlocal file_bytes, last_checkpoint
+            file_bytes += nbytes
+            if self.bandwidth is not None:
+                if timings is not None:
+                    started = time.perf_counter()
+                    self.bandwidth.consume(self.idx, nbytes, self.cancel_event)
+                    timings.add("throttle", time.perf_counter() - started)
+                else:
+                    self.bandwidth.consume(self.idx, nbytes, self.cancel_event)
+            if timings is not None:
+                started = time.perf_counter()
+                self._on_bytes(nbytes)
+                timings.add("ui", time.perf_counter() - started)
+            else:
+                self._on_bytes(nbytes)
+            if file_bytes - last_checkpoint >= JOURNAL_CHECKPOINT_BYTES:
+                last_checkpoint = file_bytes
+                self.journal.checkpoint(*key, file_bytes)
+
+        def done(part_path, nbytes):
+            self.cost_fit.add(media_file.size - offset, time.perf_counter() - copy_started)
+            if self.adaptive is not None:
+                self.adaptive.file_done(media_file.size - offset)
+            with self.lock:
+                self.files_copied += 1
+                self.last_done_time = time.time()
+            if timings is not None:
+                started = time.perf_counter()
+            os.replace(part_path, dest_path)
+            self.journal.done(*key, dest_path)
+            record = CopyRecord(media_file, dest_path, hasher.hexdigest() if hasher else None,
+                                backups=backups_landed)
+            if self.verify:
+                # Read-back runs on its own pool so the copy keeps going
+                self.verifications.append(verify_pool().submit(self._verify, record))
+            else:
+                self._on_file_done(record)
+            if timings is not None:
+                timings.add("finalize", time.perf_counter() - started)
+                self.recorder.finish_file(timings)
+
+        def on_destination_bytes(i, nbytes):
+            if i == 0:
+                on_bytes(nbytes)
+            else:
+                with self.lock:
+                    self.backup_bytes[i - 1] += nbytes
+
+        def fanned_out(errors):
+            part_paths = [part_path] + [Path(str(p) + PART_SUFFIX) for p in media_file.backup_destinations]
+            finals = [dest_path] + media_file.backup_destinations
+            for i in range(1, len(errors)):
+                if errors[i] is None:
+                    try:
+                        os.replace(part_paths[i], finals[i])
+                        backups_landed.append(finals[i])
+                    except OSError as e:
+                        errors[i] = e
+            if not any(errors):
+                done(part_path, media_file.size)
                 return
-            ext = Path(file).suffix.lower()
-            source_path = Path(root) / file
-            if ext in IMAGE_EXTENSIONS:
-                dest_path = picture_dest / file
-            elif ext in VIDEO_EXTENSIONS:
-                dest_path = video_dest / file
-            elif ext in SOUND_EXTENSIONS:
-                dest_path = sound_dest / file
+            if errors[0] is None:
+                # Kept, but not imported until every copy exists
+                try:
+                    os.replace(part_path, dest_path)
+                except OSError as e:
+                    errors[0] = e
+            # The next run copies the file again over the copies that landed
+            self.journal.keep(*key, [None if error is not None else final for error, final in zip(errors, finals)])
+            with self.lock:
+                for i, error in enumerate(errors):
+                    if error is not None:
+                        self.destination_failures[i] += 1
+                        self.destination_errors[i] = error
+            if timings is not None:
+                self.recorder.finish_file(timings)
+
+        if offset:
+            with self.lock:
+                self.resumed_bytes += offset
+            if self.progress_callback is not None:
+                # Already in the .part file from the interrupted run
+                self.progress_callback(self.idx, 0, offset, False)
+        copy_started = time.perf_counter()
+        try:
+            if self.backups:
+                if self.copier is None:
+                    self.copier = FanOutCopier(1 + len(self.backups), self.cancel_event)
+                if self.dedup is not None:
+                    self.writing_sizes.add(media_file.size)
+                part_paths = [part_path] + [Path(str(p) + PART_SUFFIX) for p in media_file.backup_destinations]
+                self.copier.copy(media_file.path, part_paths, on_destination_bytes, fanned_out, hasher,
+                                 offset=offset, keep_partial=True, timings=timings)
+            elif self.pipelined:
+                if self.copier is None:
+                    self.copier = PipelinedCopier(self.cancel_event)
+                if self.dedup is not None:
+                    self.writing_sizes.add(media_file.size)
+                self.copier.copy(media_file.path, part_path, on_bytes, done, hasher, offset=offset,
+                                 keep_partial=True, timings=timings)
             else:
-                continue
-
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            # Always add date-hour suffix to filename
-            timestamp = datetime.now().strftime("%d-%m-%Y-%H")
-            dest_path = dest_path.parent / f"{dest_path.stem}_{timestamp}{dest_path.suffix}"
+                copy_file(media_file.path, part_path, on_bytes, self.cancel_event, hasher=hasher,
+                          offset=offset, keep_partial=True, timings=timings)
+                done(part_path, media_file.size)
+        except CopyCancelled:
+            pass
 
-            shutil.copy2(source_path, dest_path)
+    def _reuse_duplicate(self, media_file, dest_path, existing, digest):
+        if self.backups and not self._back_up_duplicate(media_file, existing, digest):
+            return
+        destination = existing
+        if self.dedup_mode == "link":
             try:
-                total_bytes += os.path.getsize(source_path)
-            except Exception:
+                os.link(existing, dest_path)
+                destination = dest_path
+            except OSError:
                 pass
-            found = True
-
-            # Update transfer speed
-            elapsed = time.time() - start_time
-            speed = total_bytes / elapsed if elapsed > 0 else 0
-            speed_callback(idx, speed)
-
-    if found and not cancel_event.is_set():
-        eject_drive(drive)
-        result_callback(idx, f"Transferred and ejected cam{idx}.")
-    elif not found:
-        result_callback(idx, f"SD card {idx} found, but no media files detected.")
-
-
-def process_cameras_parallel(cancel_event, speed_callback, result_callback):
-    drives = get_removable_drives()
-    threads = []
-    for idx, drive in enumerate(drives, start=1):
-        picture_dest = PICTURE_BASE_DIR / f"cam{idx}"
-        video_dest = VIDEO_BASE_DIR / f"cam{idx}"
-        sound_dest = SOUND_BASE_DIR / f"cam{idx}"
-        t = threading.Thread(
-            target=transfer_sd_card,
-            args=(idx, drive, picture_dest, video_dest, sound_dest,cancel_event, speed_callback, result_callback)
-        )
-        threads.append(t)
-        t.start()
-    for t in threads:
-        t.join()
+        with self.lock:
+            self.dedup_saved_bytes += media_file.size
+            self.resumed_bytes += media_file.size
+        # Source and existing copy hashed the same, so this counts as verified
+        record = CopyRecord(media_file, destination, digest, True, backups=list(media_file.backup_destinations or ()))
+        self._on_file_done(record, indexed=destination == existing)
+        if self.progress_callback is not None:
+            self.progress_callback(self.idx, 0, media_file.size, False)
+
+    def _back_up_duplicate(self, media_file, existing, digest):
+        """
+        Copies existing, whose content matches the card file, to each of the
+        file's backup destinations, so the card is not read. Never a hard
+        link: a backup must not share its data with the main copy. Returns
+        True once every backup has it; otherwise the file is not imported
+        and the next run copies it again.
+        """
+        landed = []
+        for i, backup in enumerate(media_file.backup_destinations, start=1):
+            try:
+                self._copy_duplicate(existing, backup, digest)
+            except CopyCancelled:
+                return False
+            except OSError as e:
+                landed.append(None)
+                with self.lock:
+                    self.destination_failures[i] += 1
+                    self.destination_errors[i] = e
+                continue
+            landed.append(backup)
+            with self.lock:
+                self.backup_bytes[i - 1] += media_file.size
+        media_file.backup_destinations = landed
+        if None in landed:
+            self.journal.keep(self.relative_path(media_file), media_file.size, media_file.mtime, [None] + landed)
+            return False
+        return True
+
+    def _copy_duplicate(self, existing, backup, digest):
+        part_path = Path(str(backup) + PART_SUFFIX)
+        hasher = new_hasher()
+        copy_file(existing, part_path, cancel_event=self.cancel_event, hasher=hasher)
+        if hasher.hexdigest() != digest:
+            os.remove(part_path)
+            raise OSError(f"{existing} changed while it was copied")
+        os.replace(part_path, backup)
+
+    def _verify(self, record):
+        try:
+            record.verified = all(
+                verify_file(path, record.digest) for path in [record.destination] + record.backups
+            )
+        except OSError:
+            record.verified = False
+        if record.verified:
+            self._on_file_done(record)
+        else:
+            with self.lock:
+                self.verify_failures += 1
+            # Copy it again next time
+            source = record.source
+            self.journal.forget(self.relative_path(source), source.size, source.mtime)
+        return record
+
+    def _on_bytes(self, nbytes):
+        with self.lock:
+            self.bytes_done += nbytes
+        self.window.add(nbytes)
+        speed = self.window.rate()
+        if self.progress_callback is not None:
+            self.progress_callback(self.idx, 0, nbytes)
+        self.speed_callback(self.idx, speed)
+
+    def eta(self):
+        """
+        Seconds until the card is copied, or None when unknown. While the
+        scan runs this only covers the files found so far.
+        """
+        with self.lock:
+            done = self.bytes_done + self.resumed_bytes
+        remaining_bytes = max(0, self.manifest.total_bytes - done)
+        remaining_files = max(0, self.manifest.total_files - len(self.manifest.copied))
+        if self.window.settled():
+            rate = self.window.rate()
+            # A card that stalled keeps no ETA rather than an absurd one
+            return remaining_bytes / rate if rate > 0 else None
+        if self.profiles is not None:
+            return self.profiles.estimate(self.profile_key, remaining_files, remaining_bytes)
+        return None
+
+    def expected_rate(self):
+        """Sustained bytes per second learned for this card, or None."""
+        profile = self.profiles.get(self.profile_key) if self.profiles is not None else None
+        return profile["mb_per_s"] * 1024 * 1024 if profile else None
+
+    def _learn_profile(self):
+        if self.last_done_time is None or self.start_time is None:
+            return
+        self.profiles.learn(self.profile_key, self.files_copied, self.bytes_done,
+                            self.last_done_time - self.start_time, self.cost_fit)
+        try:
+            self.profiles.save()
+        except OSError as e:
+            print("Could not save throughput profiles:", e)
+
+    def _on_file_done(self, record, indexed=False):
+        """indexed: record.destination is already in the DedupIndex."""
+        self.manifest.copied.append(record)
+        media_file = record.source
+        if self.dedup is not None and not indexed and record.destination != media_file.path:
+            self.dedup.add(record.destination, media_file.size, record.digest)
+        if self.ledger is not None:
+            self.ledger.record(self.volume, self.relative_path(media_file), media_file.size, media_file.mtime,
+                               record.destination, media_file.captured, media_file.camera)
+        if self.thumbnails is not None and media_file.category == "image":
+            self.thumbnails.submit(record.destination, self.idx)
+        if self.progress_callback is not None:
+            self.progress_callback(self.idx, 1, 0)
+
+    def finish(self):
+        if self.copier is not None:
+            try:
+                self.copier.close()
+            except BaseException as e:
+                if self.error is None:
+                    self.error = e
+        # Copies that failed verification are listed in the CSV but not in manifest.copied
+        failed = [record for record in (v.result() for v in self.verifications) if not record.verified]
+        if self.ledger is not None:
+            self.ledger.flush()
+        records = self.manifest.copied + failed
+        if self.checksums and records:
+            try:
+                write_checksum_manifest(self.checksum_manifest, records)
+                for i, backup in enumerate(self.backups, start=1):
+                    manifest_path = Path(backup["image"]).parent / Path(self.checksum_manifest).name
+                    write_checksum_manifest(manifest_path, records, copy=i)
+            except OSError as e:
+                if self.error is None:
+                    self.error = e
+        if self.bandwidth is not None:
+            self.bandwidth.finish_card(self.idx)
+        failed_copies = sum(self.destination_failures)
+        complete = (not self.cancel_event.is_set() and self.error is None and not self.verify_failures
+                    and not failed_copies)
+        self.journal.close(remove=complete)
+        if complete and self.profiles is not None:
+            self._learn_profile()
+        if self.recorder is not None:
+            self.recorder.add_card(
+                self.name, drive=self.drive, volume=self.volume,
+                elapsed=time.time() - self.start_time if self.start_time else 0.0,
+                scan_seconds=self.manifest.scan_seconds, skipped=len(self.manifest.skipped),
+                verify_failures=self.verify_failures, error=str(self.error) if self.error else None,
+            )
+            if self.adaptive is not None:
+                # How the number of files in flight was tuned: [seconds, files, bytes/s]
+                self.recorder.add_card(self.name, in_flight=[list(step) for step in self.adaptive.history])
+        skipped = len(self.manifest.skipped)
+        if self.cancel_event.is_set():
+            self.result_callback(self.idx, "Transfer cancelled.")
+        elif self.error is not None:
+            self.result_callback(self.idx, f"Transfer failed: {self.error}")
+        elif self.verify_failures:
+            self.result_callback(self.idx, f"{self.verify_failures} files failed verification; card not ejected.")
+        elif failed_copies:
+            failures = "; ".join(
+                f"{count} on {'the main folder' if i == 0 else f'backup {i}'} ({self.destination_errors[i]})"
+                for i, count in enumerate(self.destination_failures) if count
+            )
+            self.result_callback(self.idx, f"Some copies failed: {failures}. Card not ejected; run it again to retry them.")
+        elif not self.manifest.files and skipped:
+            self.result_callback(self.idx, f"All {skipped} files were already imported.")
+        elif not self.manifest.files:
+            self.result_callback(self.idx, f"SD card {self.idx} found, but no media files detected.")
+        else:
+            note = f" ({skipped} already imported, skipped)" if skipped else ""
+            if self.dedup_saved_bytes:
+                note += f" ({format_size(self.dedup_saved_bytes)} deduplicated)"
+            if self.eject:
+                eject_drive(self.drive)
+                self.result_callback(self.idx, f"Transferred and ejected {self.name}{note}.")
+            else:
+                self.result_callback(self.idx, f"Transferred {self.name}{note}.")
+
+
+def next_cam_numbers(count, base_dirs, taken=()):
+    """
+    Returns count cam numbers whose cam<n> folder does not exist yet in any
+    of base_dirs, skipping the numbers in taken (cards already assigned one).
+    """
+    numbers = []
+    n = 1
+    while len(numbers) < count:
+        if n not in taken and not any((Path(base) / f"cam{n}").exists() for base in base_dirs):
+            numbers.append(n)
+        n += 1
+    return numbers
+
+
+def cam_numbers_for(drives, base_dirs, journal_dir, taken=()):
+    """
+    Returns a cam number for each (drive, volume name, size) tuple in
+    drives: the one an interrupted transfer of the card used, so it resumes
+    into the same folders, else the next free one from next_cam_numbers.
+    """
+    numbers = []
+    for drive, volname, _ in drives:
+        card = journaled_card(journal_dir, get_volume_identity(drive, volname)) or ""
+        match = re.fullmatch(r"cam(\d+)", card)
+        n = int(match.group(1)) if match else None
+        numbers.append(n if n not in taken and n not in numbers else None)
+    free = iter(next_cam_numbers(numbers.count(None), base_dirs, set(taken) | set(numbers)))
+    return [n if n is not None else next(free) for n in numbers]
+
+
+def transfer_sd_card(idx, drive, picture_dest, video_dest,sound_dest, cancel_event, speed_callback, result_callback, pipelined=False,
+                     volname=""):
+    """Transfers a single card. To copy several cards, use process_cameras_parallel."""
+    destinations = {"image": picture_dest, "video": video_dest, "sound": sound_dest}
+    card = CardTransfer(idx, drive, destinations, cancel_event, speed_callback, result_callback, pipelined=pipelined,
+                        volname=volname)
+    TransferScheduler(max_workers=1).run([card])
+
+
+def backup_folders(backup_roots, cam_number):
+    """The CardTransfer backups for a card: cam<n> folders under Pictures, Videos and Sound of each root."""
+    return [
+        {category: Path(root) / folder / f"cam{cam_number}" for category, folder in BACKUP_SUBFOLDERS.items()}
+        for root in backup_roots
+    ]
+
+
+def build_card_transfers(drives, cam_numbers, cancel_event, speed_callback, result_callback,
+                         picture_base, video_base, sound_base, first_idx=1, backup_roots=(), **options):
+    """
+    Returns a CardTransfer for each (drive, volume name, size) tuple in
+    drives, copying into the cam<n> folders given by cam_numbers and, for
+    each of backup_roots, into the same folders under it. Cards are
+    numbered from first_idx; options are passed on to CardTransfer.
+    """
+    cards = []
+    for idx, ((drive, volname, size_display), cam_number) in enumerate(zip(drives, cam_numbers), start=first_idx):
+        destinations = {
+            "image": Path(picture_base) / f"cam{cam_number}",
+            "video": Path(video_base) / f"cam{cam_number}",
+            "sound": Path(sound_base) / f"cam{cam_number}",
+        }
+        cards.append(CardTransfer(
+            idx, drive, destinations, cancel_event, speed_callback, result_callback,
+            name=f"cam{cam_number}", volume=get_volume_identity(drive, volname), volname=volname,
+            backups=backup_folders(backup_roots, cam_number), **options
+        ))
+    return cards
+
+
+def slowest_first(cards):
+    """
+    Orders cards by the speed their profiles expect, slowest first, so the
+    scheduler starts the cards that take longest first. Cards never seen
+    before come first of all, since they may be slow too.
+    """
+    return sorted(cards, key=lambda card: card.expected_rate() or 0)
+
+
+def process_cameras_parallel(cancel_event, speed_callback, result_callback, max_workers=MAX_WORKERS,
+                             per_source=PER_SOURCE_LIMIT, per_destination=PER_DESTINATION_LIMIT, pipelined=False,
+                             ledger=None, checksums=False, verify=False, dedup=None,
+                             drives=None, picture_base=None, video_base=None, sound_base=None,
+                             unique_cams=False, progress_callback=None, journal_dir=None, eject=True,
+                             started_callback=None, recorder=None, profiles=None, bandwidth=None,
+                             order=DEFAULT_ORDER, backup_roots=(), adaptive=False, thumbnails=None,
+                             naming=DEFAULT_NAMING):
+    """
+    Transfers the cards in drives (every card present by default) through
+    one TransferScheduler into cam<n> folders under picture_base,
+    video_base and sound_base; n is the card's position, or from
+    cam_numbers_for with unique_cams. started_callback(cards) runs before
+    copying starts; the other options are passed on to each CardTransfer.
+    Returns the CardTransfers once all are finished.
+    """
+    if drives is None:
+        drives = get_removable_drives()
+    picture_base = Path(picture_base or PICTURE_BASE_DIR)
+    video_base = Path(video_base or VIDEO_BASE_DIR)
+    sound_base = Path(sound_base or SOUND_BASE_DIR)
+    if unique_cams:
+        cam_numbers = cam_numbers_for(drives, [picture_base, video_base, sound_base], journal_dir or picture_base)
+    else:
+        cam_numbers = range(1, len(drives) + 1)
+    cards = build_card_transfers(
+        drives, cam_numbers, cancel_event, speed_callback, result_callback,
+        picture_base, video_base, sound_base,
+        progress_callback=progress_callback, pipelined=pipelined, ledger=ledger,
+        checksums=checksums, verify=verify, dedup=dedup, journal_dir=journal_dir, eject=eject,
+        recorder=recorder, profiles=profiles, bandwidth=bandwidth, order=order, backup_roots=backup_roots,
+        adaptive=adaptive, thumbnails=thumbnails, naming=naming
+    )
+    if started_callback is not None:
+        started_callback(cards)
+    TransferScheduler(max_workers, per_source, per_destination).run(slowest_first(cards))
     if not drives:
         result_callback(0, "No SD cards found.")
+    return cards
+
+
+LOGO_SIZE = 64
+LOGO_CACHE_NAME = f"logo_{LOGO_SIZE}.png"
+
+
+def resource_path(*parts):
+    """Path of a bundled resource, inside the PyInstaller bundle when frozen."""
+    import sys
+    if getattr(sys, 'frozen', False):
+        # Running in a bundle
+        base_path = getattr(sys, '_MEIPASS', os.path.abspath("."))
+    else:
+        # Running in normal Python
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, *parts)
+
+
+def user_cache_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "SDCopier"
+
+
+def load_logo_photo(tk):
+    """
+    Returns the logo as a tk.PhotoImage. The pre-scaled PNG shipped in
+    assets (or cached on an earlier run) loads with Tk alone; only when
+    neither exists is PIL imported to scale logo.jpg, and the result is
+    cached for the next start.
+    """
+    for candidate in (Path(resource_path("assets", LOGO_CACHE_NAME)), user_cache_dir() / LOGO_CACHE_NAME):
+        if candidate.exists():
+            return tk.PhotoImage(file=str(candidate))
+    from PIL import Image, ImageTk
+    logo_img = Image.open(resource_path("assets", "logo.jpg"))
+    logo_img = logo_img.resize((LOGO_SIZE, LOGO_SIZE), Image.Resampling.LANCZOS)
+    try:
+        cache = user_cache_dir() / LOGO_CACHE_NAME
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        logo_img.save(cache)
+    except OSError:
+        pass
+    return ImageTk.PhotoImage(logo_img)
 
 
 def run_gui():
+    # GUI-only imports stay here so headless use (ingest_cli) never loads Tk;
+    # PIL is only imported by load_logo_photo when no scaled logo is cached
+    import tkinter as tk
+    from tkinter import messagebox
+    from tkinter import filedialog
+    import tkinter.ttk as ttk
+
     root = tk.Tk()
     root.title("Camera SD Transfer Tool")
     root.geometry("800x800")  # Increased window size
@@ -234,20 +1836,7 @@ def run_gui():
 
     # Load and display the logo image on the top right
     try:
-        import sys
-        import os
-
-        if getattr(sys, 'frozen', False):
-            # Running in a bundle
-            base_path = getattr(sys, '_MEIPASS', os.path.abspath("."))
-        else:
-            # Running in normal Python
-            base_path = os.path.abspath(".")
-
-        logo_path = os.path.join(base_path, "assets", "logo.jpg")
-        logo_img = Image.open(logo_path)
-        logo_img = logo_img.resize((64, 64), Image.Resampling.LANCZOS)
-        logo_photo = ImageTk.PhotoImage(logo_img)
+        logo_photo = load_logo_photo(tk)
         logo_label = tk.Label(top_frame, image=logo_photo, bg="#f4f6fa")
         logo_label.image = logo_photo  # Keep a reference
         logo_label.pack(side=tk.RIGHT, padx=12)
@@ -265,6 +1854,8 @@ def run_gui():
     size_labels = {}
     transferred_labels = {}
     percent_labels = {}
+    backup_labels = {}
+    sheet_labels = {}
 
     global_progress_bar = None
     global_stats_label = None
@@ -274,11 +1865,31 @@ def run_gui():
 
     drives = []
     cam_drive_map = []  # <-- Use this instead of root.cam_drive_map
+    running_session = None  # adds cards to the transfer in progress
+    # Manifests of this session's transfers by volume, so a wipe can reuse them
+    transferred_manifests = {}
     main_base_dir = tk.StringVar(value="C:/Media")
     picture_base_dir = tk.StringVar(value=str(PICTURE_BASE_DIR))
     video_base_dir = tk.StringVar(value=str(VIDEO_BASE_DIR))
     sound_base_dir = tk.StringVar(value=str(SOUND_BASE_DIR))
+    # Optional second copy of every card, e.g. on another disk
+    backup_base_dir = tk.StringVar(value="")
     azza_reading_var = tk.StringVar(value="")
+    overlap_io_var = tk.BooleanVar(value=True)
+    skip_imported_var = tk.BooleanVar(value=True)
+    checksums_var = tk.BooleanVar(value=False)
+    verify_var = tk.BooleanVar(value=False)
+    dedup_var = tk.BooleanVar(value=False)
+    report_var = tk.BooleanVar(value=False)
+    adaptive_var = tk.BooleanVar(value=False)
+    thumbnails_var = tk.BooleanVar(value=False)
+    max_workers_var = tk.IntVar(value=MAX_WORKERS)
+    per_source_var = tk.IntVar(value=PER_SOURCE_LIMIT)
+    per_destination_var = tk.IntVar(value=PER_DESTINATION_LIMIT)
+    auto_ingest_var = tk.BooleanVar(value=False)
+    total_limit_var = tk.IntVar(value=0)
+    order_var = tk.StringVar(value=DEFAULT_ORDER)
+    naming_var = tk.StringVar(value=DEFAULT_NAMING)
 
     def browse_main_dir():
         folder = filedialog.askdirectory(title="Select Main Base Directory")
@@ -302,6 +1913,11 @@ def run_gui():
         if folder:
             sound_base_dir.set(folder)
 
+    def browse_backup_dir():
+        folder = filedialog.askdirectory(title="Select Backup Directory")
+        if folder:
+            backup_base_dir.set(folder)
+
     def refresh_drives_root():
         nonlocal drives
         drives = get_removable_drives()
@@ -318,13 +1934,31 @@ def run_gui():
             drive_labels.append(cb)
             checkbox_vars.append(var)
 
+    # Worker threads never touch widgets; they post to the bus instead and
+    # the current renderer applies the merged events on the Tk thread
+    ui_bus = UiEventBus(root)
+    # Learned card speeds, shared by every transfer of this session
+    profiles = ThroughputProfiles(user_cache_dir() / PROFILES_FILENAME, CAMERA_LABELS)
+    # Speed limits; the controls change them while cards copy
+    bandwidth = BandwidthLimiter()
+
+    def limit_setter(var, apply):
+        """Calls apply(bytes_per_second or None) whenever the MB/s in var changes."""
+        def on_change(*args):
+            try:
+                mb_per_s = var.get()
+            except tk.TclError:
+                return  # The spinbox is being edited
+            apply(mb_per_s * 1024 * 1024 if mb_per_s > 0 else None)
+        var.trace_add("write", on_change)
+        on_change()
+    post_ui_event = ui_bus.open(None)
+
     def speed_callback(idx, speed):
-        if idx in speed_labels:
-            speed_labels[idx].config(text=f"cam{idx} speed: {speed/1024/1024:.2f} MB/s")
+        post_ui_event(idx, "speed", speed)
 
     def result_callback(idx, msg):
-        if idx in status_labels:
-            status_labels[idx].config(text=f"cam{idx}: {msg}")
+        post_ui_event(idx, "status", msg)
 
     def get_unique_cam_folder(base_dir, prefix="cam"):
         """
@@ -337,21 +1971,40 @@ def run_gui():
                 return folder, n
             n += 1
 
+    # The watcher reports inserted and removed cards from its own thread;
+    # poll_drive_events applies them on the Tk thread
+    drive_events = queue.Queue()
+    drive_watcher = DriveWatcher(lambda added, removed, initial: drive_events.put((added, removed, initial)))
+
     def refresh_drives_frame():
-        nonlocal drives, cam_drive_map
-        drives = get_removable_drives(test_mode=test_mode_env)
-        for label in drive_labels:
-            label.destroy()
-        drive_labels.clear()
-        checkbox_vars.clear()
-        cam_drive_map.clear()
+        drive_watcher.refresh()
+
+    def poll_drive_events():
+        try:
+            while True:
+                added, removed, initial = drive_events.get_nowait()
+                update_drives(added, removed, initial)
+        except queue.Empty:
+            pass
+        root.after(DRIVE_POLL_MS, poll_drive_events)
+
+    def update_drives(added, removed, initial):
+        """Removes the rows of removed cards and appends rows for new ones; other rows keep their state."""
+        nonlocal drives
+        gone = {drive for drive, volname, size_display in removed}
+        for i in reversed(range(len(cam_drive_map))):
+            if cam_drive_map[i][0] in gone:
+                drive_labels.pop(i).destroy()
+                checkbox_vars.pop(i)
+                cam_drive_map.pop(i)
+        drives = drive_watcher.drives
         # Use unique cam numbers for each drive
-        used_cam_numbers = set()
-        for drive, volname, size_display in drives:
-            n = 1
-            while n in used_cam_numbers or (Path(picture_base_dir.get()) / f"cam{n}").exists() or (Path(video_base_dir.get()) / f"cam{n}").exists():
-                n += 1
-            used_cam_numbers.add(n)
+        cam_numbers = cam_numbers_for(
+            added, [picture_base_dir.get(), video_base_dir.get()], main_base_dir.get(),
+            taken={n for drive, volname, n in cam_drive_map}
+        )
+        new_entries = []
+        for (drive, volname, size_display), n in zip(added, cam_numbers):
             label_text = f"cam{n} ({drive} - {volname} - {size_display})" if volname else f"cam{n} ({drive} - {size_display})"
             var = tk.BooleanVar(value=True)
             cb = tk.Checkbutton(drives_frame, text=label_text, variable=var, font=entry_font, bg="#f4f6fa")
@@ -359,10 +2012,25 @@ def run_gui():
             drive_labels.append(cb)
             checkbox_vars.append(var)
             cam_drive_map.append((drive, volname, n))  # Store mapping for transfer
+            new_entries.append((drive, volname, n))
+        if new_entries and not initial and auto_ingest_var.get():
+            # Join the running transfer if there is one, else start one
+            if running_session is None or not running_session(new_entries):
+                on_transfer(new_entries)
 
-    def on_transfer():
-        nonlocal cam_drive_map
+    def on_transfer(selected_drives=None):
+        """
+        Starts copying the checked cards, or the given (drive, volname,
+        cam_number) entries. While it runs, running_session(entries) adds
+        more cards to the same transfer.
+        """
+        nonlocal cam_drive_map, post_ui_event, running_session
         global global_progress_bar, global_stats_label
+        try:
+            naming = NamingTemplate(naming_var.get().strip())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
         # Remove old labels and cards
         for frame in label_frames:
             frame.destroy()
@@ -376,40 +2044,29 @@ def run_gui():
         size_labels.clear()
         transferred_labels.clear()
         percent_labels.clear()
+        backup_labels.clear()
+        sheet_labels.clear()
+        make_thumbnails = thumbnails_var.get()
+        backup_roots = [backup_base_dir.get().strip()] if backup_base_dir.get().strip() else []
 
         # Get selected drives as (drive, volname, cam_number) tuples
-        selected_drives = [
-            (drive, volname, cam_number)
-            for var, (drive, volname, cam_number) in zip(checkbox_vars, cam_drive_map)
-            if var.get()
-        ]
-
-        # --- SCANNING INDICATOR ---
-        scanning_label = tk.Label(root, text="Scanning files...", font=("Arial", 11, "italic"), fg="blue")
-        scanning_label.pack()
-        root.update()
-
-        # Scan all drives for files and sizes
+        if selected_drives is None:
+            selected_drives = [
+                (drive, volname, cam_number)
+                for var, (drive, volname, cam_number) in zip(checkbox_vars, cam_drive_map)
+                if var.get()
+            ]
+
+        # Cards are scanned in the background while they copy, so totals
+        # start at zero and grow until each scan completes
         per_drive_stats = []
-        global_total_files = 0
-        global_total_bytes = 0
-        for idx, (drive, volname, cam_number) in enumerate(selected_drives, start=1):
-            image_files, image_bytes = scan_media_files(drive, IMAGE_EXTENSIONS)
-            video_files, video_bytes = scan_media_files(drive, VIDEO_EXTENSIONS)
-            sound_files, sound_bytes = scan_media_files(drive, SOUND_EXTENSIONS)
-            all_files = image_files + video_files + sound_files
-            total_bytes = image_bytes + video_bytes + sound_bytes
-            per_drive_stats.append({
-                "files": all_files,
-                "total_files": len(all_files),
-                "total_bytes": total_bytes,
-                "transferred_files": 0,
-                "transferred_bytes": 0,
-            })
-            global_total_files += len(all_files)
-            global_total_bytes += total_bytes
 
-        scanning_label.destroy()
+        def scan_totals():
+            manifests = [stat['manifest'] for stat in per_drive_stats]
+            total_files = sum(m.total_files for m in manifests)
+            total_bytes = sum(m.total_bytes for m in manifests)
+            complete = all(m.complete for m in manifests)
+            return total_files, total_bytes, complete
 
         # --- GLOBAL PROGRESS BAR ---
         global global_progress_bar, global_stats_label
@@ -419,11 +2076,20 @@ def run_gui():
             global_stats_label.destroy()
         global_progress_bar = ttk.Progressbar(root, length=400, mode='determinate')
         global_progress_bar.pack(pady=4)
-        global_stats_label = tk.Label(root, text=f"Total: {global_total_files} files, {format_size(global_total_bytes)}", font=("Arial", 10, "bold"))
+        global_stats_label = tk.Label(root, text="Total: scanning...", font=("Arial", 10, "bold"))
         global_stats_label.pack()
 
         # --- PER DRIVE PROGRESS (as horizontal cards) ---
-        for idx, (drive, volname, cam_number) in enumerate(selected_drives, start=1):
+        def add_card_widgets(idx, drive, volname, cam_number):
+            per_drive_stats.append({
+                "manifest": MediaManifest(drive),
+                "transferred_files": 0,
+                "transferred_bytes": 0,
+                "card": None,
+                "priority_var": tk.StringVar(value=DEFAULT_PRIORITY),
+                "limit_var": tk.IntVar(value=0),
+                "thumbnails": deque(maxlen=CONTACT_SHEET_SIZE),
+            })
             card = tk.Frame(cards_frame, bg="#fff", bd=2, relief=tk.RIDGE, padx=10, pady=8)
             card.pack(side=tk.LEFT, padx=8, pady=4)
             label_frames.append(card)
@@ -431,7 +2097,7 @@ def run_gui():
             tk.Label(card, text=label_text, font=("Arial", 10, "bold"), bg="#fff", fg="#2d415a").pack(anchor='w')
             speed_labels[idx] = tk.Label(card, text=f"Speed: 0 MB/s", font=("Arial", 9), bg="#fff")
             speed_labels[idx].pack(anchor='w')
-            size_labels[idx] = tk.Label(card, text=f"Total: {per_drive_stats[idx-1]['total_files']} files, {format_size(per_drive_stats[idx-1]['total_bytes'])}", font=("Arial", 9), bg="#fff")
+            size_labels[idx] = tk.Label(card, text="Total: scanning...", font=("Arial", 9), bg="#fff")
             size_labels[idx].pack(anchor='w')
             transferred_labels[idx] = tk.Label(card, text=f"Transferred: 0 files, 0 MB", font=("Arial", 9), bg="#fff")
             transferred_labels[idx].pack(anchor='w')
@@ -444,89 +2110,207 @@ def run_gui():
             file_count_labels[idx].pack(anchor='w')
             status_labels[idx] = tk.Label(card, text="", font=("Arial", 9, "italic"), bg="#fff", fg="#64748b")
             status_labels[idx].pack(anchor='w')
+            if backup_roots:
+                backup_labels[idx] = tk.Label(card, text="Backup: 0 MB", font=("Arial", 9), bg="#fff")
+                backup_labels[idx].pack(anchor='w')
+            if make_thumbnails:
+                # Filled with the card's latest pictures as their thumbnails are made
+                sheet_labels[idx] = tk.Label(card, bg="#fff")
+                sheet_labels[idx].pack(anchor='w', pady=(2, 0))
+            # Priority and speed limit apply at once, also mid-transfer
+            stat = per_drive_stats[idx-1]
+            limits_row = tk.Frame(card, bg="#fff")
+            limits_row.pack(anchor='w', pady=(2, 0))
+            tk.OptionMenu(limits_row, stat['priority_var'], *PRIORITY_WEIGHTS).pack(side=tk.LEFT)
+            tk.Spinbox(limits_row, from_=0, to=2000, increment=10, width=5, textvariable=stat['limit_var'], font=("Arial", 9)).pack(side=tk.LEFT, padx=(4, 2))
+            tk.Label(limits_row, text="MB/s max", font=("Arial", 9), bg="#fff").pack(side=tk.LEFT)
+            stat['priority_var'].trace_add("write", lambda *args: bandwidth.set_priority(idx, stat['priority_var'].get()))
+            bandwidth.set_priority(idx, stat['priority_var'].get())
+            limit_setter(stat['limit_var'], lambda rate: bandwidth.set_card_rate(idx, rate))
 
-        cancel_event.clear()
+        for idx, (drive, volname, cam_number) in enumerate(selected_drives, start=1):
+            add_card_widgets(idx, drive, volname, cam_number)
 
-        # --- TRANSFER TASK ---
-        def task():
-            global_transferred_files = 0
-            global_transferred_bytes = 0
+        cancel_event.clear()
 
-            def update_progress(idx, files_done, bytes_done):
-                # Per drive
-                total_files = per_drive_stats[idx-1]['total_files']
-                total_bytes = per_drive_stats[idx-1]['total_bytes']
+        # --- PROGRESS RENDERING (Tk thread, once per UI frame) ---
+        global_files_done = 0
+        global_bytes_done = 0
+        global_window = RateWindow()
+        scanning = set(range(1, len(selected_drives) + 1))
+
+        def global_eta(remaining_bytes):
+            if global_window.settled():
+                rate = global_window.rate()
+                return remaining_bytes / rate if rate > 0 else None
+            # Until the total speed settles, the card expected to finish last decides
+            etas = [stat['card'].eta() for stat in per_drive_stats if stat['card'] is not None]
+            return max(etas) if etas and None not in etas else None
+
+        def show_contact_sheet(idx, stat, paths):
+            # PIL is only needed once thumbnails are on
+            from PIL import ImageTk
+            stat['thumbnails'].extend(paths)
+            photo = ImageTk.PhotoImage(contact_sheet(list(stat['thumbnails']), CONTACT_SHEET_COLUMNS))
+            sheet_labels[idx].config(image=photo)
+            sheet_labels[idx].image = photo  # Keep a reference
+
+        def render_progress(frame):
+            nonlocal global_files_done, global_bytes_done
+            for idx, changes in frame.items():
+                if idx not in status_labels:
+                    continue
+                stat = per_drive_stats[idx-1]
+                # Reused bytes (resumed or deduplicated) count as done, not as speed
+                done_bytes = changes.get("bytes", 0) + changes.get("reused", 0)
+                stat['transferred_files'] += changes.get("files", 0)
+                stat['transferred_bytes'] += done_bytes
+                global_files_done += changes.get("files", 0)
+                global_bytes_done += done_bytes
+                if changes.get("bytes"):
+                    global_window.add(changes["bytes"])
+                if "speed" in changes:
+                    card = stat['card']
+                    eta = format_eta(card.eta() if card is not None else None)
+                    speed_labels[idx].config(text=f"cam{idx} speed: {changes['speed']/1024/1024:.2f} MB/s, ETA {eta}")
+                if "status" in changes:
+                    status_labels[idx].config(text=f"cam{idx}: {changes['status']}")
+                if "thumbnail" in changes and idx in sheet_labels:
+                    show_contact_sheet(idx, stat, changes["thumbnail"])
+            # Cards still scanning refresh every frame so their totals grow
+            dirty = set(frame) | scanning
+            for idx in dirty:
+                if idx not in status_labels:
+                    continue
+                stat = per_drive_stats[idx-1]
+                manifest = stat['manifest']
+                if manifest.complete:
+                    scanning.discard(idx)
+                # A "+" marks totals that are still growing
+                more = "" if manifest.complete else "+"
+                files_done = stat['transferred_files']
+                bytes_done = stat['transferred_bytes']
+                total_bytes = manifest.total_bytes
                 percent = (bytes_done / total_bytes * 100) if total_bytes else 0
                 progress_bars[idx]['value'] = percent
                 percent_labels[idx].config(text=f"{percent:.1f}%")
+                size_labels[idx].config(text=f"Total: {manifest.total_files}{more} files, {format_size(total_bytes)}{more}")
                 transferred_labels[idx].config(text=f"Transferred: {files_done} files, {format_size(bytes_done)}")
-                file_count_labels[idx].config(text=f"{files_done}/{total_files} files")
-                # Global
-                nonlocal global_transferred_files, global_transferred_bytes
-                global_transferred_files = sum(stat['transferred_files'] for stat in per_drive_stats)
-                global_transferred_bytes = sum(stat['transferred_bytes'] for stat in per_drive_stats)
-                global_percent = (global_transferred_bytes / global_total_bytes * 100) if global_total_bytes else 0
-                if global_progress_bar is not None:
-                    global_progress_bar['value'] = global_percent
-                if global_stats_label is not None:
-                    global_stats_label.config(
-                        text=f"Total: {global_transferred_files}/{global_total_files} files, {format_size(global_transferred_bytes)}/{format_size(global_total_bytes)} ({global_percent:.1f}%)"
-                    )
-
-            def transfer_one(idx, drive, picture_dest, video_dest, sound_dest, stat, cam_number):
-                total_bytes = 0
-                files_done = 0
-                start_time = time.time()
-                for file_path in stat['files']:
-                    if cancel_event.is_set():
-                        result_callback(idx, "Transfer cancelled.")
-                        return
-                    ext = file_path.suffix.lower()
-                    if ext in IMAGE_EXTENSIONS:
-                        dest_path = picture_dest / file_path.name
-                    elif ext in VIDEO_EXTENSIONS:
-                        dest_path = video_dest / file_path.name
-                    elif ext in SOUND_EXTENSIONS:
-                        dest_path = sound_dest / file_path.name
-                    else:
-                        continue
-                    dest_path.parent.mkdir(parents=True, exist_ok=True)
-                    timestamp = datetime.now().strftime("%d-%m-%Y-%H")
-                    dest_path = dest_path.parent / f"{dest_path.stem}_{timestamp}{dest_path.suffix}"
-                    shutil.copy2(file_path, dest_path)
-                    try:
-                        size = os.path.getsize(file_path)
-                        total_bytes += size
-                        stat['transferred_bytes'] += size
-                        stat['transferred_files'] += 1
-                    except Exception:
-                        pass
-                    files_done += 1
-                    # Update transfer speed
-                    elapsed = time.time() - start_time
-                    speed = total_bytes / elapsed if elapsed > 0 else 0
-                    speed_callback(idx, speed)
-                    update_progress(idx, files_done, stat['transferred_bytes'])
-                if not cancel_event.is_set():
-                    eject_drive(drive)
-                    result_callback(idx, f"Transferred and ejected cam{cam_number}.")
-
-            threads = []
-            for idx, (drive, volname, cam_number) in enumerate(selected_drives, start=1):
-                picture_dest = Path(picture_base_dir.get()) / f"cam{cam_number}"
-                video_dest = Path(video_base_dir.get()) / f"cam{cam_number}"
-                sound_dest = Path(sound_base_dir.get()) / f"cam{cam_number}"
-                t = threading.Thread(
-                    target=transfer_one,
-                    args=(idx, drive, picture_dest, video_dest, sound_dest, per_drive_stats[idx-1], cam_number)
+                file_count_labels[idx].config(text=f"{files_done}/{manifest.total_files}{more} files")
+                if idx in backup_labels and stat['card'] is not None:
+                    backup_labels[idx].config(text="Backup: " + ", ".join(format_size(n) for n in stat['card'].backup_bytes))
+            if not dirty:
+                return
+            global_total_files, global_total_bytes, complete = scan_totals()
+            more = "" if complete else "+"
+            global_percent = (global_bytes_done / global_total_bytes * 100) if global_total_bytes else 0
+            if global_progress_bar is not None:
+                global_progress_bar['value'] = global_percent
+            if global_stats_label is not None:
+                eta = format_eta(global_eta(max(0, global_total_bytes - global_bytes_done)))
+                global_stats_label.config(
+                    text=f"Total: {global_files_done}/{global_total_files}{more} files, {format_size(global_bytes_done)}/{format_size(global_total_bytes)}{more} ({global_percent:.1f}%), {global_window.rate()/1024/1024:.1f} MB/s, ETA {eta}"
                 )
-                threads.append(t)
-                t.start()
-            for t in threads:
-                t.join()
-            if not selected_drives:
-                result_callback(0, "No SD cards selected.")
 
+        post_ui_event = ui_bus.open(render_progress)
+
+        # Tk variables are read here, never from the worker threads
+        picture_root = Path(picture_base_dir.get())
+        video_root = Path(video_base_dir.get())
+        sound_root = Path(sound_base_dir.get())
+        overlap_io = overlap_io_var.get()
+        main_folder = main_base_dir.get()
+        ledger_folder = main_folder if skip_imported_var.get() else None
+        verify = verify_var.get()
+        dedup_enabled = dedup_var.get()
+        checksums = checksums_var.get() or verify
+        recorder = RunRecorder() if report_var.get() else None
+        adaptive = adaptive_var.get()
+        thumbnails = None
+        if make_thumbnails:
+            # post is bound now, so thumbnails still coming after a new transfer starts are dropped
+            thumbnails = ThumbnailCache.for_main_folder(
+                main_folder, callback=lambda idx, path, post=post_ui_event: post(idx, "thumbnail", path)
+            )
+        order = order_var.get()
+        scheduler_limits = (max_workers_var.get(), per_source_var.get(), per_destination_var.get())
+
+        # --- TRANSFER TASK ---
+        def progress_callback(idx, files, nbytes, copied=True):
+            if files:
+                post_ui_event(idx, "files", files)
+            if nbytes:
+                post_ui_event(idx, "bytes" if copied else "reused", nbytes)
+
+        ledger = ImportLedger.for_main_folder(ledger_folder) if ledger_folder else None
+        # One index for the whole run, so cards also dedup against each other
+        dedup = DedupIndex(new_hasher) if dedup_enabled else None
+        scheduler = TransferScheduler(*scheduler_limits)
+
+        def make_card(idx, drive, volname, cam_number):
+            volume = get_volume_identity(drive, volname)
+            transferred_manifests[volume] = per_drive_stats[idx-1]['manifest']
+            destinations = {
+                "image": picture_root / f"cam{cam_number}",
+                "video": video_root / f"cam{cam_number}",
+                "sound": sound_root / f"cam{cam_number}",
+            }
+            card = CardTransfer(
+                idx, drive, destinations, cancel_event, speed_callback, result_callback,
+                progress_callback=progress_callback, manifest=per_drive_stats[idx-1]['manifest'],
+                pipelined=overlap_io, name=f"cam{cam_number}",
+                ledger=ledger, volume=volume,
+                checksums=checksums, verify=verify, dedup=dedup, journal_dir=main_folder,
+                recorder=recorder, profiles=profiles, volname=volname, bandwidth=bandwidth,
+                order=order, backups=backup_folders(backup_roots, cam_number), adaptive=adaptive,
+                thumbnails=thumbnails, naming=naming
+            )
+            per_drive_stats[idx-1]['card'] = card
+            return card
+
+        def join_session(entries):
+            """Adds newly inserted cards to this transfer; False once it has finished."""
+            # Nothing is built for a finished transfer: a card starts scanning
+            # and opens its journal as soon as it is made
+            if not scheduler.hold():
+                return False
+            try:
+                for drive, volname, cam_number in entries:
+                    idx = len(per_drive_stats) + 1
+                    add_card_widgets(idx, drive, volname, cam_number)
+                    scheduler.offer(make_card(idx, drive, volname, cam_number))
+                    scanning.add(idx)
+            finally:
+                scheduler.release()
+            return True
+
+        def task():
+            nonlocal running_session
+            try:
+                if dedup is not None and ledger is not None:
+                    dedup.add_many(ledger.imported_files())
+                cards = [
+                    make_card(idx, drive, volname, cam_number)
+                    for idx, (drive, volname, cam_number) in enumerate(selected_drives, start=1)
+                ]
+                scheduler.run(slowest_first(cards))
+                if ledger is not None:
+                    ledger.close()
+                if thumbnails is not None:
+                    thumbnails.close()
+                if recorder is not None:
+                    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    try:
+                        recorder.write(Path(main_folder) / f"sdcopier_report_{stamp}.json")
+                    except OSError as e:
+                        print("Could not write the run report:", e)
+                if not selected_drives:
+                    result_callback(0, "No SD cards selected.")
+            finally:
+                if running_session is join_session:
+                    running_session = None
+
+        running_session = join_session
         nonlocal transfer_thread
         transfer_thread = threading.Thread(target=task)
         transfer_thread.start()
@@ -626,6 +2410,35 @@ def run_gui():
     tk.Entry(sound_frame, textvariable=sound_base_dir, width=36, font=entry_font).pack(side=tk.LEFT, padx=5)
     tk.Button(sound_frame, text="Browse", command=browse_sound_dir, font=button_font, bg="#e0e7ff").pack(side=tk.LEFT)
 
+    # Backup folder selection; empty for no backup
+    backup_frame = tk.Frame(root, bg="#f4f6fa")
+    backup_frame.pack(pady=2, fill=tk.X)
+    tk.Label(backup_frame, text="💾 Backup Folder:", font=label_font, bg="#f4f6fa").pack(side=tk.LEFT)
+    tk.Entry(backup_frame, textvariable=backup_base_dir, width=36, font=entry_font).pack(side=tk.LEFT, padx=5)
+    tk.Button(backup_frame, text="Browse", command=browse_backup_dir, font=button_font, bg="#e0e7ff").pack(side=tk.LEFT)
+
+    # Transfer options
+    options_frame = tk.Frame(root, bg="#f4f6fa")
+    options_frame.pack(pady=2, fill=tk.X)
+    tk.Checkbutton(options_frame, text="⚡ Overlap card reads with disk writes", variable=overlap_io_var, font=entry_font, bg="#f4f6fa").pack(side=tk.LEFT)
+    tk.Checkbutton(options_frame, text="⏭️ Skip already imported", variable=skip_imported_var, font=entry_font, bg="#f4f6fa").pack(side=tk.LEFT)
+    tk.Checkbutton(options_frame, text="🔐 Checksums", variable=checksums_var, font=entry_font, bg="#f4f6fa").pack(side=tk.LEFT)
+    tk.Checkbutton(options_frame, text="✅ Verify", variable=verify_var, font=entry_font, bg="#f4f6fa").pack(side=tk.LEFT)
+    tk.Checkbutton(options_frame, text="♻️ Dedup", variable=dedup_var, font=entry_font, bg="#f4f6fa").pack(side=tk.LEFT)
+    tk.Checkbutton(options_frame, text="📊 Run report", variable=report_var, font=entry_font, bg="#f4f6fa").pack(side=tk.LEFT)
+    tk.Checkbutton(options_frame, text="🌐 Network folder", variable=adaptive_var, font=entry_font, bg="#f4f6fa").pack(side=tk.LEFT)
+    tk.Checkbutton(options_frame, text="🖼️ Thumbnails", variable=thumbnails_var, font=entry_font, bg="#f4f6fa").pack(side=tk.LEFT)
+    for text, var in (("Workers:", max_workers_var), ("Per card:", per_source_var), ("Per disk:", per_destination_var)):
+        tk.Label(options_frame, text=text, font=entry_font, bg="#f4f6fa").pack(side=tk.LEFT, padx=(8, 2))
+        tk.Spinbox(options_frame, from_=1, to=16, width=3, textvariable=var, font=entry_font).pack(side=tk.LEFT)
+    tk.Label(options_frame, text="Max MB/s:", font=entry_font, bg="#f4f6fa").pack(side=tk.LEFT, padx=(8, 2))
+    tk.Spinbox(options_frame, from_=0, to=2000, increment=10, width=5, textvariable=total_limit_var, font=entry_font).pack(side=tk.LEFT)
+    limit_setter(total_limit_var, bandwidth.set_total_rate)
+    tk.Label(options_frame, text="Order:", font=entry_font, bg="#f4f6fa").pack(side=tk.LEFT, padx=(8, 2))
+    tk.OptionMenu(options_frame, order_var, *ORDERING_POLICIES).pack(side=tk.LEFT)
+    tk.Label(options_frame, text="Names:", font=entry_font, bg="#f4f6fa").pack(side=tk.LEFT, padx=(8, 2))
+    tk.Entry(options_frame, textvariable=naming_var, width=22, font=entry_font).pack(side=tk.LEFT)
+
     # Drive selection and transfer controls
     drives_frame = tk.LabelFrame(root, text="Select SD Cards to Transfer", font=label_font, bg="#f4f6fa", fg="#2d415a", bd=2, relief=tk.GROOVE)
     drives_frame.pack(pady=10, fill=tk.X, padx=10)
@@ -649,6 +2462,10 @@ def run_gui():
         pady=2
     )
     uncheck_btn.pack(anchor='e', pady=(4, 2), padx=8)
+    tk.Checkbutton(
+        drives_frame, text="🤖 Start transferring new cards as soon as they are inserted",
+        variable=auto_ingest_var, font=entry_font, bg="#f4f6fa"
+    ).pack(anchor='w', padx=10)
 
 
 
@@ -695,15 +2512,17 @@ def run_gui():
             percent_labels,
             checkbox_vars,
             cam_drive_map,
-            scan_media_files,
-            IMAGE_EXTENSIONS,
-            VIDEO_EXTENSIONS,
-            SOUND_EXTENSIONS,
+            iter_media_files,
+            get_volume_identity,
+            main_base_dir.get(),
+            transferred_manifests,
+            ui_bus,
             cancel_event,
             eject_drive,
             global_progress_bar,
             global_stats_label,
-            ttk
+            ttk,
+            report=report_var.get()
         ),
         font=button_font,
         bg="#fee2e2",
@@ -727,7 +2546,9 @@ def run_gui():
 
     cards_frame.bind("<Configure>", update_cards_scrollregion)
 
-    refresh_drives_frame()
+    drive_watcher.start()
+    poll_drive_events()
+    ui_bus.start()
 
     # --- Footer ---
     footer = tk.Label(
@@ -739,8 +2560,23 @@ def run_gui():
     )
     footer.pack(side=tk.BOTTOM, pady=6)
 
+    startup_bench = os.environ.get("SDCOPIER_STARTUP_BENCH")
+    if startup_bench:
+        # Used by benchmarks/startup_benchmark.py: write the time the window
+        # is on screen to the given file (a --noconsole build has no
+        # stdout), then quit
+        def window_shown(event):
+            if event.widget is root:
+                with open(startup_bench, 'a', encoding='utf-8') as f:
+                    f.write(f"first-window {time.time():.6f}\n")
+                root.after(0, root.destroy)
+        root.bind("<Map>", window_shown, add="+")
+
     root.mainloop()
 
 
 if __name__ == "__main__":
+    # Thumbnail worker processes start this executable again when frozen
+    import multiprocessing
+    multiprocessing.freeze_support()
     run_gui()
@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('assets\\\\logo.jpg', 'assets')],
+    datas=[('assets\\\\logo.jpg', 'assets'), ('assets\\\\logo_64.png', 'assets')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
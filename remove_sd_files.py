@@ -1,7 +1,111 @@
 import os
 import threading
-import shutil
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from import_ledger import ImportLedger, LEDGER_FILENAME, ledger_key
+from run_report import RunRecorder
+
+# Files deleted at once, across all cards
+WIPE_WORKERS = 4
+# Files deleted per pool task; progress is reported once per batch
+WIPE_BATCH_SIZE = 256
+
+
+def plan_wipe(drive, volume, iter_media_files, manifest=None, ledger=None):
+    """
+    Decides which media files on drive may be deleted. Returns (deletable,
+    kept): deletable lists (MediaFile, destination) for files with a
+    confirmed copy, kept counts the files left on the card.
+
+    A copy is confirmed by the ImportLedger or, for the transfer that just
+    ran, by the manifest's copy records (copies that failed verification
+    are not). With a complete manifest of this drive the card is not
+    scanned again.
+    """
+    root = Path(drive + "/")
+    confirmed = ledger.destinations(volume) if ledger is not None else {}
+    if manifest is not None and manifest.complete and manifest.drive == drive:
+        for record in manifest.copied:
+            if record.verified is not False:
+                source = record.source
+                key = ledger_key(source.path.relative_to(root).as_posix(), source.size, source.mtime)
+                confirmed[key] = record.destination
+        found = manifest.files + manifest.skipped
+    else:
+        found = iter_media_files(drive)
+    deletable = []
+    kept = 0
+    for media_file in found:
+        key = ledger_key(media_file.path.relative_to(root).as_posix(), media_file.size, media_file.mtime)
+        destination = confirmed.get(key)
+        if destination is None:
+            kept += 1
+        else:
+            deletable.append((media_file, Path(destination)))
+    return deletable, kept
+
+
+def delete_if_safe(media_file, destination, timings=None):
+    """
+    Deletes a card file only if it has not changed since it was scanned
+    and its copy is still at the destination with the same size.
+    """
+    started = time.perf_counter()
+    try:
+        st = os.stat(media_file.path)
+        if st.st_size != media_file.size or round(st.st_mtime * 1000) != round(media_file.mtime * 1000):
+            return False
+        if os.stat(destination).st_size != media_file.size:
+            return False
+        if timings is not None:
+            checked = time.perf_counter()
+            timings.add("check", checked - started)
+            started = checked
+        os.remove(media_file.path)
+    except OSError:
+        return False
+    finally:
+        if timings is not None:
+            timings.add("delete" if "check" in timings.phases else "check", time.perf_counter() - started)
+    return True
+
+
+def _delete_batch(batch, cancel_event, progress, recorder=None, name=None):
+    deleted = refused = 0
+    for media_file, destination in batch:
+        if cancel_event.is_set():
+            break
+        timings = recorder.start_file(name, media_file.path, media_file.size) if recorder is not None else None
+        if delete_if_safe(media_file, destination, timings):
+            deleted += 1
+        else:
+            refused += 1
+        if timings is not None:
+            recorder.finish_file(timings)
+    progress(deleted, refused)
+    return deleted, refused
+
+
+def wipe_files(pool, deletable, cancel_event, progress, recorder=None, name=None):
+    """
+    Deletes the planned files in batches of WIPE_BATCH_SIZE on pool and
+    waits for them. progress(deleted, refused) is called once per batch.
+    With a run_report.RunRecorder, each file's check and delete times are
+    recorded under the card name. Returns the totals (deleted, refused).
+    """
+    futures = [
+        pool.submit(_delete_batch, deletable[i:i + WIPE_BATCH_SIZE], cancel_event, progress, recorder, name)
+        for i in range(0, len(deletable), WIPE_BATCH_SIZE)
+    ]
+    deleted = refused = 0
+    for future in futures:
+        d, r = future.result()
+        deleted += d
+        refused += r
+    return deleted, refused
+
 
 def remove_all_files_from_sd(
     root,
@@ -15,16 +119,26 @@ def remove_all_files_from_sd(
     percent_labels,
     checkbox_vars,
     cam_drive_map,
-    scan_media_files,
-    IMAGE_EXTENSIONS,
-    VIDEO_EXTENSIONS,
-    SOUND_EXTENSIONS,
+    iter_media_files,
+    get_volume_identity,
+    main_folder,
+    transferred_manifests,
+    ui_bus,
     cancel_event,
     eject_drive,
     global_progress_bar,
     global_stats_label,
-    ttk
+    ttk,
+    report=False
 ):
+    """
+    Deletes from the selected cards the media files that were imported
+    into main_folder (see plan_wipe); everything else stays on the card.
+    transferred_manifests maps volume identities to the MediaManifests of
+    this session's transfers. Progress goes through ui_bus in batches.
+    With report, the check and delete times of every file are written to
+    sdcopier_wipe_report_<time>.json in main_folder.
+    """
     # Remove old labels and cards
     for frame in label_frames:
         frame.destroy()
@@ -45,28 +159,7 @@ def remove_all_files_from_sd(
         if var.get()
     ]
 
-    # --- SCANNING INDICATOR ---
     import tkinter as tk
-    scanning_label = tk.Label(root, text="Scanning files...", font=("Arial", 11, "italic"), fg="blue")
-    scanning_label.pack()
-    root.update()
-
-    # Scan all drives for files and sizes
-    per_drive_stats = []
-    global_total_files = 0
-    for idx, (drive, volname, cam_number) in enumerate(selected_drives, start=1):
-        image_files, _ = scan_media_files(drive, IMAGE_EXTENSIONS)
-        video_files, _ = scan_media_files(drive, VIDEO_EXTENSIONS)
-        sound_files, _ = scan_media_files(drive, SOUND_EXTENSIONS)
-        all_files = image_files + video_files + sound_files
-        per_drive_stats.append({
-            "files": all_files,
-            "total_files": len(all_files),
-            "deleted_files": 0,
-        })
-        global_total_files += len(all_files)
-
-    scanning_label.destroy()
 
     # --- GLOBAL PROGRESS BAR ---
     if global_progress_bar:
@@ -75,17 +168,19 @@ def remove_all_files_from_sd(
         global_stats_label.destroy()
     global_progress_bar = ttk.Progressbar(root, length=400, mode='determinate')
     global_progress_bar.pack(pady=4)
-    global_stats_label = tk.Label(root, text=f"Total: {global_total_files} files to delete", font=("Arial", 10, "bold"))
+    global_stats_label = tk.Label(root, text="Total: checking imported files...", font=("Arial", 10, "bold"))
     global_stats_label.pack()
 
     # --- PER DRIVE PROGRESS (as horizontal cards) ---
+    per_drive_stats = []
     for idx, (drive, volname, cam_number) in enumerate(selected_drives, start=1):
+        per_drive_stats.append({"total_files": None, "kept_files": 0, "deleted_files": 0, "refused_files": 0})
         card = tk.Frame(cards_frame, bg="#fff", bd=2, relief=tk.RIDGE, padx=10, pady=8)
         card.pack(side=tk.LEFT, padx=8, pady=4)
         label_frames.append(card)
         label_text = f"cam{cam_number}: {drive} - {volname}" if volname else f"cam{cam_number}: {drive}"
         tk.Label(card, text=label_text, font=("Arial", 10, "bold"), bg="#fff", fg="#2d415a").pack(anchor='w')
-        size_labels[idx] = tk.Label(card, text=f"Total: {per_drive_stats[idx-1]['total_files']} files", font=("Arial", 9), bg="#fff")
+        size_labels[idx] = tk.Label(card, text="Checking imported files...", font=("Arial", 9), bg="#fff")
         size_labels[idx].pack(anchor='w')
         transferred_labels[idx] = tk.Label(card, text=f"Deleted: 0 files", font=("Arial", 9), bg="#fff")
         transferred_labels[idx].pack(anchor='w')
@@ -101,57 +196,92 @@ def remove_all_files_from_sd(
 
     cancel_event.clear()
 
-    # --- REMOVE TASK ---
-    def task():
-        global_deleted_files = 0
-
-        def update_progress(idx, files_done):
-            # Per drive
-            total_files = per_drive_stats[idx-1]['total_files']
+    # --- PROGRESS RENDERING (Tk thread, once per UI frame) ---
+    def render_progress(frame):
+        for idx, changes in frame.items():
+            if idx not in status_labels:
+                continue
+            stat = per_drive_stats[idx-1]
+            if "planned" in changes:
+                stat['total_files'], stat['kept_files'] = changes["planned"]
+                kept = f", {stat['kept_files']} not imported are kept" if stat['kept_files'] else ""
+                size_labels[idx].config(text=f"Total: {stat['total_files']} files to delete{kept}")
+            stat['deleted_files'] += changes.get("files", 0)
+            stat['refused_files'] += changes.get("refused", 0)
+            if "status" in changes:
+                status_labels[idx].config(text=changes["status"])
+            total_files = stat['total_files'] or 0
+            files_done = stat['deleted_files'] + stat['refused_files']
             percent = (files_done / total_files * 100) if total_files else 0
             progress_bars[idx]['value'] = percent
             percent_labels[idx].config(text=f"{percent:.1f}%")
-            transferred_labels[idx].config(text=f"Deleted: {files_done} files")
+            transferred_labels[idx].config(text=f"Deleted: {stat['deleted_files']} files")
             file_count_labels[idx].config(text=f"{files_done}/{total_files} files")
-            # Global
-            nonlocal global_deleted_files
-            global_deleted_files = sum(stat['deleted_files'] for stat in per_drive_stats)
-            global_percent = (global_deleted_files / global_total_files * 100) if global_total_files else 0
-            if global_progress_bar is not None:
-                global_progress_bar['value'] = global_percent
-            if global_stats_label is not None:
-                global_stats_label.config(
-                    text=f"Total: {global_deleted_files}/{global_total_files} files deleted ({global_percent:.1f}%)"
-                )
-
-        def remove_one(idx, drive, stat, cam_number):
-            files_done = 0
-            for file_path in stat['files']:
-                if cancel_event.is_set():
-                    status_labels[idx].config(text="Delete cancelled.")
-                    return
-                try:
-                    os.remove(file_path)
-                    stat['deleted_files'] += 1
-                except Exception:
-                    pass
-                files_done += 1
-                update_progress(idx, files_done)
-            if not cancel_event.is_set():
+        if not frame:
+            return
+        global_total_files = sum(stat['total_files'] or 0 for stat in per_drive_stats)
+        global_deleted_files = sum(stat['deleted_files'] for stat in per_drive_stats)
+        global_done = global_deleted_files + sum(stat['refused_files'] for stat in per_drive_stats)
+        global_percent = (global_done / global_total_files * 100) if global_total_files else 0
+        if global_progress_bar is not None:
+            global_progress_bar['value'] = global_percent
+        if global_stats_label is not None:
+            global_stats_label.config(
+                text=f"Total: {global_deleted_files}/{global_total_files} files deleted ({global_percent:.1f}%)"
+            )
+
+    post_ui_event = ui_bus.open(render_progress)
+
+    # --- REMOVE TASK ---
+    def task():
+        ledger_path = Path(main_folder) / LEDGER_FILENAME
+        ledger = ImportLedger(ledger_path) if ledger_path.exists() else None
+        pool = ThreadPoolExecutor(max_workers=WIPE_WORKERS)
+        recorder = RunRecorder() if report else None
+
+        def remove_one(idx, drive, volname, cam_number):
+            started = time.time()
+            volume = get_volume_identity(drive, volname)
+            deletable, kept = plan_wipe(drive, volume, iter_media_files, transferred_manifests.get(volume), ledger)
+            post_ui_event(idx, "planned", (len(deletable), kept))
+
+            def progress(deleted, refused):
+                post_ui_event(idx, "files", deleted)
+                post_ui_event(idx, "refused", refused)
+
+            deleted, refused = wipe_files(pool, deletable, cancel_event, progress, recorder, f"cam{cam_number}")
+            if recorder is not None:
+                recorder.add_card(f"cam{cam_number}", drive=drive, elapsed=round(time.time() - started, 3),
+                                  deleted=deleted, refused=refused, kept=kept)
+            if cancel_event.is_set():
+                post_ui_event(idx, "status", "Delete cancelled.")
+                return
+            note = ""
+            if kept:
+                note += f" {kept} files not imported were kept."
+            if refused:
+                note += f" {refused} files changed or lost their copy and were kept."
+            if kept or refused:
+                post_ui_event(idx, "status", f"Deleted {deleted} imported files from cam{cam_number}.{note}")
+            else:
                 eject_drive(drive)
-                status_labels[idx].config(text=f"All files deleted and cam{cam_number} ejected.")
+                post_ui_event(idx, "status", f"All files deleted and cam{cam_number} ejected.")
 
         threads = []
         for idx, (drive, volname, cam_number) in enumerate(selected_drives, start=1):
-            t = threading.Thread(
-                target=remove_one,
-                args=(idx, drive, per_drive_stats[idx-1], cam_number)
-            )
+            t = threading.Thread(target=remove_one, args=(idx, drive, volname, cam_number))
             threads.append(t)
             t.start()
         for t in threads:
             t.join()
-        if not selected_drives:
-            status_labels[0].config(text="No SD cards selected.")
+        pool.shutdown()
+        if ledger is not None:
+            ledger.close()
+        if recorder is not None:
+            stamp = time.strftime("%Y%m%d_%H%M%S")
+            try:
+                recorder.write(Path(main_folder) / f"sdcopier_wipe_report_{stamp}.json")
+            except OSError as e:
+                print("Could not write the wipe report:", e)
 
-    threading.Thread(target=task).start()
\ No newline at end of file
+    threading.Thread(target=task).start()
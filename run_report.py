@@ -0,0 +1,137 @@
+import csv
+import json
+import threading
+import time
+from pathlib import Path
+
+# Phases timed per file. prepare: choosing and creating the destination
+# folder, dedup and journal; open: opening source and destination; read
+# and write: moving the data; hash: time the copy waited for hashing on
+# top of the write; metadata: copying timestamps; finalize: rename,
+# journal and ledger; ui: progress callbacks; throttle: waiting for the
+# bandwidth limits. Wipes time check (stat of card file and copy) and delete.
+PHASES = ("prepare", "open", "read", "write", "hash", "metadata", "finalize", "ui", "throttle", "check", "delete")
+PERCENTILES = (50, 90, 99)
+
+# A card is called bound by one side when that side took this much longer
+BOUND_RATIO = 1.2
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class FileTimings:
+    """Seconds spent per phase on one file. Only touched by the threads copying that file."""
+    __slots__ = ("card", "path", "size", "phases", "started")
+
+    def __init__(self, card, path, size):
+        self.card = card
+        self.path = str(path)
+        self.size = size
+        self.phases = {}
+        self.started = time.perf_counter()
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+class RunRecorder:
+    """
+    Collects per-file phase timings from every card of a run and writes
+    the run report: per card totals, percentiles of each phase per file
+    and whether the card was held back by its source (card, reader, hub)
+    or by the destination disk.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files = []
+        self.cards = {}
+        self.started = time.time()
+
+    def start_file(self, card, path, size):
+        return FileTimings(card, path, size)
+
+    def finish_file(self, timings):
+        timings.phases["total"] = time.perf_counter() - timings.started
+        with self.lock:
+            self.files.append(timings)
+
+    def add_card(self, name, **summary):
+        """Records card level figures, e.g. drive, elapsed seconds and scan seconds."""
+        with self.lock:
+            self.cards.setdefault(name, {}).update(summary)
+
+    @staticmethod
+    def verdict(phases):
+        source = phases.get("read", 0.0)
+        destination = phases.get("write", 0.0) + phases.get("metadata", 0.0) + phases.get("hash", 0.0)
+        overhead = sum(phases.get(p, 0.0) for p in ("prepare", "open", "finalize", "ui"))
+        if not source and not destination:
+            return "n/a"
+        if phases.get("throttle", 0.0) > source + destination:
+            return "throttled"
+        if overhead > source + destination:
+            return "overhead"
+        if source > destination * BOUND_RATIO:
+            return "source"
+        if destination > source * BOUND_RATIO:
+            return "destination"
+        return "balanced"
+
+    def report(self):
+        with self.lock:
+            files = list(self.files)
+            cards = {name: dict(summary) for name, summary in self.cards.items()}
+        by_card = {}
+        for timings in files:
+            by_card.setdefault(timings.card, []).append(timings)
+        for name, card_files in by_card.items():
+            card = cards.setdefault(name, {})
+            totals = {}
+            for timings in card_files:
+                for phase, seconds in timings.phases.items():
+                    totals[phase] = totals.get(phase, 0.0) + seconds
+            nbytes = sum(t.size for t in card_files)
+            card["files"] = len(card_files)
+            card["bytes"] = nbytes
+            elapsed = card.get("elapsed")
+            if elapsed:
+                card["mb_per_s"] = round(nbytes / (1024 * 1024) / elapsed, 2)
+            card["phase_seconds"] = {phase: round(seconds, 6) for phase, seconds in totals.items()}
+            card["percentiles"] = {}
+            for phase in PHASES + ("total",):
+                values = sorted(t.phases[phase] for t in card_files if phase in t.phases)
+                if values:
+                    card["percentiles"][phase] = {
+                        f"p{p}": round(percentile(values, p), 6) for p in PERCENTILES
+                    }
+            card["bound_by"] = self.verdict(totals)
+        return {"started": self.started, "finished": time.time(), "cards": cards}
+
+    def write(self, path):
+        """
+        Writes the report to path (JSON) and one row per file to the same
+        name with a .csv suffix. Returns the report.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = self.report()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        with self.lock:
+            files = list(self.files)
+        with open(path.with_suffix(".csv"), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["card", "path", "size", "total"] + list(PHASES))
+            for t in files:
+                writer.writerow(
+                    [t.card, t.path, t.size, f"{t.phases.get('total', 0.0):.6f}"]
+                    + [f"{t.phases.get(phase, 0.0):.6f}" for phase in PHASES]
+                )
+        return report
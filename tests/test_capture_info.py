@@ -0,0 +1,82 @@
+import shutil
+import struct
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from capture_info import QUICKTIME_EPOCH_OFFSET, parse_timestamp, read_capture_info
+
+TAKEN = time.mktime((2024, 5, 1, 13, 2, 3, 0, 0, -1))
+
+
+def tiff(model=b"Canon EOS R6", taken=b"2024:05:01 13:02:03"):
+    """A little-endian TIFF structure with Model and DateTime in IFD0."""
+    entries = [(0x0110, model + b"\0"), (0x0132, taken + b"\0")]
+    data_offset = 8 + 2 + 12 * len(entries) + 4
+    ifd, data = struct.pack("<H", len(entries)), b""
+    for tag, value in entries:
+        ifd += struct.pack("<HHII", tag, 2, len(value), data_offset + len(data))
+        data += value
+    return b"II*\0" + struct.pack("<I", 8) + ifd + b"\0\0\0\0" + data
+
+
+def jpeg(exif):
+    app1 = b"Exif\0\0" + exif
+    return b"\xff\xd8\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1 + b"\xff\xda\0\x02" + b"x" * 100
+
+
+class ReadCaptureInfoTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.folder, True)
+
+    def write(self, name, data):
+        path = self.folder / name
+        path.write_bytes(data)
+        return path
+
+    def test_jpeg_exif(self):
+        self.assertEqual(read_capture_info(self.write("IMG.JPG", jpeg(tiff()))), (TAKEN, "Canon EOS R6"))
+
+    def test_tiff_raw(self):
+        self.assertEqual(read_capture_info(self.write("DSC.NEF", tiff(b"NIKON Z 6"))), (TAKEN, "NIKON Z 6"))
+
+    def test_mp4_mvhd(self):
+        created = int(TAKEN) + QUICKTIME_EPOCH_OFFSET
+        mvhd = struct.pack(">I4sB3xII", 20, b"mvhd", 0, created, created)
+        moov = struct.pack(">I4s", 8 + len(mvhd), b"moov") + mvhd
+        ftyp = struct.pack(">I4s4s", 12, b"ftyp", b"isom")
+        self.assertEqual(read_capture_info(self.write("C0001.MP4", ftyp + moov)), (TAKEN, None))
+
+    def test_broadcast_wav(self):
+        bext = bytearray(346)
+        bext[256:263] = b"ZOOM F6"
+        bext[320:330] = b"2024-05-01"
+        bext[330:338] = b"13:02:03"
+        chunk = b"bext" + struct.pack("<I", len(bext)) + bytes(bext)
+        data = b"RIFF" + struct.pack("<I", 4 + len(chunk)) + b"WAVE" + chunk
+        self.assertEqual(read_capture_info(self.write("ZOOM0001.WAV", data)), (TAKEN, "ZOOM F6"))
+
+    def test_missing_or_broken_headers(self):
+        self.assertEqual(read_capture_info(self.write("IMG.JPG", b"\xff\xd8\xff\xda\0\x02")), (None, None))
+        self.assertEqual(read_capture_info(self.write("C0001.MP4", b"\0" * 100)), (None, None))
+        self.assertEqual(read_capture_info(self.write("NOTES.TXT", b"hello")), (None, None))
+        # Cameras without a clock set write dates before 1970 or zeros
+        self.assertEqual(read_capture_info(self.write("IMG.NEF", tiff(taken=b"0000:00:00 00:00:00"))),
+                         (None, "Canon EOS R6"))
+
+
+class ParseTimestampTest(unittest.TestCase):
+    def test_separators(self):
+        self.assertEqual(parse_timestamp("2024:05:01 13:02:03"), TAKEN)
+        self.assertEqual(parse_timestamp("2024-05-01T13:02:03"), TAKEN)
+        self.assertEqual(parse_timestamp("2024-05-01"), time.mktime((2024, 5, 1, 0, 0, 0, 0, 0, -1)))
+
+    def test_invalid(self):
+        for text in (None, "", "2024", "2024:13:01", "1969:01:01"):
+            self.assertIsNone(parse_timestamp(text), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
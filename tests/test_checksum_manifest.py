@@ -0,0 +1,43 @@
+import csv
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from main import CopyRecord, MediaFile, write_checksum_manifest
+
+TAKEN = time.mktime((2024, 5, 1, 13, 2, 3, 0, 0, -1))
+
+
+class ChecksumManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.path = self.folder / "cam1_manifest.csv"
+        media_file = MediaFile(Path("/card/DCIM/IMG_0001.CR3"), "image", 1000, 0.0,
+                               captured=TAKEN, camera="Canon EOS R6")
+        self.record = CopyRecord(media_file, self.folder / "IMG_0001.CR3", "abc", True)
+
+    def rows(self):
+        with open(self.path, newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+    def test_capture_columns(self):
+        unknown = CopyRecord(MediaFile(Path("/card/DCIM/IMG_0002.JPG"), "image", 10, 0.0), self.folder / "b", "def")
+        write_checksum_manifest(self.path, [self.record])
+        write_checksum_manifest(self.path, [unknown])
+        first, second = self.rows()
+        self.assertEqual((first["captured"], first["camera"], first["verified"]),
+                         ("2024-05-01 13:02:03", "Canon EOS R6", "yes"))
+        self.assertEqual((second["captured"], second["camera"], second["verified"]), ("", "", ""))
+
+    def test_older_file_keeps_its_columns(self):
+        self.path.write_text("source,destination,size,algorithm,hash,verified\r\n", encoding='utf-8')
+        write_checksum_manifest(self.path, [self.record])
+        with open(self.path, newline='', encoding='utf-8') as f:
+            self.assertEqual([len(row) for row in csv.reader(f)], [6, 6])
+
+
+if __name__ == "__main__":
+    unittest.main()
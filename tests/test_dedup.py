@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import main as engine
+from dedup import DedupIndex
+from drive_backends import DirectoryDriveBackend, get_backend, set_backend
+
+
+class DuplicatesWithinOneRunTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        card = self.folder / "CARD"
+        for subfolder in ("100CANON", "101CANON"):
+            (card / "DCIM" / subfolder).mkdir(parents=True)
+        # Large enough that the first copy is still being written when the
+        # second file is read in overlapped mode
+        content = os.urandom(8 * 1024 * 1024)
+        (card / "DCIM" / "100CANON" / "IMG_0001.JPG").write_bytes(content)
+        (card / "DCIM" / "101CANON" / "IMG_0001.JPG").write_bytes(content)
+        previous = get_backend()
+        self.addCleanup(set_backend, previous)
+        set_backend(DirectoryDriveBackend([str(card)]))
+
+    def ingest(self, pipelined, dedup=None, backup_roots=()):
+        dest = self.folder / ("overlapped" if pipelined else "sequential")
+        results = []
+        engine.process_cameras_parallel(
+            threading.Event(), lambda idx, speed: None, lambda idx, message: results.append(message),
+            pipelined=pipelined, dedup=dedup or DedupIndex(engine.new_hasher),
+            picture_base=dest / "Pictures", video_base=dest / "Videos", sound_base=dest / "Sound",
+            journal_dir=dest, eject=False, backup_roots=backup_roots,
+        )
+        return results
+
+    def test_sequential(self):
+        self.assertIn("deduplicated", self.ingest(pipelined=False)[0])
+
+    def test_pipelined(self):
+        self.assertIn("deduplicated", self.ingest(pipelined=True)[0])
+
+    def test_with_backup(self):
+        backup = self.folder / "Backup"
+        self.assertIn("deduplicated", self.ingest(pipelined=False, backup_roots=[backup])[0])
+        main_copies = sorted((self.folder / "sequential" / "Pictures" / "cam1").iterdir())
+        backup_copies = sorted((backup / "Pictures" / "cam1").iterdir())
+        self.assertEqual([p.name for p in backup_copies], [p.name for p in main_copies])
+        self.assertEqual(backup_copies[1].read_bytes(), main_copies[0].read_bytes())
+        # Backups never share data with the main copy
+        self.assertEqual(backup_copies[1].stat().st_nlink, 1)
+
+    def test_unreadable_lookup_copies(self):
+        class Unreadable(DedupIndex):
+            def find(self, path, size):
+                raise OSError("card read failed")
+
+        results = self.ingest(pipelined=False, dedup=Unreadable(engine.new_hasher))
+        self.assertEqual(results, ["Transferred cam1."])
+        self.assertEqual(len(list((self.folder / "sequential" / "Pictures" / "cam1").iterdir())), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from destination_plan import DestinationPlan, NamingTemplate
+from transfer_journal import PART_SUFFIX
+
+STAMP = "01-05-2024-13"
+
+
+class DestinationPlanTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.pictures = self.folder / "Pictures"
+
+    def plan(self, naming="{stem}_{ingest}"):
+        return DestinationPlan({"image": self.pictures}, timestamp=STAMP, naming=naming)
+
+    def test_same_name_twice_gets_a_number(self):
+        plan = self.plan()
+        first = plan.assign("image", "IMG_0001.JPG")
+        second = plan.assign("image", "IMG_0001.JPG")
+        third = plan.assign("image", "IMG_0001.JPG")
+        self.assertEqual(first, self.pictures / f"IMG_0001_{STAMP}.JPG")
+        self.assertEqual(second, self.pictures / f"IMG_0001_{STAMP}_2.JPG")
+        self.assertEqual(third, self.pictures / f"IMG_0001_{STAMP}_3.JPG")
+
+    def test_files_already_there_are_never_reused(self):
+        self.pictures.mkdir()
+        (self.pictures / f"img_0001_{STAMP}.jpg").write_bytes(b"old")
+        (self.pictures / f"IMG_0001_{STAMP}_2.JPG{PART_SUFFIX}").write_bytes(b"partial")
+        # Names differing only in case count as taken, as on Windows
+        self.assertEqual(self.plan().assign("image", "IMG_0001.JPG"), self.pictures / f"IMG_0001_{STAMP}_3.JPG")
+
+    def test_reserved_path_is_skipped(self):
+        plan = self.plan()
+        plan.reserve(self.pictures / f"IMG_0001_{STAMP}.JPG")
+        self.assertEqual(plan.assign("image", "IMG_0001.JPG"), self.pictures / f"IMG_0001_{STAMP}_2.JPG")
+
+    def test_template_folders_from_capture_time(self):
+        plan = self.plan("{date}/{camera}/{stem}")
+        captured = time.mktime((2024, 5, 1, 13, 2, 3, 0, 0, -1))
+        first = plan.assign("image", "IMG_0001.CR3", captured=captured, camera="Canon EOS R6")
+        second = plan.assign("image", "IMG_0001.CR3", captured=captured, camera="Canon EOS R6")
+        folder = self.pictures / "2024-05-01" / "Canon EOS R6"
+        self.assertEqual(first, folder / "IMG_0001.CR3")
+        self.assertEqual(second, folder / "IMG_0001_2.CR3")
+        self.assertTrue(folder.is_dir())
+
+
+class NamingTemplateTest(unittest.TestCase):
+    def test_values_never_add_folders(self):
+        parts = NamingTemplate("{camera}/{stem}").render("IMG", STAMP, camera="EOS/R6: II", card="cam1")
+        self.assertEqual(parts, ["EOS_R6_ II", "IMG"])
+
+    def test_missing_capture_values(self):
+        self.assertEqual(NamingTemplate("{camera}_{card}").render("IMG", STAMP), ["unknown_card"])
+
+    def test_bad_templates(self):
+        for template in ("{foo}", "../{stem}", "{date}//{stem}", "C:/{stem}", "{stem"):
+            with self.assertRaises(ValueError, msg=template):
+                NamingTemplate(template)
+
+    def test_needs_capture(self):
+        self.assertFalse(NamingTemplate().needs_capture)
+        self.assertTrue(NamingTemplate("{year}/{stem}").needs_capture)
+
+
+if __name__ == "__main__":
+    unittest.main()
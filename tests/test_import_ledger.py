@@ -0,0 +1,45 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from import_ledger import ImportLedger, ledger_key
+
+
+class ImportLedgerTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.path = self.folder / "ledger.db"
+
+    def captures(self):
+        conn = sqlite3.connect(str(self.path))
+        self.addCleanup(conn.close)
+        return conn.execute("SELECT rel_path, captured, camera FROM imported ORDER BY rel_path").fetchall()
+
+    def test_capture_info_is_kept(self):
+        ledger = ImportLedger(self.path)
+        ledger.record("CARD:1", "DCIM/IMG_0001.CR3", 1000, 1.0, "/dest/IMG_0001.CR3", 1714568523.0, "Canon EOS R6")
+        ledger.record("CARD:1", "DCIM/IMG_0002.CR3", 1000, 1.0, "/dest/IMG_0002.CR3")
+        ledger.close()
+        self.assertEqual(self.captures(), [("DCIM/IMG_0001.CR3", 1714568523.0, "Canon EOS R6"),
+                                           ("DCIM/IMG_0002.CR3", None, None)])
+
+    def test_older_ledger_gets_the_columns(self):
+        conn = sqlite3.connect(str(self.path))
+        conn.execute("CREATE TABLE imported (volume TEXT NOT NULL, rel_path TEXT NOT NULL, size INTEGER NOT NULL,"
+                     " mtime_ms INTEGER NOT NULL, dest TEXT, imported_at REAL,"
+                     " PRIMARY KEY (volume, rel_path, size, mtime_ms))")
+        conn.execute("INSERT INTO imported VALUES ('CARD:1', 'DCIM/OLD.JPG', 10, 1000, '/dest/OLD.JPG', 0)")
+        conn.commit()
+        conn.close()
+        ledger = ImportLedger(self.path)
+        self.assertEqual(ledger.load_volume("CARD:1"), {ledger_key("DCIM/OLD.JPG", 10, 1.0)})
+        ledger.record("CARD:1", "DCIM/NEW.JPG", 10, 1.0, "/dest/NEW.JPG", None, "NIKON Z 6")
+        ledger.close()
+        self.assertEqual(self.captures(), [("DCIM/NEW.JPG", None, "NIKON Z 6"), ("DCIM/OLD.JPG", None, None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from import_ledger import ImportLedger
+from main import CopyRecord, MediaManifest, iter_media_files
+from remove_sd_files import delete_if_safe, plan_wipe
+
+VOLUME = "CARD:1234"
+
+
+class PlanWipeTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.drive = str(self.folder / "CARD")
+        pictures = Path(self.drive) / "DCIM" / "100CANON"
+        pictures.mkdir(parents=True)
+        for name in ("IMG_0001.JPG", "IMG_0002.JPG", "IMG_0003.JPG"):
+            (pictures / name).write_bytes(os.urandom(1000))
+        self.dest = self.folder / "Pictures"
+        self.dest.mkdir()
+        self.files = sorted(iter_media_files(self.drive), key=lambda f: f.path.name)
+
+    def copy(self, media_file):
+        destination = self.dest / media_file.path.name
+        shutil.copy2(media_file.path, destination)
+        return destination
+
+    def manifest(self, records, complete=True):
+        manifest = MediaManifest(self.drive)
+        for media_file in self.files:
+            manifest.add(media_file)
+        manifest.copied = records
+        manifest.complete = complete
+        return manifest
+
+    def test_only_confirmed_copies_are_deletable(self):
+        first, second, third = self.files
+        records = [
+            CopyRecord(first, self.copy(first), verified=True),
+            # Failed verification: stays on the card
+            CopyRecord(second, self.copy(second), verified=False),
+        ]
+        deletable, kept = plan_wipe(self.drive, VOLUME, iter_media_files, self.manifest(records))
+        self.assertEqual([media_file for media_file, _ in deletable], [first])
+        self.assertEqual(kept, 2)
+
+    def test_incomplete_manifest_rescans_and_trusts_only_the_ledger(self):
+        first = self.files[0]
+        ledger = ImportLedger(self.folder / "ledger.db")
+        self.addCleanup(ledger.close)
+        relative = first.path.relative_to(self.drive).as_posix()
+        ledger.record(VOLUME, relative, first.size, first.mtime, self.copy(first))
+        ledger.flush()
+        records = [CopyRecord(f, self.copy(f), verified=True) for f in self.files[1:]]
+        deletable, kept = plan_wipe(self.drive, VOLUME, iter_media_files,
+                                    self.manifest(records, complete=False), ledger)
+        self.assertEqual([media_file.path for media_file, _ in deletable], [first.path])
+        self.assertEqual(kept, 2)
+
+    def test_delete_refuses_changed_source_or_missing_copy(self):
+        first, second, third = self.files
+        destination = self.copy(first)
+        first.path.write_bytes(os.urandom(2000))
+        self.assertFalse(delete_if_safe(first, destination))
+        self.assertFalse(delete_if_safe(second, self.dest / "missing.JPG"))
+        short = self.dest / "short.JPG"
+        short.write_bytes(b"x")
+        self.assertFalse(delete_if_safe(third, short))
+        self.assertTrue(all(media_file.path.exists() for media_file in self.files))
+        self.assertTrue(delete_if_safe(third, self.copy(third)))
+        self.assertFalse(third.path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import main as engine
+from drive_backends import DirectoryDriveBackend, get_backend, set_backend
+from transfer_journal import PART_SUFFIX, TransferJournal, journaled_card
+
+KEY = ("DCIM/100CANON/MVI_0001.MP4", 1000, 1700000000.0)
+
+
+class TransferJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.dest = self.folder / "MVI_0001.MP4"
+
+    def reopen(self, journal):
+        journal.close()
+        return TransferJournal(journal.path)
+
+    def test_resume_point_after_reopen(self):
+        journal = TransferJournal(self.folder / "card.jsonl")
+        journal.start(*KEY, self.dest)
+        journal.checkpoint(*KEY, 600)
+        Path(str(self.dest) + PART_SUFFIX).write_bytes(b"x" * 800)
+        journal = self.reopen(journal)
+        self.assertEqual(journal.resume_point(*KEY), (self.dest, 600))
+        journal.close()
+
+    def test_offset_never_past_the_part_file(self):
+        journal = TransferJournal(self.folder / "card.jsonl")
+        journal.start(*KEY, self.dest)
+        journal.checkpoint(*KEY, 600)
+        Path(str(self.dest) + PART_SUFFIX).write_bytes(b"x" * 100)
+        self.assertEqual(self.reopen(journal).resume_point(*KEY), (self.dest, 100))
+
+    def test_no_resume_without_part_file(self):
+        journal = TransferJournal(self.folder / "card.jsonl")
+        journal.start(*KEY, self.dest)
+        self.assertIsNone(self.reopen(journal).resume_point(*KEY))
+
+    def test_done_and_forget(self):
+        journal = TransferJournal(self.folder / "card.jsonl")
+        journal.start(*KEY, self.dest)
+        journal.done(*KEY, self.dest)
+        journal = self.reopen(journal)
+        self.assertTrue(journal.is_finished(*KEY))
+        journal.forget(*KEY)
+        self.assertFalse(self.reopen(journal).is_finished(*KEY))
+
+    def test_kept_copies_and_card(self):
+        journal = TransferJournal.for_volume(self.folder, "CARD:1234")
+        journal.set_card("cam3")
+        journal.keep(*KEY, [None, self.dest])
+        journal = self.reopen(journal)
+        self.assertEqual(journal.kept_copies(*KEY), [None, str(self.dest)])
+        self.assertFalse(journal.is_finished(*KEY))
+        self.assertEqual(journaled_card(self.folder, "CARD:1234"), "cam3")
+        self.assertIsNone(journaled_card(self.folder, "OTHER:1"))
+        journal.close()
+
+
+class ResumeTransferTest(unittest.TestCase):
+    """A card stopped mid-file finishes it from the .part file on the next run."""
+
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.card = self.folder / "CARD"
+        clip = self.card / "PRIVATE" / "M4ROOT" / "CLIP" / "C0001.MP4"
+        clip.parent.mkdir(parents=True)
+        self.content = os.urandom(3 * 1024 * 1024)
+        clip.write_bytes(self.content)
+        self.clip = clip
+        previous = get_backend()
+        self.addCleanup(set_backend, previous)
+        set_backend(DirectoryDriveBackend([str(self.card)]))
+
+    def test_resumes_from_the_offset(self):
+        dest = self.folder / "Media"
+        final = dest / "Videos" / "cam1" / "C0001_resumed.MP4"
+        final.parent.mkdir(parents=True)
+        offset = 1024 * 1024
+        # What an interrupted run leaves behind: the first MB and the journal
+        Path(str(final) + PART_SUFFIX).write_bytes(self.content[:offset])
+        volume = engine.get_volume_identity(str(self.card), "CARD")
+        journal = TransferJournal.for_volume(dest, volume)
+        key = ("PRIVATE/M4ROOT/CLIP/C0001.MP4", len(self.content), self.clip.stat().st_mtime)
+        journal.start(*key, final)
+        journal.checkpoint(*key, offset)
+        journal.close()
+
+        cards = engine.process_cameras_parallel(
+            threading.Event(), lambda idx, speed: None, lambda idx, message: None,
+            picture_base=dest / "Pictures", video_base=dest / "Videos", sound_base=dest / "Sound",
+            journal_dir=dest, eject=False,
+        )
+        self.assertEqual(final.read_bytes(), self.content)
+        self.assertFalse(Path(str(final) + PART_SUFFIX).exists())
+        self.assertEqual(cards[0].resumed_bytes, offset)
+        self.assertEqual(os.listdir(final.parent), [final.name])
+
+    def test_resumes_every_backup_copy(self):
+        dest, backup = self.folder / "Media", self.folder / "Backup"
+        final = dest / "Videos" / "cam1" / "C0001_resumed.MP4"
+        backup_final = backup / "Videos" / "cam1" / "C0001_resumed.MP4"
+        for path in (final, backup_final):
+            path.parent.mkdir(parents=True)
+        # The backup fell further behind than the main copy
+        Path(str(final) + PART_SUFFIX).write_bytes(self.content[:2 * 1024 * 1024])
+        Path(str(backup_final) + PART_SUFFIX).write_bytes(self.content[:1024 * 1024])
+        volume = engine.get_volume_identity(str(self.card), "CARD")
+        journal = TransferJournal.for_volume(dest, volume)
+        key = ("PRIVATE/M4ROOT/CLIP/C0001.MP4", len(self.content), self.clip.stat().st_mtime)
+        journal.start(*key, final, [backup_final])
+        journal.checkpoint(*key, 2 * 1024 * 1024)
+        journal.close()
+
+        cards = engine.process_cameras_parallel(
+            threading.Event(), lambda idx, speed: None, lambda idx, message: None,
+            picture_base=dest / "Pictures", video_base=dest / "Videos", sound_base=dest / "Sound",
+            journal_dir=dest, eject=False, backup_roots=[backup],
+        )
+        for path in (final, backup_final):
+            self.assertEqual(path.read_bytes(), self.content)
+            self.assertEqual(os.listdir(path.parent), [path.name])
+        self.assertEqual(cards[0].resumed_bytes, 1024 * 1024)
+
+    def test_cancelled_fan_out_keeps_its_part_files(self):
+        cancel_event = threading.Event()
+
+        class CancelAfterFirstChunk:
+            def update(self, data):
+                cancel_event.set()
+
+        parts = [self.folder / "main.MP4.part", self.folder / "backup.MP4.part"]
+        copier = engine.FanOutCopier(2, cancel_event, buffers=1, buffer_size=256 * 1024)
+        with self.assertRaises(engine.CopyCancelled):
+            copier.copy(self.clip, parts, hasher=CancelAfterFirstChunk(), keep_partial=True)
+        copier.close()
+        offset = min(os.path.getsize(part) for part in parts)
+        self.assertGreater(offset, 0)
+
+        copier = engine.FanOutCopier(2)
+        copier.copy(self.clip, parts, offset=offset)
+        copier.close()
+        for part in parts:
+            self.assertEqual(part.read_bytes(), self.content)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+# Seconds of history behind a speed reading
+SPEED_WINDOW = 5.0
+# Bytes are summed into buckets this long, so a window holds few samples
+SPEED_BUCKET = 0.25
+# Below this much history the windowed rate is not trusted for an ETA
+MIN_RATE_SECONDS = 1.0
+
+PROFILES_FILENAME = "throughput_profiles.json"
+# Weight of the newest card in a profile's learned figures
+PROFILE_WEIGHT = 0.3
+# Cards that copied less than this teach the profile nothing reliable
+PROFILE_MIN_BYTES = 16 * 1024 * 1024
+
+
+class RateWindow:
+    """Bytes per second over the last window seconds."""
+
+    def __init__(self, window=SPEED_WINDOW, bucket=SPEED_BUCKET):
+        self.window = window
+        self.bucket = bucket
+        self.lock = threading.Lock()
+        self.buckets = deque()
+        self.first = None
+
+    def add(self, nbytes, now=None):
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            if self.first is None:
+                self.first = now
+            if self.buckets and now - self.buckets[-1][0] < self.bucket:
+                self.buckets[-1][1] += nbytes
+            else:
+                self.buckets.append([now, nbytes])
+            self._trim(now)
+
+    def _trim(self, now):
+        while self.buckets and now - self.buckets[0][0] > self.window:
+            self.buckets.popleft()
+
+    def rate(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self._trim(now)
+            if not self.buckets:
+                return 0.0
+            # A young window covers only the time since the first byte
+            span = max(self.bucket, min(self.window, now - self.first))
+            return sum(n for _, n in self.buckets) / span
+
+    def settled(self, now=None):
+        """True once the window has enough history for an ETA."""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            return self.first is not None and now - self.first >= MIN_RATE_SECONDS
+
+
+class FileCostFit:
+    """
+    Least-squares fit of seconds = overhead + size * seconds_per_byte over
+    the files of one card, kept as running sums.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.n = self.sx = self.sy = self.sxx = self.sxy = 0.0
+
+    def add(self, size, seconds):
+        with self.lock:
+            self.n += 1
+            self.sx += size
+            self.sy += seconds
+            self.sxx += size * size
+            self.sxy += size * seconds
+
+    def fit(self):
+        """Returns (overhead, seconds_per_byte), or None without enough spread in sizes."""
+        with self.lock:
+            n, sx, sy, sxx, sxy = self.n, self.sx, self.sy, self.sxx, self.sxy
+        denominator = n * sxx - sx * sx
+        if n < 2 or denominator <= 0:
+            return None
+        seconds_per_byte = (n * sxy - sx * sy) / denominator
+        if seconds_per_byte <= 0:
+            return None
+        overhead = max(0.0, (sy - seconds_per_byte * sx) / n)
+        return overhead, seconds_per_byte
+
+
+class ThroughputProfiles:
+    """
+    Sustained MB/s and per-file overhead learned per card model (when
+    labels, e.g. CAMERA_LABELS, know the volume label) or per volume,
+    stored as JSON at path.
+    """
+
+    def __init__(self, path, labels=None):
+        self.path = Path(path)
+        self.labels = labels or {}
+        self.lock = threading.Lock()
+        self.profiles = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.profiles = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def key_for(self, volume, volname=""):
+        return self.labels.get((volname or "").upper()) or volume
+
+    def get(self, key):
+        with self.lock:
+            profile = self.profiles.get(key)
+            return dict(profile) if profile else None
+
+    def estimate(self, key, files, nbytes):
+        """Seconds to copy files totalling nbytes from this card, or None if it was never seen."""
+        profile = self.get(key)
+        if not profile or not profile.get("mb_per_s"):
+            return None
+        return files * profile["file_overhead_s"] + nbytes / (profile["mb_per_s"] * 1024 * 1024)
+
+    def learn(self, key, files, nbytes, elapsed, fit=None):
+        """
+        Folds a finished card into its profile. fit is the card's
+        FileCostFit; its per-file costs are scaled so they add up to
+        elapsed, which accounts for files copied in parallel.
+        """
+        if not key or nbytes < PROFILE_MIN_BYTES or elapsed <= 0:
+            return
+        overhead, rate = 0.0, nbytes / elapsed
+        fitted = fit.fit() if fit is not None else None
+        if fitted is not None:
+            file_overhead, seconds_per_byte = fitted
+            scale = elapsed / (files * file_overhead + nbytes * seconds_per_byte)
+            overhead, rate = file_overhead * scale, 1 / (seconds_per_byte * scale)
+        mb_per_s = rate / (1024 * 1024)
+        with self.lock:
+            profile = self.profiles.get(key)
+            if profile:
+                w = PROFILE_WEIGHT
+                mb_per_s = (1 - w) * profile["mb_per_s"] + w * mb_per_s
+                overhead = (1 - w) * profile["file_overhead_s"] + w * overhead
+            self.profiles[key] = {
+                "mb_per_s": round(mb_per_s, 2),
+                "file_overhead_s": round(overhead, 5),
+                "cards": (profile or {}).get("cards", 0) + 1,
+                "updated": round(time.time()),
+            }
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        # Cards finishing together save at once; the lock keeps them off the same temp file
+        with self.lock:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.profiles, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+
+
+def format_eta(seconds):
+    """'1:02:03', '2:03' or '--' when unknown."""
+    if seconds is None:
+        return "--"
+    seconds = max(0, int(round(seconds)))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
@@ -0,0 +1,427 @@
+import hashlib
+import io
+import os
+import struct
+import threading
+from pathlib import Path
+
+# Long side of a cached thumbnail, in pixels
+THUMBNAIL_SIZE = 256
+THUMBNAIL_QUALITY = 85
+THUMBNAILS_FOLDER = ".sdcopier_thumbnails"
+# Worker processes; one core is left to the copy threads
+THUMBNAIL_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+# Bytes hashed from each end of a picture for its cache key
+FINGERPRINT_BYTES = 64 * 1024
+
+# RAW files built on TIFF, whose IFDs point at their JPEG previews
+TIFF_RAW_EXTENSIONS = {'.cr2', '.nef', '.nrw', '.arw', '.srf', '.sr2', '.dng', '.pef', '.orf', '.rw2', '.tif', '.tiff'}
+# RAW files whose previews are found by scanning the start of the file
+SCANNED_RAW_EXTENSIONS = {'.cr3', '.raw'}
+RAF_EXTENSIONS = {'.raf'}
+HEIF_EXTENSIONS = {'.heic', '.heif'}
+PLAIN_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+THUMBNAIL_EXTENSIONS = (TIFF_RAW_EXTENSIONS | SCANNED_RAW_EXTENSIONS | RAF_EXTENSIONS
+                        | HEIF_EXTENSIONS | PLAIN_EXTENSIONS)
+# CR3 keeps its small previews near the start of the file
+PREVIEW_SCAN_BYTES = 4 * 1024 * 1024
+# Bytes of a preview read to find its size before choosing it
+PREVIEW_HEADER_BYTES = 64 * 1024
+# Guards against looping through corrupt IFD chains
+MAX_IFDS = 32
+
+# TIFF tags
+ORIENTATION = 0x0112
+COMPRESSION = 0x0103
+STRIP_OFFSETS = 0x0111
+STRIP_BYTE_COUNTS = 0x0117
+SUB_IFDS = 0x014A
+JPEG_OFFSET = 0x0201
+JPEG_LENGTH = 0x0202
+JPEG_COMPRESSIONS = (6, 7)
+TIFF_TYPE_SIZES = {3: 2, 4: 4, 13: 4}
+# Start-of-frame markers, except lossless (0xC3), which PIL cannot decode;
+# CR2 and DNG keep their raw data as lossless JPEG
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC5, 0xC6, 0xC9, 0xCA, 0xCD, 0xCE}
+LOSSLESS_SOF_MARKERS = {0xC3, 0xC7, 0xCB, 0xCF}
+# Image.Transpose operation undoing each EXIF orientation
+ORIENTATION_TRANSPOSES = {2: "FLIP_LEFT_RIGHT", 3: "ROTATE_180", 4: "FLIP_TOP_BOTTOM", 5: "TRANSPOSE",
+                          6: "ROTATE_270", 7: "TRANSVERSE", 8: "ROTATE_90"}
+
+
+def content_key(path):
+    """Cache key of a picture: a hash of its size and its first and last FINGERPRINT_BYTES."""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        hasher.update(str(size).encode())
+        if size <= 2 * FINGERPRINT_BYTES:
+            hasher.update(f.read())
+        else:
+            hasher.update(f.read(FINGERPRINT_BYTES))
+            f.seek(-FINGERPRINT_BYTES, os.SEEK_END)
+            hasher.update(f.read(FINGERPRINT_BYTES))
+    return hasher.hexdigest()
+
+
+def thumbnail_path(folder, key):
+    return Path(folder) / key[:2] / f"{key}.jpg"
+
+
+# --- Embedded previews ---
+
+def jpeg_info(data, start=0):
+    """
+    Returns (length, width, height) of the JPEG starting at data[start],
+    or None when it is cut off, is not a JPEG or is lossless. Walks the
+    marker segments, so thumbnails inside its EXIF are skipped over.
+    """
+    if data[start:start + 2] != b'\xff\xd8':
+        return None
+    pos = start + 2
+    size = None
+    end = len(data)
+    while pos + 2 <= end:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0xD9:
+            return (pos + 2 - start,) + size if size else None
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            pos += 2
+            continue
+        if pos + 4 > end:
+            return None
+        length = struct.unpack('>H', data[pos + 2:pos + 4])[0]
+        if marker in LOSSLESS_SOF_MARKERS:
+            return None
+        if marker in SOF_MARKERS and pos + 9 <= end:
+            height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+            size = (width, height)
+        pos += 2 + length
+        if marker == 0xDA:
+            # Entropy-coded data runs to the first marker that is not a
+            # stuffed 0xFF00 or a restart marker
+            while True:
+                pos = data.find(b'\xff', pos)
+                if pos < 0 or pos + 1 >= end:
+                    return None
+                following = data[pos + 1]
+                if following == 0x00 or 0xD0 <= following <= 0xD7:
+                    pos += 2
+                elif following == 0xFF:
+                    pos += 1
+                else:
+                    break
+    return None
+
+
+def _choose(candidates, size):
+    """The smallest preview at least size pixels on its long side, else the largest."""
+    if not candidates:
+        return None
+    large_enough = [c for c in candidates if max(c[2], c[3]) >= size]
+    if large_enough:
+        return min(large_enough, key=lambda c: c[2] * c[3])
+    return max(candidates, key=lambda c: c[2] * c[3])
+
+
+def _tiff_values(f, base, order, entry):
+    tag, kind, count, raw = struct.unpack(order + 'HHI4s', entry)
+    item = TIFF_TYPE_SIZES.get(kind)
+    if item is None or count > 4096:
+        return tag, []
+    fmt = order + ('H' if item == 2 else 'I') * count
+    if item * count <= 4:
+        data = raw[:item * count]
+    else:
+        f.seek(base + struct.unpack(order + 'I', raw)[0])
+        data = f.read(item * count)
+        if len(data) < item * count:
+            return tag, []
+    return tag, list(struct.unpack(fmt, data))
+
+
+def _tiff_previews(f, base=0):
+    """
+    Returns (previews, orientation) of the TIFF structure at base: the
+    (offset, length) of every JPEG its IFDs point at, offsets from the
+    start of the file, and IFD0's orientation (1 when not given).
+    """
+    f.seek(base)
+    header = f.read(8)
+    if header[:2] not in (b'II', b'MM') or len(header) < 8:
+        return [], 1
+    order = '<' if header[:2] == b'II' else '>'
+    pending = [struct.unpack(order + 'I', header[4:8])[0]]
+    seen = set()
+    previews = []
+    orientation = None
+    while pending and len(seen) < MAX_IFDS:
+        offset = pending.pop(0)
+        if not offset or offset in seen:
+            continue
+        seen.add(offset)
+        f.seek(base + offset)
+        count_bytes = f.read(2)
+        if len(count_bytes) < 2:
+            continue
+        count = struct.unpack(order + 'H', count_bytes)[0]
+        entries = f.read(12 * count + 4)
+        if len(entries) < 12 * count + 4:
+            continue
+        tags = {}
+        for i in range(count):
+            tag, values = _tiff_values(f, base, order, entries[12 * i:12 * i + 12])
+            if values:
+                tags[tag] = values
+        if orientation is None:
+            orientation = tags.get(ORIENTATION, [1])[0]
+        if JPEG_OFFSET in tags and JPEG_LENGTH in tags:
+            previews.append((base + tags[JPEG_OFFSET][0], tags[JPEG_LENGTH][0]))
+        elif (tags.get(COMPRESSION, [0])[0] in JPEG_COMPRESSIONS
+              and len(tags.get(STRIP_OFFSETS, ())) == 1 and len(tags.get(STRIP_BYTE_COUNTS, ())) == 1):
+            previews.append((base + tags[STRIP_OFFSETS][0], tags[STRIP_BYTE_COUNTS][0]))
+        pending.extend(tags.get(SUB_IFDS, ()))
+        pending.append(struct.unpack(order + 'I', entries[12 * count:])[0])
+    return previews, orientation or 1
+
+
+def _read_chosen(f, previews, size):
+    """Reads the preview _choose picks out of (offset, length) pairs."""
+    candidates = []
+    for offset, length in previews:
+        f.seek(offset)
+        head = f.read(min(length, PREVIEW_HEADER_BYTES))
+        info = _jpeg_header(head)
+        if info is not None:
+            candidates.append((offset, length) + info)
+    chosen = _choose(candidates, size)
+    if chosen is None:
+        return None
+    f.seek(chosen[0])
+    return f.read(chosen[1])
+
+
+def _jpeg_header(head):
+    """(width, height) from the frame header in the first bytes of a JPEG, or None."""
+    if head[:2] != b'\xff\xd8':
+        return None
+    pos = 2
+    while pos + 9 <= len(head):
+        if head[pos] != 0xFF:
+            return None
+        marker = head[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in LOSSLESS_SOF_MARKERS or marker == 0xDA:
+            return None
+        if marker in SOF_MARKERS:
+            height, width = struct.unpack('>HH', head[pos + 5:pos + 9])
+            return width, height
+        pos += 2 + struct.unpack('>H', head[pos + 2:pos + 4])[0]
+    return None
+
+
+def _scanned_previews(data, size):
+    """The preview _choose picks among the whole JPEGs found in data."""
+    candidates = []
+    pos = data.find(b'\xff\xd8\xff')
+    while pos >= 0:
+        info = jpeg_info(data, pos)
+        if info is not None:
+            length, width, height = info
+            candidates.append((pos, length, width, height))
+            # Thumbnails inside this JPEG are smaller than it; skip them
+            pos = data.find(b'\xff\xd8\xff', pos + length)
+        else:
+            pos = data.find(b'\xff\xd8\xff', pos + 2)
+    chosen = _choose(candidates, size)
+    return data[chosen[0]:chosen[0] + chosen[1]] if chosen else None
+
+
+def extract_preview(path, size=THUMBNAIL_SIZE):
+    """
+    Returns (jpeg bytes, orientation) of the embedded preview of a RAW
+    file best suited to a thumbnail of size pixels, or (None, 1) when
+    none is found. Only the file's structure and the chosen preview are
+    read; the RAW data is never decoded.
+    """
+    suffix = Path(path).suffix.lower()
+    with open(path, 'rb') as f:
+        if suffix in RAF_EXTENSIONS:
+            # The RAF header holds the offset and length of its JPEG
+            header = f.read(92)
+            if len(header) == 92 and header.startswith(b'FUJIFILM'):
+                offset, length = struct.unpack('>II', header[84:92])
+                return _read_chosen(f, [(offset, length)], size), 1
+            return None, 1
+        if suffix in TIFF_RAW_EXTENSIONS:
+            previews, orientation = _tiff_previews(f)
+            return _read_chosen(f, previews, size), orientation
+        data = f.read(PREVIEW_SCAN_BYTES)
+    orientation = 1
+    # CR3 keeps its EXIF as a TIFF structure in a CMT1 box
+    cmt1 = data.find(b'CMT1')
+    if cmt1 >= 0:
+        orientation = _tiff_previews(io.BytesIO(data), cmt1 + 4)[1]
+    return _scanned_previews(data, size), orientation
+
+
+# --- Thumbnails (in the worker processes) ---
+
+_heif_registered = None
+
+
+def _register_heif():
+    """Lets PIL open HEIC/HEIF when pillow-heif is installed; returns whether it is."""
+    global _heif_registered
+    if _heif_registered is None:
+        try:
+            from pillow_heif import register_heif_opener
+        except ImportError:
+            _heif_registered = False
+        else:
+            register_heif_opener()
+            _heif_registered = True
+    return _heif_registered
+
+
+def _thumbnail_image(path, size):
+    from PIL import Image, ImageOps
+    suffix = path.suffix.lower()
+    orientation = None
+    source = path
+    if suffix in HEIF_EXTENSIONS and not _register_heif():
+        return None
+    if suffix in TIFF_RAW_EXTENSIONS | SCANNED_RAW_EXTENSIONS | RAF_EXTENSIONS:
+        preview, orientation = extract_preview(path, size)
+        if preview is not None:
+            source = io.BytesIO(preview)
+        elif suffix not in ('.tif', '.tiff'):
+            # A RAW file without a preview would need a full decode
+            return None
+    with Image.open(source) as image:
+        # JPEGs decode straight at 1/2, 1/4 or 1/8 scale
+        image.draft('RGB', (size, size))
+        if orientation is None:
+            image = ImageOps.exif_transpose(image)
+        elif orientation in ORIENTATION_TRANSPOSES:
+            image = image.transpose(getattr(Image.Transpose, ORIENTATION_TRANSPOSES[orientation]))
+        image = image.convert('RGB')
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        return image
+
+
+def make_thumbnail(path, folder, size=THUMBNAIL_SIZE):
+    """
+    Runs in a worker process: writes the thumbnail of the picture at path
+    to the cache in folder, unless it is there already. Returns its path,
+    or None when the picture has nothing PIL can show.
+    """
+    dest = thumbnail_path(folder, content_key(path))
+    if dest.exists():
+        return str(dest)
+    image = _thumbnail_image(Path(path), size)
+    if image is None:
+        return None
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f"{dest.name}.{os.getpid()}.tmp")
+    image.save(tmp, "JPEG", quality=THUMBNAIL_QUALITY)
+    os.replace(tmp, dest)
+    return str(dest)
+
+
+class ThumbnailCache:
+    """
+    Thumbnails of copied pictures, THUMBNAIL_SIZE pixels on the long side,
+    stored in folder under a key made from the picture's content, so a
+    picture imported twice or renamed is only done once. RAW files use
+    their embedded JPEG preview and JPEGs are decoded at reduced scale.
+
+    The work runs in a process pool, so decoding does not hold the GIL the
+    copy threads need; PIL is only imported there. callback(card, path)
+    receives each thumbnail made or found in the cache, on a thread of the
+    pool.
+    """
+
+    def __init__(self, folder, callback=None, size=THUMBNAIL_SIZE, workers=THUMBNAIL_WORKERS):
+        self.folder = Path(folder)
+        self.callback = callback
+        self.size = size
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.pool = None
+        self.made = 0
+        self.failed = 0
+        # Why the last picture failed, e.g. PIL missing or an unreadable file
+        self.last_error = None
+
+    @classmethod
+    def for_main_folder(cls, main_folder, callback=None):
+        return cls(Path(main_folder) / THUMBNAILS_FOLDER, callback)
+
+    @staticmethod
+    def wants(path):
+        return Path(path).suffix.lower() in THUMBNAIL_EXTENSIONS
+
+    def submit(self, path, card=None):
+        """Queues a thumbnail of the picture at path; other files are ignored."""
+        if not self.wants(path):
+            return
+        with self.lock:
+            if self.pool is None:
+                # Started on the first picture, so runs without any pay nothing;
+                # imported here to keep multiprocessing out of the app's startup
+                from concurrent.futures import ProcessPoolExecutor
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            future = self.pool.submit(make_thumbnail, str(path), str(self.folder), self.size)
+
+        def finished(future):
+            error = None if future.cancelled() else future.exception()
+            result = future.result() if not future.cancelled() and error is None else None
+            with self.lock:
+                if result is None:
+                    self.failed += 1
+                    if error is not None:
+                        self.last_error = f"{type(error).__name__}: {error}"
+                else:
+                    self.made += 1
+            if result is not None and self.callback is not None:
+                self.callback(card, result)
+        future.add_done_callback(finished)
+
+    def lookup(self, path):
+        """The cached thumbnail of the picture at path, or None."""
+        dest = thumbnail_path(self.folder, content_key(path))
+        return dest if dest.exists() else None
+
+    def close(self, wait=True):
+        """Stops the worker processes, after the queued thumbnails when wait is set."""
+        with self.lock:
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+def contact_sheet(paths, columns=4, cell=48):
+    """A PIL image of the thumbnails at paths in a grid of cell-pixel squares."""
+    from PIL import Image
+    rows = max(1, -(-len(paths) // columns))
+    sheet = Image.new("RGB", (columns * cell, rows * cell), "white")
+    for i, path in enumerate(paths):
+        try:
+            with Image.open(path) as image:
+                image.draft('RGB', (cell, cell))
+                image = image.convert('RGB')
+                image.thumbnail((cell, cell))
+        except OSError:
+            continue
+        x = (i % columns) * cell + (cell - image.width) // 2
+        y = (i // columns) * cell + (cell - image.height) // 2
+        sheet.paste(image, (x, y))
+    return sheet
@@ -0,0 +1,194 @@
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from import_ledger import ledger_key
+
+# Journals live in this folder under the main folder, one file per card
+JOURNAL_DIRNAME = ".sdcopier_journals"
+# Files are copied under this suffix and renamed once complete
+PART_SUFFIX = ".part"
+# How often (in bytes) the offset of a file being copied is journaled
+JOURNAL_CHECKPOINT_BYTES = 64 * 1024 * 1024
+
+
+class TransferJournal:
+    """
+    Per-card record of finished files and of the byte offset reached in
+    files still being copied, so an interrupted transfer can skip what is
+    done and resume the rest mid-file from its .part file.
+
+    The journal is an append-only file of JSON lines, replayed on open.
+    Files are identified by ledger_key() (path on the card, size, mtime),
+    so a file that changed on the card is never resumed.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.finished = set()
+        self.active = {}
+        # Name of the card's folders (cam<n>) when the journal was written
+        self.card = None
+        # Copies that landed of files whose other copies failed, per destination
+        self.kept = {}
+        if self.path.exists():
+            self._replay()
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    @classmethod
+    def for_volume(cls, folder, volume):
+        return cls(journal_path(folder, volume))
+
+    def _replay(self):
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash; everything before it is valid
+                    continue
+                if entry["event"] == "card":
+                    self.card = entry["name"]
+                    continue
+                key = tuple(entry["key"])
+                if entry["event"] == "start":
+                    self.active[key] = {"dest": entry["dest"], "backups": entry.get("backups", []), "offset": 0}
+                elif entry["event"] == "offset" and key in self.active:
+                    self.active[key]["offset"] = entry["offset"]
+                elif entry["event"] == "done":
+                    self.active.pop(key, None)
+                    self.kept.pop(key, None)
+                    self.finished.add(key)
+                elif entry["event"] == "kept":
+                    self.active.pop(key, None)
+                    self.finished.discard(key)
+                    self.kept[key] = entry["dests"]
+                elif entry["event"] == "forget":
+                    self.active.pop(key, None)
+                    self.finished.discard(key)
+
+    def _append(self, entry):
+        with self.lock:
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+
+    def set_card(self, name):
+        """Records the name of the card's folders, so a resumed card keeps them."""
+        if name != self.card:
+            self.card = name
+            self._append({"event": "card", "name": name})
+
+    def is_finished(self, relative_path, size, mtime):
+        return ledger_key(relative_path, size, mtime) in self.finished
+
+    def resume_point(self, relative_path, size, mtime):
+        """
+        Returns (dest, offset) for a file that was being copied when the
+        transfer stopped, or None. The offset is never past the end of the
+        .part file, nor of any backup copy's .part file, so only data that
+        is really there is kept; a missing backup .part gives offset 0.
+        """
+        entry = self.active.get(ledger_key(relative_path, size, mtime))
+        if entry is None:
+            return None
+        dest = Path(entry["dest"])
+        try:
+            part_size = os.path.getsize(str(dest) + PART_SUFFIX)
+        except OSError:
+            return None
+        offset = min(entry["offset"], part_size)
+        for backup in entry["backups"]:
+            try:
+                offset = min(offset, os.path.getsize(backup + PART_SUFFIX))
+            except OSError:
+                offset = 0
+        return dest, offset
+
+    def resume_backups(self, relative_path, size, mtime):
+        """The backup destinations start() recorded for a file being copied, or []."""
+        entry = self.active.get(ledger_key(relative_path, size, mtime))
+        return [Path(backup) for backup in entry["backups"]] if entry is not None else []
+
+    def start(self, relative_path, size, mtime, dest, backups=()):
+        """Records that a file is being copied to dest, and to each backup destination."""
+        key = ledger_key(relative_path, size, mtime)
+        backups = [str(backup) for backup in backups]
+        self.active[key] = {"dest": str(dest), "backups": backups, "offset": 0}
+        entry = {"event": "start", "key": key, "dest": str(dest)}
+        if backups:
+            entry["backups"] = backups
+        self._append(entry)
+
+    def checkpoint(self, relative_path, size, mtime, offset):
+        key = ledger_key(relative_path, size, mtime)
+        self._append({"event": "offset", "key": key, "offset": offset})
+
+    def done(self, relative_path, size, mtime, dest):
+        key = ledger_key(relative_path, size, mtime)
+        self.active.pop(key, None)
+        self.kept.pop(key, None)
+        self.finished.add(key)
+        self._append({"event": "done", "key": key, "dest": str(dest)})
+
+    def kept_copies(self, relative_path, size, mtime):
+        """The paths (None where it failed) of each copy keep() recorded for a file, or None."""
+        return self.kept.get(ledger_key(relative_path, size, mtime))
+
+    def keep(self, relative_path, size, mtime, dests):
+        """
+        Marks a file as not done while recording the copies of it that did
+        land, one path or None per destination, so the next run writes over
+        them instead of beside them.
+        """
+        key = ledger_key(relative_path, size, mtime)
+        dests = [str(dest) if dest is not None else None for dest in dests]
+        self.active.pop(key, None)
+        self.finished.discard(key)
+        self.kept[key] = dests
+        self._append({"event": "kept", "key": key, "dests": dests})
+
+    def forget(self, relative_path, size, mtime):
+        """Marks a file as not done, e.g. when its copy failed verification."""
+        key = ledger_key(relative_path, size, mtime)
+        self.active.pop(key, None)
+        self.finished.discard(key)
+        self._append({"event": "forget", "key": key})
+
+    def close(self, remove=False):
+        """Closes the journal; remove=True deletes it once the card is fully transferred."""
+        with self.lock:
+            self.file.close()
+        if remove:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+
+def journal_path(folder, volume):
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', volume) or "card"
+    return Path(folder) / JOURNAL_DIRNAME / f"{safe_name}.jsonl"
+
+
+def journaled_card(folder, volume):
+    """
+    The card name recorded by the journal of an interrupted transfer of
+    volume under folder, or None when there is none.
+    """
+    card = None
+    try:
+        with open(journal_path(folder, volume), encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry["event"] == "card":
+                    card = entry["name"]
+    except OSError:
+        return None
+    return card
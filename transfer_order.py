@@ -0,0 +1,91 @@
+import heapq
+import itertools
+from collections import deque
+
+# Orders in which a card's files can be copied:
+#   scan           as the scan finds them
+#   preview-first  JPEG/HEIC previews and audio first, then RAW stills, then
+#                  video, smallest first within each, so editors can start
+#   largest-first  biggest files first, keeping the pipeline busy
+#   capture        oldest capture time first (from the file's header if it has one)
+#   interleaved    one file of each category in turn
+ORDERING_POLICIES = ("scan", "preview-first", "largest-first", "capture", "interleaved")
+DEFAULT_ORDER = "scan"
+
+PREVIEW_EXTENSIONS = {'.jpg', '.jpeg', '.heic', '.heif', '.png'}
+# Rank of each category in preview-first order; previews come before all
+PREVIEW_RANKS = {"sound": 1, "image": 2, "video": 3}
+
+
+def _preview_rank(media_file):
+    if media_file.path.suffix.lower() in PREVIEW_EXTENSIONS:
+        return 0
+    return PREVIEW_RANKS.get(media_file.category, len(PREVIEW_RANKS) + 1)
+
+
+SORT_KEYS = {
+    "preview-first": lambda f: (_preview_rank(f), f.size),
+    "largest-first": lambda f: -f.size,
+    # The header's capture time when the scan read it, else the file's time
+    "capture": lambda f: f.captured if f.captured is not None else f.mtime,
+}
+
+
+class ReadyFiles:
+    """
+    The files of a card that are ready to copy, handed out in the order of
+    an ordering policy. Except for scan order, a card should hand out
+    nothing until its scan is complete (see complete_listing), so the
+    first file copied is the first of the whole card. Not thread safe;
+    the TransferScheduler's lock guards it.
+    """
+
+    def __init__(self, policy=DEFAULT_ORDER):
+        if policy not in ORDERING_POLICIES:
+            raise ValueError(f"Unknown order {policy!r}; use one of {', '.join(ORDERING_POLICIES)}")
+        self.policy = policy
+        self.key = SORT_KEYS.get(policy)
+        # Scanning reads metadata and, for capture order or naming, each file's
+        # header (see capture_info): far less than copying, but not free
+        self.complete_listing = policy != "scan"
+        self.count = 0
+        # scan uses one queue, interleaved one per category, the others a heap
+        self.queues = {}
+        self.turns = deque()
+        self.heap = []
+        self.seq = itertools.count()
+
+    def __len__(self):
+        return self.count
+
+    def push(self, media_file):
+        self.count += 1
+        if self.key is not None:
+            heapq.heappush(self.heap, (self.key(media_file), next(self.seq), media_file))
+            return
+        category = media_file.category if self.policy == "interleaved" else None
+        if category not in self.queues:
+            self.queues[category] = deque()
+            self.turns.append(category)
+        self.queues[category].append(media_file)
+
+    def _next_turn(self):
+        # Categories with nothing waiting give up their turn
+        while not self.queues[self.turns[0]]:
+            self.turns.rotate(-1)
+        return self.turns[0]
+
+    def peek(self):
+        if not self.count:
+            return None
+        if self.key is not None:
+            return self.heap[0][2]
+        return self.queues[self._next_turn()][0]
+
+    def pop(self):
+        self.count -= 1
+        if self.key is not None:
+            return heapq.heappop(self.heap)[2]
+        category = self._next_turn()
+        self.turns.rotate(-1)
+        return self.queues[category].popleft()